@@ -0,0 +1,114 @@
+"""
+Память распарсенных строк актов до записи в БД.
+
+before - прежнее представление: dict на строку Excel ({order_id, sticker,
+count}), затем кортеж из 8 полей на строку с повторяющимися account,
+document, date и т.п.
+
+after - ActBatch: три столбца array('q') и по одному ActFile на файл акта.
+
+Измеряется память, удерживаемая до окончания записи (current), и пик
+tracemalloc при построении.
+
+Запуск: uv run python -m benchmarks.act_batch_benchmark
+"""
+
+import gc
+import tracemalloc
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from src.ingest.batch import ActBatch
+
+UPDATE_DATE = date(2025, 1, 2)
+ROWS_PER_FILE = 200
+
+
+def make_files(rows: int) -> list[tuple[str, np.ndarray, np.ndarray, np.ndarray]]:
+    files = []
+    for i in range(rows // ROWS_PER_FILE):
+        first = 3_000_000_000 + i * ROWS_PER_FILE
+        order_ids = np.arange(first, first + ROWS_PER_FILE, dtype=np.int64)
+        files.append(
+            (
+                str(100_000_000 + i),
+                order_ids,
+                order_ids + 17_000_000_000,
+                np.ones(ROWS_PER_FILE, dtype=np.int64),
+            )
+        )
+    return files
+
+
+def before(files: list[tuple[str, np.ndarray, np.ndarray, np.ndarray]]) -> Any:
+    parsed = [
+        {
+            "supply_id": f"WB-GI-{document_number}",
+            "date": date(2025, 1, 1).isoformat(),
+            "data": [
+                {"order_id": order_id, "sticker": sticker, "count": count}
+                for order_id, sticker, count in zip(
+                    order_ids.tolist(), stickers.tolist(), counts.tolist(), strict=True
+                )
+            ],
+        }
+        for document_number, order_ids, stickers, counts in files
+    ]
+    return [
+        (
+            str(order_data["order_id"]),
+            str(order_data["sticker"]),
+            int(order_data["count"]),
+            f"act-income-mp-{item['supply_id'].split('-')[-1]}.zip",
+            item["supply_id"].split("-")[-1],
+            date.fromisoformat(item["date"]),
+            "account_1",
+            UPDATE_DATE,
+        )
+        for item in parsed
+        for order_data in item["data"]
+    ]
+
+
+def after(files: list[tuple[str, np.ndarray, np.ndarray, np.ndarray]]) -> Any:
+    batch = ActBatch(UPDATE_DATE)
+    for document_number, order_ids, stickers, counts in files:
+        batch.add_file(
+            account="account_1",
+            document_number=document_number,
+            file_date=date(2025, 1, 1),
+            order_ids=order_ids.tobytes(),
+            stickers=stickers.tobytes(),
+            counts=counts.tobytes(),
+        )
+    return batch
+
+
+def measure(func: Callable[[Any], Any], files: Any) -> tuple[float, float]:
+    """Удерживаемая и пиковая память, МБ"""
+    gc.collect()
+    tracemalloc.start()
+    result = func(files)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / 1024 / 1024, peak / 1024 / 1024
+
+
+def main() -> None:
+    print(f"{'rows':>8} {'before held/peak, MB':>21} {'after held/peak, MB':>20}")
+    for rows in (10_000, 100_000, 500_000):
+        files = make_files(rows)
+        before_held, before_peak = measure(before, files)
+        after_held, after_peak = measure(after, files)
+        print(
+            f"{rows:>8} {before_held:>12.1f} /{before_peak:>7.1f} "
+            f"{after_held:>11.1f} /{after_peak:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,775 @@
+"""
+Бенчмарк запросов DocumentsRepository и HealthcheckRepository на локальном
+Postgres с синтетическими данными продакшен-объёма.
+
+--setup пересоздаёт схему --schema (по умолчанию bench) в базе POSTGRES_*:
+внешние таблицы (order_status_log, assembly_task_status_model, supplies_data,
+acceptance_fbs_acts_new, fbs_acts_healthcheck_status) с теми столбцами,
+которые читают репозитории, и базовыми индексами, данные generate_series,
+затем migrations/*.sql и VACUUM ANALYZE. Другие схемы не затрагиваются.
+
+Объём: --status-rows строк order_status_log (4 статуса на СЗ, 3 строки
+assembly_task_status_model на СЗ, 50 СЗ в поставке), --accounts аккаунтов,
+поставки равномерно за --days дней. Акты есть у неотменённых СЗ поставок
+старше суток, кроме каждого 97-го СЗ (расхождения для валидации).
+
+Затем каждый публичный метод репозиториев вызывается --repeat раз с
+параметрами из сгенерированных данных (аккаунт, акт, дата, СЗ выбираются
+случайно), печатаются p50/p95/max. Методы записи изменяют данные схемы.
+--explain печатает EXPLAIN (ANALYZE, BUFFERS) каждого запроса метода
+(в откатываемой транзакции), --apply FILE выполняет SQL (например, новую
+миграцию с индексом) перед замером, --output/--compare сохраняют результаты
+в JSON и сравнивают с предыдущим запуском.
+
+Запуск:
+    uv run python -m benchmarks.db_benchmark --setup --status-rows 1000000 --accounts 100
+    uv run python -m benchmarks.db_benchmark --output before.json
+    uv run python -m benchmarks.db_benchmark --apply new_index.sql --compare before.json
+    uv run python -m benchmarks.db_benchmark --cases validate_orders --explain
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import sys
+import time
+from array import array
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import count
+from pathlib import Path
+from typing import Any
+
+from asyncpg import PostgresError, UndefinedTableError
+from asyncpg.connection import LoggedQuery
+
+from src.dependencies.database import DatabasePoolManager
+from src.dependencies.slow_query_log import EXPLAINABLE_STATEMENTS
+from src.document.repository import ASSEMBLY_TASKS_WATERMARK, DocumentsRepository
+from src.document.schema import ValidateStatus
+from src.healthcheck.repository import HealthcheckRepository
+from src.healthcheck.schema import HealthcheckStatus
+from src.ingest.batch import ActBatch
+from src.settings import get_settings
+
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+STATUSES_PER_ORDER = 4
+ORDERS_PER_SUPPLY = 50
+FIRST_ORDER_ID = 3_000_000_000
+FIRST_STICKER = 17_000_000_000
+FIRST_DOCUMENT_NUMBER = 100_000_000
+# номера актов, записываемых update_acceptance_certificates при замере
+BENCHMARK_DOCUMENT_NUMBER = 900_000_000
+ACT_BATCH_ROWS = 200
+ACTS_PER_BATCH = 500
+
+# столбцы внешних таблиц, которые читают репозитории; остальные столбцы
+# продакшена на планы этих запросов не влияют
+TABLES_SQL = """
+CREATE TABLE order_status_log (
+    order_id    BIGINT      NOT NULL,
+    supply_id   VARCHAR     NOT NULL,
+    status      VARCHAR     NOT NULL,
+    created_at  TIMESTAMP   NOT NULL
+);
+CREATE TABLE assembly_task_status_model (
+    id               BIGINT     NOT NULL,
+    supply_id        TEXT       NOT NULL,
+    supplier_status  TEXT       NOT NULL,
+    wb_status        TEXT       NOT NULL,
+    created_at_db    TIMESTAMP  NOT NULL
+);
+CREATE TABLE supplies_data (
+    id       TEXT       NOT NULL,
+    name     TEXT,
+    account  TEXT       NOT NULL,
+    scan_dt  TIMESTAMP
+);
+CREATE TABLE acceptance_fbs_acts_new (
+    id               BIGSERIAL,
+    order_number     TEXT       NOT NULL,
+    unit             TEXT,
+    sticker          TEXT       NOT NULL,
+    quantity         INTEGER,
+    document         TEXT,
+    document_number  TEXT       NOT NULL,
+    date             DATE       NOT NULL,
+    account          TEXT       NOT NULL,
+    created_at       DATE       NOT NULL
+);
+CREATE TABLE fbs_acts_healthcheck_status (
+    healthcheck_time        TIMESTAMP  NOT NULL,
+    is_healthcheck_success  BOOLEAN    NOT NULL,
+    is_parcer_error         BOOLEAN    NOT NULL,
+    is_wb_api_error         BOOLEAN    NOT NULL
+);
+CREATE TABLE benchmark_scale (
+    orders    BIGINT     NOT NULL,
+    supplies  BIGINT     NOT NULL,
+    accounts  INTEGER    NOT NULL,
+    days      INTEGER    NOT NULL,
+    anchor    TIMESTAMP  NOT NULL
+);
+"""
+
+# индексы создаются после загрузки данных
+INDEXES_SQL = """
+ALTER TABLE acceptance_fbs_acts_new ADD PRIMARY KEY (id);
+ALTER TABLE acceptance_fbs_acts_new
+    ADD UNIQUE (document_number, order_number, sticker);
+CREATE INDEX ON acceptance_fbs_acts_new (account, date);
+CREATE INDEX ON acceptance_fbs_acts_new (order_number);
+CREATE INDEX ON order_status_log (order_id);
+CREATE INDEX ON assembly_task_status_model (id);
+CREATE INDEX ON assembly_task_status_model (supply_id);
+ALTER TABLE supplies_data ADD PRIMARY KEY (id);
+CREATE INDEX ON fbs_acts_healthcheck_status (healthcheck_time);
+"""
+
+# $1 - момент «сейчас» (scan_dt самой новой поставки); {supply} - номер
+# поставки (s или o / 50 для СЗ o), {scan_dt} - время приёмки поставки. Одно
+# выражение во всех таблицах: дата акта совпадает с датой приёмки поставки
+SUPPLY_SQL = {"supplies_data": "s"}
+ORDER_SUPPLY_SQL = "(o / {orders_per_supply})"
+SCAN_DT_SQL = (
+    "$1::timestamp - make_interval(secs => "
+    "({supplies} - {supply}) * ({days} * 86400.0 / {supplies}))"
+)
+
+GENERATE_SQL = {
+    "supplies_data": """
+        INSERT INTO supplies_data (id, name, account, scan_dt)
+        SELECT
+            'WB-GI-' || ({first_document} + {supply}),
+            'Поставка ' || {supply},
+            'account_' || ({supply} % {accounts}),
+            {scan_dt}
+        FROM generate_series(0, {supplies} - 1) s
+    """,
+    "order_status_log": """
+        INSERT INTO order_status_log (order_id, supply_id, status, created_at)
+        SELECT
+            {first_order} + o,
+            'WB-GI-' || ({first_document} + {supply}),
+            CASE
+                WHEN k = 4 AND o % {orders_per_supply} = 7 THEN 'CANCELED'
+                ELSE (ARRAY['NEW', 'IN_ASSEMBLY', 'IN_FINAL_SUPPLY', 'DELIVERED'])[k]
+            END,
+            {scan_dt} - make_interval(hours => 4 - k)
+        FROM generate_series(0, {orders} - 1) o, generate_series(1, 4) k
+    """,
+    "assembly_task_status_model": """
+        INSERT INTO assembly_task_status_model
+            (id, supply_id, supplier_status, wb_status, created_at_db)
+        SELECT
+            {first_order} + o,
+            'WB-GI-' || ({first_document} + {supply}),
+            CASE
+                WHEN k = 3 AND o % {orders_per_supply} = 7 THEN 'cancel'
+                ELSE (ARRAY['new', 'confirm', 'complete'])[k]
+            END,
+            CASE
+                WHEN k = 3 AND o % {orders_per_supply} = 7 THEN 'canceled_by_client'
+                ELSE (ARRAY['waiting', 'sorted', 'sold'])[k]
+            END,
+            {scan_dt} - make_interval(hours => 3 - k)
+        FROM generate_series(0, {orders} - 1) o, generate_series(1, 3) k
+    """,
+    "acceptance_fbs_acts_new": """
+        INSERT INTO acceptance_fbs_acts_new
+            (order_number, unit, sticker, quantity, document, document_number,
+             date, account, created_at)
+        SELECT
+            ({first_order} + o)::text,
+            'шт.',
+            ({first_sticker} + o)::text,
+            1,
+            'act-income-mp-' || ({first_document} + {supply}) || '.zip',
+            ({first_document} + {supply})::text,
+            ({scan_dt})::date,
+            'account_' || ({supply} % {accounts}),
+            ({scan_dt})::date
+        FROM generate_series(0, {orders} - 1) o
+        WHERE {scan_dt} < $1::timestamp - interval '1 day'
+          AND o % {orders_per_supply} <> 7
+          AND o % 97 <> 0
+    """,
+    "fbs_acts_healthcheck_status": """
+        INSERT INTO fbs_acts_healthcheck_status
+        SELECT t, random() > 0.05, random() < 0.03, random() < 0.02
+        FROM generate_series(
+            $1::timestamp - make_interval(days => {days}), $1::timestamp, interval '1 hour'
+        ) t
+    """,
+}
+
+# после migrations/*.sql: таблица создаётся миграциями 001-002
+OUTCOMES_SQL = """
+        INSERT INTO acceptance_certificates_ingest_outcomes
+            (account, ingest_date, status, row_count, updated_at, circuit_state)
+        SELECT
+            'account_' || a,
+            ($1::timestamp)::date - d,
+            CASE WHEN a % 17 = 0 THEN 'failed' ELSE 'success' END,
+            1000,
+            $1::timestamp - make_interval(days => d),
+            'closed'
+        FROM generate_series(0, {accounts} - 1) a, generate_series(0, {days}) d
+"""
+
+
+@dataclass
+class Case:
+    method: str
+    variant: str
+    arguments: Callable[[], Awaitable[tuple[Any, ...]]]
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} [{self.variant}]" if self.variant else self.method
+
+
+@dataclass
+class Act:
+    account: str
+    document_number: str
+    date: date
+
+    @property
+    def supply_id(self) -> str:
+        return f"WB-GI-{self.document_number}"
+
+    @property
+    def first_order_id(self) -> int:
+        supply = int(self.document_number) - FIRST_DOCUMENT_NUMBER
+        return FIRST_ORDER_ID + supply * ORDERS_PER_SUPPLY
+
+
+class BenchmarkPoolManager(DatabasePoolManager):
+    """
+    Пул со search_path схемы бенчмарка. При recording запоминает запросы
+    (query logger asyncpg и серверные курсоры) для EXPLAIN
+    """
+
+    def __init__(self, schema: str) -> None:
+        super().__init__(
+            user=get_settings().POSTGRES_USER,
+            password=get_settings().POSTGRES_PASSWORD,
+            db=get_settings().POSTGRES_DB,
+            host=get_settings().POSTGRES_HOST,
+            port=get_settings().POSTGRES_PORT,
+            pool_size=get_settings().POOL_SIZE,
+            name="benchmark",
+        )
+        # параметры DSN, неизвестные asyncpg, передаются как server_settings
+        self.dsn = f"{self.dsn}?search_path={schema}"
+        self.recording = False
+        self.queries: list[tuple[str, tuple[Any, ...]]] = []
+
+    def _record(self, record: LoggedQuery) -> None:
+        self.queries.append((record.query, tuple(record.args or ())))
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncGenerator[Any, None]:
+        async with super()._acquire() as connection:
+            if not self.recording:
+                yield connection
+                return
+            connection.add_query_logger(self._record)
+            try:
+                yield connection
+            finally:
+                connection.remove_query_logger(self._record)
+
+    async def cursor(self, query: str, *args: Any, prefetch: int = 1000) -> Any:
+        if self.recording:
+            self.queries.append((query, args))
+        async for record in super().cursor(query, *args, prefetch=prefetch):
+            yield record
+
+    async def executemany(self, query: str, *args: Any, **kwargs: Any) -> Any:
+        if not self.recording:
+            return await super().executemany(query, *args, **kwargs)
+        # для EXPLAIN достаточно первого набора параметров
+        rows = list(args[0])
+        if rows:
+            self.queries.append((query, tuple(rows[0])))
+        self.recording = False
+        try:
+            return await super().executemany(query, rows, *args[1:], **kwargs)
+        finally:
+            self.recording = True
+
+    async def create_pool(self) -> Any:
+        pool = await super().create_pool()
+        # время запросов меряет бенчмарк, журнал медленных запросов не нужен
+        if self.slow_query_log is not None:
+            await self.slow_query_log.close()
+            self.slow_query_log = None
+        return pool
+
+
+def render(template: str, table: str, scale: dict[str, int]) -> str:
+    return (
+        template.replace("{scan_dt}", SCAN_DT_SQL)
+        .replace("{supply}", SUPPLY_SQL.get(table, ORDER_SUPPLY_SQL))
+        .format(**scale)
+    )
+
+
+async def setup(
+    database: BenchmarkPoolManager,
+    schema: str,
+    status_rows: int,
+    accounts: int,
+    days: int,
+) -> None:
+    orders = max(status_rows // STATUSES_PER_ORDER, ORDERS_PER_SUPPLY)
+    scale = {
+        "orders": orders,
+        "supplies": -(-orders // ORDERS_PER_SUPPLY),
+        "accounts": accounts,
+        "days": days,
+        "orders_per_supply": ORDERS_PER_SUPPLY,
+        "first_order": FIRST_ORDER_ID,
+        "first_sticker": FIRST_STICKER,
+        "first_document": FIRST_DOCUMENT_NUMBER,
+    }
+    anchor = datetime.now().replace(microsecond=0)
+
+    async with database.connection() as connection:
+
+        async def step(title: str, query: str, *args: Any) -> None:
+            started = time.perf_counter()
+            status = await connection.execute(query, *args)
+            print(f"{title}: {status} ({time.perf_counter() - started:.1f} с)")
+
+        await step("Схема", f'DROP SCHEMA IF EXISTS "{schema}" CASCADE')
+        await step("Схема", f'CREATE SCHEMA "{schema}"')
+        await step("Таблицы", TABLES_SQL)
+        for table, template in GENERATE_SQL.items():
+            await step(table, render(template, table, scale), anchor)
+        for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            await step(path.name, path.read_text(encoding="utf-8"))
+        await step(
+            "acceptance_certificates_ingest_outcomes",
+            render(OUTCOMES_SQL, "", scale),
+            anchor,
+        )
+        await step("Индексы", INDEXES_SQL)
+        await step(
+            "benchmark_scale",
+            "INSERT INTO benchmark_scale VALUES ($1, $2, $3, $4, $5)",
+            orders,
+            scale["supplies"],
+            accounts,
+            days,
+            anchor,
+        )
+        tables = await connection.fetch(
+            "SELECT tablename FROM pg_tables WHERE schemaname = $1", schema
+        )
+        for table in tables:
+            await step(
+                f"VACUUM ANALYZE {table['tablename']}",
+                f'VACUUM ANALYZE "{schema}"."{table["tablename"]}"',
+            )
+
+
+async def sample_acts(
+    database: BenchmarkPoolManager, rng: random.Random, size: int
+) -> tuple[list[Act], datetime]:
+    """Случайные акты сгенерированных данных и момент «сейчас» генерации"""
+    try:
+        scale = await database.fetchrow("SELECT * FROM benchmark_scale")
+    except UndefinedTableError:
+        scale = None
+    if scale is None:
+        sys.exit("Данных бенчмарка нет: запустите с --setup")
+
+    # акты есть только у поставок старше суток
+    with_acts = scale["supplies"] - -(-scale["supplies"] // scale["days"])
+    supplies = rng.sample(range(max(with_acts, 1)), min(size, max(with_acts, 1)))
+    records = await database.fetch(
+        """
+        SELECT DISTINCT account, document_number, date
+        FROM acceptance_fbs_acts_new
+        WHERE document_number = ANY($1::text[])
+        """,
+        [str(FIRST_DOCUMENT_NUMBER + supply) for supply in supplies],
+    )
+    if not records:
+        sys.exit("В acceptance_fbs_acts_new нет актов: запустите с --setup")
+    acts = [
+        Act(record["account"], record["document_number"], record["date"])
+        for record in records
+    ]
+    return acts, scale["anchor"]
+
+
+def build_cases(
+    database: BenchmarkPoolManager,
+    documents: DocumentsRepository,
+    acts: list[Act],
+    anchor: datetime,
+    rng: random.Random,
+) -> list[Case]:
+    overlap = get_settings().VALIDATION_WATERMARK_OVERLAP
+    document_numbers = count(BENCHMARK_DOCUMENT_NUMBER)
+
+    def sampled(factory: Callable[[], tuple[Any, ...]]) -> Callable[[], Any]:
+        async def arguments() -> tuple[Any, ...]:
+            return factory()
+
+        return arguments
+
+    def act() -> Act:
+        return rng.choice(acts)
+
+    def batch() -> list[Act]:
+        return rng.sample(acts, min(ACTS_PER_BATCH, len(acts)))
+
+    async def new_act_rows() -> tuple[Any, ...]:
+        document_number = next(document_numbers)
+        first = FIRST_ORDER_ID + document_number * ORDERS_PER_SUPPLY
+        order_ids = range(first, first + ACT_BATCH_ROWS)
+        act_batch = ActBatch(created_at=anchor.date())
+        act_batch.add_file(
+            act().account,
+            str(document_number),
+            anchor.date(),
+            array("q", order_ids).tobytes(),
+            array("q", (FIRST_STICKER + i for i in order_ids)).tobytes(),
+            array("q", [1] * ACT_BATCH_ROWS).tobytes(),
+        )
+        return (act_batch,)
+
+    def reset_watermarks(pattern: str) -> Callable[[], Any]:
+        async def arguments() -> tuple[Any, ...]:
+            await database.execute(
+                "DELETE FROM acceptance_certificates_watermarks WHERE name LIKE $1",
+                pattern,
+            )
+            return (overlap,)
+
+        return arguments
+
+    async def dirty_acts() -> tuple[Any, ...]:
+        records = await documents.get_dirty_acts(ACTS_PER_BATCH)
+        return ([tuple(record) for record in records],)
+
+    def validation_results() -> tuple[Any, ...]:
+        return (
+            [
+                ValidateStatus(
+                    account=item.account,
+                    document_number=item.document_number,
+                    document_date=item.date,
+                    is_valid=True,
+                    matching_count=ORDERS_PER_SUPPLY,
+                    only_in_our_service=None,
+                    only_in_acts=None,
+                )
+                for item in batch()
+            ],
+        )
+
+    def account_date() -> tuple[str, date]:
+        item = act()
+        return item.account, item.date
+
+    def last_days(days: int) -> tuple[date, date]:
+        item = act()
+        return item.date - timedelta(days=days), item.date
+
+    def account_last_days(days: int) -> tuple[date, date, str]:
+        item = act()
+        return item.date - timedelta(days=days), item.date, item.account
+
+    def validated_orders_by_account() -> tuple[Any, ...]:
+        begin_date, end_date, account = account_last_days(6)
+        return (begin_date, end_date, None, None, account)
+
+    def validated_orders_by_order_id() -> tuple[Any, ...]:
+        order_id = act().first_order_id + rng.randrange(ORDERS_PER_SUPPLY)
+        return (None, None, order_id, None, None)
+
+    def validate_orders() -> tuple[Any, ...]:
+        item = act()
+        return (item.account, item.document_number, item.date, item.supply_id)
+
+    def act_orders() -> tuple[Any, ...]:
+        items = batch()
+        return (
+            [item.account for item in items],
+            [item.document_number for item in items],
+            [item.date for item in items],
+        )
+
+    documents_cases = [
+        Case("update_acceptance_certificates", f"{ACT_BATCH_ROWS} строк", new_act_rows),
+        Case(
+            "get_validated_orders",
+            "аккаунт, 7 дней",
+            sampled(lambda: (*validated_orders_by_account(), 100, 0)),
+        ),
+        Case(
+            "get_validated_orders",
+            "order_id",
+            sampled(lambda: (*validated_orders_by_order_id(), 100, 0)),
+        ),
+        Case(
+            "iter_validated_orders",
+            "аккаунт, 7 дней",
+            sampled(validated_orders_by_account),
+        ),
+        Case("validate_orders", "", sampled(validate_orders)),
+        Case(
+            "get_order_discrepancies",
+            "аккаунт, дата",
+            sampled(lambda: (*account_date(), None, 1000, 0)),
+        ),
+        Case("iter_act_orders", f"{ACTS_PER_BATCH} актов", sampled(act_orders)),
+        Case(
+            "iter_our_orders",
+            f"{ACTS_PER_BATCH} актов",
+            sampled(lambda: ([item.supply_id for item in batch()],)),
+        ),
+        Case(
+            "get_document_number_and_supply_id",
+            "аккаунт, 30 дней",
+            sampled(lambda: account_last_days(30)),
+        ),
+        Case("get_accepted_orders_without_certificates", "", sampled(tuple)),
+        Case(
+            "refresh_not_confirmed",
+            "полный пересчёт",
+            reset_watermarks("not_confirmed:%"),
+        ),
+        Case("refresh_not_confirmed", "инкрементальный", sampled(lambda: (overlap,))),
+        Case(
+            "upsert_validation_results",
+            f"{ACTS_PER_BATCH} актов",
+            sampled(validation_results),
+        ),
+        Case("get_validation_results", "30 дней", sampled(lambda: last_days(30))),
+        Case(
+            "mark_dirty_acts_from_assembly_tasks",
+            "полный пересчёт",
+            reset_watermarks(ASSEMBLY_TASKS_WATERMARK),
+        ),
+        Case(
+            "mark_dirty_acts_from_assembly_tasks",
+            "инкрементальный",
+            sampled(lambda: (overlap,)),
+        ),
+        Case(
+            "get_dirty_acts",
+            "",
+            sampled(lambda: (get_settings().VALIDATION_DIRTY_BATCH_SIZE,)),
+        ),
+        Case("clear_dirty_acts", f"{ACTS_PER_BATCH} актов", dirty_acts),
+    ]
+
+    healthcheck_cases = [
+        Case(
+            "update_healthcheck_status",
+            "",
+            sampled(lambda: (HealthcheckStatus.SUCCESS.result,)),
+        ),
+        Case("get_healthcheck_status", "", sampled(tuple)),
+        Case("get_wb_api_status", "", sampled(lambda: (anchor.date(),))),
+    ]
+    for case in documents_cases:
+        case.method = f"{DocumentsRepository.__name__}.{case.method}"
+    for case in healthcheck_cases:
+        case.method = f"{HealthcheckRepository.__name__}.{case.method}"
+    return documents_cases + healthcheck_cases
+
+
+def uncovered_methods(cases: list[Case]) -> list[str]:
+    """Публичные методы репозиториев, для которых нет замера"""
+    methods = {
+        f"{repository.__name__}.{name}"
+        for repository in (DocumentsRepository, HealthcheckRepository)
+        for name, member in vars(repository).items()
+        if not name.startswith("_") and callable(member)
+    }
+    return sorted(methods - {case.method for case in cases})
+
+
+async def call(case: Case, repositories: dict[str, Any]) -> tuple[float, int | None]:
+    """Один вызов метода: время (с учётом чтения курсора) и число строк"""
+    arguments = await case.arguments()
+    repository, method = case.method.split(".")
+    started = time.perf_counter()
+    result = getattr(repositories[repository], method)(*arguments)
+    rows: int | None
+    if hasattr(result, "__aiter__"):
+        rows = 0
+        async for _ in result:
+            rows += 1
+    else:
+        value = await result
+        rows = len(value) if isinstance(value, list) else None
+    return time.perf_counter() - started, rows
+
+
+def summarize(timings: list[float], rows: int | None) -> dict[str, Any]:
+    percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+    return {
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "max_ms": max(timings) * 1000,
+        "rows": rows,
+    }
+
+
+async def explain(
+    database: BenchmarkPoolManager, case: Case, repositories: dict[str, Any]
+) -> None:
+    """EXPLAIN (ANALYZE, BUFFERS) запросов метода; изменения откатываются"""
+    database.queries = []
+    database.recording = True
+    try:
+        await call(case, repositories)
+    finally:
+        database.recording = False
+
+    print(f"\n=== {case.name}")
+    for query, args in database.queries:
+        if not query.strip():
+            continue
+        statement = query.lstrip().split(None, 1)[0].lower()
+        if statement not in EXPLAINABLE_STATEMENTS:
+            continue
+        async with database.connection() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                records = await connection.fetch(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {query}", *args
+                )
+                plan = "\n".join(record[0] for record in records)
+            except PostgresError as error:
+                # например, запрос к временной таблице, удалённой после COMMIT
+                plan = f"План недоступен: {error}"
+            finally:
+                await transaction.rollback()
+        print(f"--- {' '.join(query.split())[:120]}\n{plan}")
+
+
+def print_row(name: str, result: dict[str, Any], baseline: dict[str, Any]) -> None:
+    line = (
+        f"{name:<72} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+        f"{result['max_ms']:>9.1f} {result['rows'] if result['rows'] is not None else '-':>8}"
+    )
+    previous = baseline.get(name)
+    if previous:
+        for key in ("p50_ms", "p95_ms"):
+            change = (result[key] / previous[key] - 1) * 100 if previous[key] else 0.0
+            line += f" {change:>+8.0f}%"
+    print(line)
+
+
+async def run(args: argparse.Namespace) -> None:
+    database = BenchmarkPoolManager(args.schema)
+    await database.create_pool()
+    try:
+        if args.setup:
+            await setup(
+                database, args.schema, args.status_rows, args.accounts, args.days
+            )
+        for path in args.apply:
+            started = time.perf_counter()
+            await database.execute(path.read_text(encoding="utf-8"))
+            print(f"{path}: {time.perf_counter() - started:.1f} с")
+
+        rng = random.Random(args.seed)
+        acts, anchor = await sample_acts(database, rng, args.sample)
+        documents = DocumentsRepository(database)
+        repositories = {
+            DocumentsRepository.__name__: documents,
+            HealthcheckRepository.__name__: HealthcheckRepository(database),
+        }
+        cases = build_cases(database, documents, acts, anchor, rng)
+        for method in uncovered_methods(cases):
+            print(f"Нет замера для {method}", file=sys.stderr)
+        cases = [case for case in cases if re.search(args.cases, case.name)]
+
+        baseline = json.loads(args.compare.read_text()) if args.compare else {}
+        header = (
+            f"{'method':<72} {'p50, ms':>9} {'p95, ms':>9} {'max, ms':>9} {'rows':>8}"
+        )
+        print(header + (f" {'Δp50':>9} {'Δp95':>9}" if baseline else ""))
+        results = {}
+        for case in cases:
+            timings = []
+            rows = None
+            try:
+                # первый вызов прогревает кэш планов и буферов, не учитывается
+                await call(case, repositories)
+                for _ in range(args.repeat):
+                    elapsed, rows = await call(case, repositories)
+                    timings.append(elapsed)
+            except Exception as error:
+                print(f"{case.name:<72} ошибка: {error!r}")
+                continue
+            results[case.name] = summarize(timings, rows)
+            print_row(case.name, results[case.name], baseline)
+
+        if args.output:
+            args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2))
+        if args.explain:
+            for case in cases:
+                await explain(database, case, repositories)
+    finally:
+        await database.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--setup", action="store_true", help="пересоздать данные")
+    parser.add_argument("--status-rows", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--schema", default="bench")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sample", type=int, default=2000, help="актов для выбора")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cases", default="", help="regex по имени замера")
+    parser.add_argument("--apply", type=Path, action="append", default=[])
+    parser.add_argument("--explain", action="store_true")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help=f"разрешить POSTGRES_HOST не из {', '.join(LOCAL_HOSTS)}",
+    )
+    args = parser.parse_args()
+
+    if not re.fullmatch(r"[a-z_][a-z0-9_]*", args.schema):
+        parser.error("--schema: только строчные латинские буквы, цифры и _")
+    if args.repeat < 2:
+        parser.error("--repeat: нужно не меньше 2 замеров для перцентилей")
+    if args.days < 2:
+        parser.error("--days: нужно не меньше 2 дней")
+    if get_settings().POSTGRES_HOST not in LOCAL_HOSTS and not args.allow_remote:
+        parser.error(
+            f"POSTGRES_HOST={get_settings().POSTGRES_HOST} не локальный; "
+            "бенчмарк изменяет данные, для запуска укажите --allow-remote"
+        )
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
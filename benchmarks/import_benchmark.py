@@ -0,0 +1,97 @@
+"""
+Время импорта и RSS процесса после импорта точек входа.
+
+Каждый замер - отдельный интерпретатор с `python -X importtime`; берётся
+лучший из --repeat запусков. Для src.main дополнительно проверяется, что
+тяжёлые зависимости парсинга и Celery (HEAVY_MODULES) не загружаются при
+старте API: они импортируются лениво стадией парсинга и триггером.
+
+С --max-ms / --max-rss-mb работает как проверка: код возврата 1, если
+импорт src.main медленнее, процесс больше или загружен модуль из HEAVY_MODULES.
+
+Запуск:
+    uv run python -m benchmarks.import_benchmark
+    uv run python -m benchmarks.import_benchmark --max-ms 1500 --max-rss-mb 150
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+API_MODULE = "src.main"
+TARGETS = (API_MODULE, "src.celery.tasks.document_service", "src.utils.excel")
+HEAVY_MODULES = ("pandas", "openpyxl", "numpy", "celery")
+
+# итог importtime: "import time: self | cumulative | module" для верхнего модуля
+IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s?(\S+)$")
+
+PROBE = """
+import json, resource, sys
+import {module}
+print(json.dumps({{
+    "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(module: str) -> tuple[float, float, list[str]]:
+    """Время импорта (мс), пиковый RSS (МБ) и загруженные тяжёлые модули"""
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROBE.format(module=module, heavy=HEAVY_MODULES),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = 0
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and match.group(2) == module:
+            cumulative_us = int(match.group(1))
+    probe = json.loads(completed.stdout)
+    return cumulative_us / 1000, probe["rss_kb"] / 1024, probe["loaded"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float)
+    parser.add_argument("--max-rss-mb", type=float)
+    args = parser.parse_args()
+
+    print(f"{'module':<36} {'import, ms':>11} {'RSS, MB':>8}  heavy modules")
+    failures = []
+    for module in TARGETS:
+        runs = [measure(module) for _ in range(args.repeat)]
+        import_ms = min(run[0] for run in runs)
+        rss_mb = min(run[1] for run in runs)
+        loaded = runs[0][2]
+        print(
+            f"{module:<36} {import_ms:>11.1f} {rss_mb:>8.1f}  {', '.join(loaded) or '-'}"
+        )
+
+        if module != API_MODULE:
+            continue
+        if loaded:
+            failures.append(f"{module} загружает {', '.join(loaded)}")
+        if args.max_ms is not None and import_ms > args.max_ms:
+            failures.append(f"{module}: импорт {import_ms:.0f} мс > {args.max_ms} мс")
+        if args.max_rss_mb is not None and rss_mb > args.max_rss_mb:
+            failures.append(f"{module}: RSS {rss_mb:.0f} МБ > {args.max_rss_mb} МБ")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
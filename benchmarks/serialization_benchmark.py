@@ -0,0 +1,87 @@
+"""
+Микробенчмарк сериализации списочных ответов /validated_order/.
+
+before - прежний путь: ValidatedOrder(...) на каждую запись через record.get,
+затем то, что делает FastAPI с response_model: model_dump -> повторная
+валидация -> сериализация в python (mode="json") -> json.dumps.
+
+after - быстрый путь DocumentService.get_validated_order_json: одна валидация
+в предкомпилированном TypeAdapter и dump_json сразу в bytes.
+
+Запуск: uv run python -m benchmarks.serialization_benchmark
+"""
+
+import json
+import timeit
+from collections.abc import Callable
+from datetime import date, timedelta
+from typing import Any
+
+from pydantic import TypeAdapter
+
+from src.document.schema import ValidatedOrder
+
+adapter = TypeAdapter(list[ValidatedOrder])
+
+
+def make_records(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "order_id": 3_000_000_000 + i,
+            "supply_id": f"WB-GI-{100_000_000 + i // 50}",
+            "sticker": 20_000_000_000 + i,
+            "inner_order_status": "DELIVERED",
+            "document": f"act-income-mp-{100_000_000 + i // 50}.zip",
+            "account": f"account_{i % 100}",
+            "document_date": date(2025, 1, 1) + timedelta(days=i % 30),
+        }
+        for i in range(count)
+    ]
+
+
+def before(records: list[dict[str, Any]]) -> bytes:
+    models = [
+        ValidatedOrder(
+            order_id=record.get("order_id"),
+            supply_id=record.get("supply_id"),
+            sticker=record.get("sticker"),
+            inner_order_status=record.get("inner_order_status"),
+            document=record.get("document"),
+            account=record.get("account"),
+            document_date=record.get("document_date"),
+        )
+        for record in records
+    ]
+    revalidated = adapter.validate_python([model.model_dump() for model in models])
+    content = adapter.dump_python(revalidated, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def after(records: list[dict[str, Any]]) -> bytes:
+    return adapter.dump_json(
+        adapter.validate_python([dict(record) for record in records])
+    )
+
+
+def per_row_us(func: Callable[[list[dict[str, Any]]], bytes], records: list) -> float:
+    repeat = max(1, 20_000 // len(records))
+    best = min(timeit.repeat(lambda: func(records), number=repeat, repeat=5))
+    return best / repeat / len(records) * 1_000_000
+
+
+def main() -> None:
+    print(f"{'rows':>6} {'before, us/row':>15} {'after, us/row':>14} {'speedup':>8}")
+    for count in (200, 1000, 5000):
+        records = make_records(count)
+        assert json.loads(before(records)) == json.loads(after(records))
+        before_us = per_row_us(before, records)
+        after_us = per_row_us(after, records)
+        print(
+            f"{count:>6} {before_us:>15.2f} {after_us:>14.2f} {before_us / after_us:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Бенчмарк движков валидации актов (VALIDATION_ENGINE sql / numpy).
+
+Без аргументов - синтетический пакет актов в памяти: эталонная сверка
+множествами по каждому акту (то, что validate_orders делает FULL JOIN'ом)
+против VectorizedValidator.validate. Результаты сравниваются на равенство.
+Выигрыш numpy-движка - не в самой сверке (ядро reconcile на 500 тыс. СЗ
+занимает десятки мс), а в замене запроса на каждый акт двумя потоковыми
+запросами; это измеряет режим с БД.
+
+С --begin-date/--end-date - оба движка DocumentService на настроенной БД
+за период (читает acceptance_fbs_acts_new и assembly_task_status_model,
+ничего не записывает). Сравниваются время и результаты.
+
+Запуск:
+    uv run python -m benchmarks.validation_benchmark
+    uv run python -m benchmarks.validation_benchmark --begin-date 2025-01-01 --end-date 2025-01-07
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from functools import partial
+from typing import Any
+from unittest import mock
+
+import numpy as np
+
+from src.document.schema import DocumentDataForValidate, ValidateStatus
+from src.document.vectorized import VectorizedValidator, reconcile
+
+
+def make_batch(
+    acts: int, orders_per_act: int, seed: int = 0
+) -> tuple[list[DocumentDataForValidate], list[tuple[int, int]], list[tuple[int, int]]]:
+    """
+    Акты с orders_per_act СЗ в виде, в котором их возвращают iter_act_orders /
+    iter_our_orders: пары (act_index, order_id). Примерно в каждом десятом акте
+    СЗ пропущено с одной из сторон.
+    """
+    rng = random.Random(seed)
+    documents = []
+    act_rows: list[tuple[int, int]] = []
+    our_rows: list[tuple[int, int]] = []
+    next_order_id = 3_000_000_000
+    for i in range(acts):
+        documents.append(
+            DocumentDataForValidate(
+                account=f"account_{i % 20}",
+                document_number=str(100_000_000 + i),
+                document_date=date(2025, 1, 1) + timedelta(days=i % 7),
+                supply_id=f"WB-GI-{100_000_000 + i}",
+            )
+        )
+        order_ids = list(range(next_order_id, next_order_id + orders_per_act))
+        next_order_id += orders_per_act + 1
+        acts_side, ours_side = list(order_ids), list(order_ids)
+        if rng.random() < 0.1:
+            rng.choice((acts_side, ours_side)).pop(rng.randrange(len(order_ids)))
+        act_rows.extend((i, order_id) for order_id in acts_side)
+        our_rows.extend((i, order_id) for order_id in ours_side)
+    return documents, act_rows, our_rows
+
+
+def reference(
+    documents: list[DocumentDataForValidate],
+    act_rows: list[tuple[int, int]],
+    our_rows: list[tuple[int, int]],
+) -> list[ValidateStatus]:
+    """Сверка множествами Python по каждому акту"""
+    acts: dict[int, set[int]] = {}
+    for act_index, order_id in act_rows:
+        acts.setdefault(act_index, set()).add(order_id)
+    ours: dict[int, set[int]] = {}
+    for act_index, order_id in our_rows:
+        ours.setdefault(act_index, set()).add(order_id)
+
+    results = []
+    for i, document in enumerate(documents):
+        in_acts = acts.get(i, set())
+        in_ours = ours.get(i, set())
+        only_in_acts = len(in_acts - in_ours)
+        only_in_our_service = len(in_ours - in_acts)
+        is_valid = only_in_acts == 0 and only_in_our_service == 0
+        results.append(
+            ValidateStatus(
+                account=document.account,
+                document_number=document.document_number,
+                document_date=document.document_date,
+                is_valid=is_valid,
+                matching_count=len(in_acts & in_ours),
+                only_in_our_service=None if is_valid else only_in_our_service,
+                only_in_acts=None if is_valid else only_in_acts,
+            )
+        )
+    return results
+
+
+def vectorized(
+    documents: list[DocumentDataForValidate],
+    act_rows: list[tuple[int, int]],
+    our_rows: list[tuple[int, int]],
+) -> list[ValidateStatus]:
+    validator = VectorizedValidator(documents)
+    for act_index, order_id in act_rows:
+        validator.add_act_order(act_index, order_id)
+    for act_index, order_id in our_rows:
+        validator.add_our_order(act_index, order_id)
+    return validator.validate()
+
+
+def best_ms(func: Callable[[], object], repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def run_in_memory() -> None:
+    """
+    sets - сверка множествами по акту, numpy - VectorizedValidator от пар до
+    ValidateStatus, kernel - только reconcile по готовым массивам.
+    """
+    print(
+        f"{'acts':>6} {'orders':>8} {'sets, ms':>9} {'numpy, ms':>10} {'kernel, ms':>11}"
+    )
+    for acts, orders_per_act in ((100, 50), (1000, 50), (5000, 100)):
+        documents, act_rows, our_rows = make_batch(acts, orders_per_act)
+        assert reference(documents, act_rows, our_rows) == vectorized(
+            documents, act_rows, our_rows
+        )
+        act_pairs = np.array(act_rows, dtype=np.int64)
+        our_pairs = np.array(our_rows, dtype=np.int64)
+
+        sets_ms = best_ms(partial(reference, documents, act_rows, our_rows))
+        numpy_ms = best_ms(partial(vectorized, documents, act_rows, our_rows))
+        kernel_ms = best_ms(
+            partial(
+                reconcile,
+                acts,
+                act_pairs[:, 0],
+                act_pairs[:, 1],
+                our_pairs[:, 0],
+                our_pairs[:, 1],
+            )
+        )
+        print(
+            f"{acts:>6} {acts * orders_per_act:>8} {sets_ms:>9.1f} "
+            f"{numpy_ms:>10.1f} {kernel_ms:>11.1f}"
+        )
+
+
+async def run_database(begin_date: date, end_date: date) -> None:
+    from src.celery.tasks.document_service import _create_pool_manager
+    from src.document.repository import DocumentsRepository
+    from src.document.service import DocumentService
+    from src.settings import get_settings
+
+    pool = _create_pool_manager()
+    await pool.create_pool()
+    try:
+        service = DocumentService(repository=DocumentsRepository(pool))
+        documents = await service.get_document_number_and_supply_id(
+            begin_date, end_date
+        )
+        print(f"Актов за {begin_date} - {end_date}: {len(documents)}")
+
+        results = {}
+        for engine in ("sql", "numpy"):
+            with mock.patch.object(get_settings(), "VALIDATION_ENGINE", engine):
+                started = time.perf_counter()
+                results[engine] = await service._validate_documents(documents)
+                print(f"{engine:>6}: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        def key(result: ValidateStatus) -> tuple[Any, ...]:
+            return (result.account, result.document_number, result.document_date)
+
+        assert sorted(results["sql"], key=key) == sorted(results["numpy"], key=key), (
+            "результаты движков различаются"
+        )
+        print("Результаты движков совпадают")
+    finally:
+        await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--begin-date", type=date.fromisoformat)
+    parser.add_argument("--end-date", type=date.fromisoformat)
+    args = parser.parse_args()
+
+    if args.begin_date is None:
+        run_in_memory()
+    else:
+        asyncio.run(run_database(args.begin_date, args.end_date or args.begin_date))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS acceptance_certificates_ingest_outcomes (
+    account      TEXT        NOT NULL,
+    ingest_date  DATE        NOT NULL,
+    status       TEXT        NOT NULL,
+    row_count    INTEGER     NOT NULL DEFAULT 0,
+    error_class  TEXT,
+    error        TEXT,
+    updated_at   TIMESTAMP   NOT NULL DEFAULT now(),
+    PRIMARY KEY (account, ingest_date)
+);
@@ -0,0 +1,2 @@
+ALTER TABLE acceptance_certificates_ingest_outcomes
+    ADD COLUMN IF NOT EXISTS circuit_state TEXT;
@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS acceptance_certificates_validation_results (
+    account              TEXT        NOT NULL,
+    document_number      TEXT        NOT NULL,
+    document_date        DATE        NOT NULL,
+    matching_count       INTEGER     NOT NULL DEFAULT 0,
+    only_in_acts         INTEGER,
+    only_in_our_service  INTEGER,
+    is_valid             BOOLEAN     NOT NULL,
+    computed_at          TIMESTAMP   NOT NULL DEFAULT now(),
+    PRIMARY KEY (account, document_number, document_date)
+);
+
+CREATE INDEX IF NOT EXISTS acceptance_certificates_validation_results_date_idx
+    ON acceptance_certificates_validation_results (document_date);
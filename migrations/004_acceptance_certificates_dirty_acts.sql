@@ -0,0 +1,39 @@
+-- акты, результаты валидации которых устарели
+CREATE TABLE IF NOT EXISTS acceptance_certificates_dirty_acts (
+    account          TEXT        NOT NULL,
+    document_number  TEXT        NOT NULL,
+    document_date    DATE        NOT NULL,
+    marked_at        TIMESTAMP   NOT NULL DEFAULT now(),
+    PRIMARY KEY (account, document_number, document_date)
+);
+
+-- позиции, до которых внешние таблицы уже просмотрены
+CREATE TABLE IF NOT EXISTS acceptance_certificates_watermarks (
+    name   TEXT        PRIMARY KEY,
+    value  TIMESTAMP   NOT NULL
+);
+
+-- новые строки актов помечают свой акт; строки, пропущенные ON CONFLICT DO NOTHING,
+-- в transition table не попадают
+CREATE OR REPLACE FUNCTION mark_acceptance_acts_dirty() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO acceptance_certificates_dirty_acts
+        (account, document_number, document_date, marked_at)
+    SELECT DISTINCT account, document_number, date, now()
+    FROM new_rows
+    ON CONFLICT (account, document_number, document_date)
+        DO UPDATE SET marked_at = EXCLUDED.marked_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS acceptance_fbs_acts_new_mark_dirty ON acceptance_fbs_acts_new;
+CREATE TRIGGER acceptance_fbs_acts_new_mark_dirty
+    AFTER INSERT ON acceptance_fbs_acts_new
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION mark_acceptance_acts_dirty();
+
+-- чтение изменений assembly_task_status_model после watermark
+CREATE INDEX IF NOT EXISTS assembly_task_status_model_created_at_db_idx
+    ON assembly_task_status_model (created_at_db);
@@ -0,0 +1,38 @@
+-- принятые сборочные задания без акта за последние 120 часов
+CREATE TABLE IF NOT EXISTS acceptance_certificates_not_confirmed (
+    order_id         BIGINT      PRIMARY KEY,
+    supply_id        TEXT,
+    inner_status     TEXT,
+    supplier_status  TEXT,
+    wb_status        TEXT,
+    reception_time   TIMESTAMP,
+    supply_name      TEXT,
+    account          TEXT,
+    refreshed_at     TIMESTAMP   NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS acceptance_certificates_not_confirmed_reception_time_idx
+    ON acceptance_certificates_not_confirmed (reception_time);
+
+-- новые строки актов снимают СЗ с учёта
+CREATE OR REPLACE FUNCTION delete_confirmed_orders() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM acceptance_certificates_not_confirmed nc
+    USING (SELECT DISTINCT order_number FROM new_rows) n
+    WHERE nc.order_id::text = n.order_number;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS acceptance_fbs_acts_new_delete_confirmed ON acceptance_fbs_acts_new;
+CREATE TRIGGER acceptance_fbs_acts_new_delete_confirmed
+    AFTER INSERT ON acceptance_fbs_acts_new
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION delete_confirmed_orders();
+
+-- чтение изменений после watermark
+CREATE INDEX IF NOT EXISTS order_status_log_created_at_idx
+    ON order_status_log (created_at);
+CREATE INDEX IF NOT EXISTS supplies_data_scan_dt_idx
+    ON supplies_data (scan_dt);
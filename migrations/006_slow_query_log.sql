@@ -0,0 +1,14 @@
+CREATE TABLE IF NOT EXISTS slow_query_log (
+    id           BIGSERIAL    PRIMARY KEY,
+    captured_at  TIMESTAMPTZ  NOT NULL DEFAULT now(),
+    pool         TEXT         NOT NULL,
+    caller       TEXT         NOT NULL,
+    query        TEXT         NOT NULL,
+    params       JSONB        NOT NULL,
+    duration_ms  DOUBLE PRECISION NOT NULL,
+    plan         JSONB,
+    error        TEXT
+);
+
+CREATE INDEX IF NOT EXISTS slow_query_log_captured_at_idx
+    ON slow_query_log (captured_at);
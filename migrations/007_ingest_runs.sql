@@ -0,0 +1,23 @@
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    job_id            TEXT              NOT NULL,
+    account           TEXT              NOT NULL,
+    ingest_date       DATE              NOT NULL,
+    status            TEXT              NOT NULL,
+    error_class       TEXT,
+    list_seconds      DOUBLE PRECISION,
+    download_seconds  DOUBLE PRECISION,
+    decode_seconds    DOUBLE PRECISION,
+    unzip_seconds     DOUBLE PRECISION,
+    parse_seconds     DOUBLE PRECISION,
+    insert_seconds    DOUBLE PRECISION,
+    bytes_downloaded  BIGINT            NOT NULL DEFAULT 0,
+    workbooks         INTEGER           NOT NULL DEFAULT 0,
+    rows_parsed       INTEGER           NOT NULL DEFAULT 0,
+    rows_inserted     INTEGER           NOT NULL DEFAULT 0,
+    rows_conflicted   INTEGER           NOT NULL DEFAULT 0,
+    recorded_at       TIMESTAMP         NOT NULL DEFAULT now(),
+    PRIMARY KEY (job_id, account)
+);
+
+CREATE INDEX IF NOT EXISTS ingest_runs_ingest_date_idx
+    ON ingest_runs (ingest_date);
@@ -1,9 +1,17 @@
+from src.circuit_breaker import CircuitBreakerRegistry
 from src.response import AsyncHttpClient
 
 
 class Account:
-    def __init__(self, account: str, token: str):
+    def __init__(
+        self,
+        account: str,
+        token: str,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+    ):
         self.account = account
         self.token = token
-        self.async_client = AsyncHttpClient()
+        self.async_client = AsyncHttpClient(
+            circuit_name=account, circuit_breakers=circuit_breakers
+        )
         self.headers = {"Authorization": token, "Content-Type": "application/json"}
@@ -0,0 +1,137 @@
+import hashlib
+import io
+import mmap
+import os
+import re
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from logging import getLogger
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+logger = getLogger(__name__)
+
+
+class ArtifactMeta(BaseModel):
+    account: str = Field(description="Имя аккаунта")
+    document_date: date = Field(description="Дата, за которую скачаны акты")
+    documents: list[str] = Field(description="Файлы актов внутри архива")
+    size: int = Field(description="Размер архива в байтах")
+    sha256: str = Field(description="Хэш архива")
+    stored_at: datetime = Field(description="Время сохранения архива")
+    path: str = Field(description="Путь к архиву")
+
+
+class ArtifactStore:
+    """
+    Локальное хранилище скачанных архивов актов: <root>/<account>/<YYYY-MM-DD>.zip
+    Рядом с каждым архивом лежит индекс <YYYY-MM-DD>.json (ArtifactMeta)
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root).resolve()
+
+    @staticmethod
+    def _safe_name(account: str) -> str:
+        return re.sub(r"[^\w.-]", "_", account)
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    @staticmethod
+    def _list_documents(archive_bytes: bytes) -> list[str]:
+        try:
+            with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+                return archive.namelist()
+        except zipfile.BadZipFile:
+            return []
+
+    def path_for(self, account: str, document_date: date) -> Path:
+        return self.root / self._safe_name(account) / f"{document_date.isoformat()}.zip"
+
+    def write(self, account: str, document_date: date, archive_bytes: bytes) -> Path:
+        """Атомарная запись архива и его индекса: файлы появляются только целиком."""
+        path = self.path_for(account, document_date)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._atomic_write(path, archive_bytes)
+
+        meta = ArtifactMeta(
+            account=account,
+            document_date=document_date,
+            documents=self._list_documents(archive_bytes),
+            size=len(archive_bytes),
+            sha256=hashlib.sha256(archive_bytes).hexdigest(),
+            stored_at=datetime.now(),
+            path=str(path),
+        )
+        self._atomic_write(
+            path.with_suffix(".json"), meta.model_dump_json().encode("utf-8")
+        )
+
+        logger.info(f"Аккаунт {account}: архив сохранён {path} ({meta.size} байт)")
+        return path
+
+    def resolve(self, path: str | Path) -> Path:
+        """Проверка, что путь (полученный через брокер) лежит внутри хранилища."""
+        resolved = Path(path).resolve()
+        if not resolved.is_relative_to(self.root):
+            raise ValueError(f"Путь {path} вне хранилища артефактов {self.root}")
+        return resolved
+
+    def read(self, path: str | Path) -> bytes:
+        return self.resolve(path).read_bytes()
+
+    @contextmanager
+    def open_mmap(self, path: str | Path) -> Iterator[mmap.mmap]:
+        """Отображение архива в память без копирования в процесс."""
+        with (
+            self.resolve(path).open("rb") as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        ):
+            yield mapped
+
+    def index(
+        self,
+        account: str | None = None,
+        begin_date: date | None = None,
+        end_date: date | None = None,
+    ) -> list[ArtifactMeta]:
+        pattern = f"{self._safe_name(account)}/*.json" if account else "*/*.json"
+        result = []
+        for meta_path in self.root.glob(pattern):
+            try:
+                meta = ArtifactMeta.model_validate_json(meta_path.read_bytes())
+            except ValueError as error:
+                logger.warning(f"Повреждённый индекс архива {meta_path}: {error}")
+                continue
+            if begin_date and meta.document_date < begin_date:
+                continue
+            if end_date and meta.document_date > end_date:
+                continue
+            result.append(meta)
+        return sorted(result, key=lambda meta: (meta.document_date, meta.account))
+
+    def purge_expired(self, retention_days: int) -> int:
+        """Удаление архивов старше retention_days дней. Возвращает число удалённых."""
+        expire_before = date.today() - timedelta(days=retention_days)
+        removed = 0
+        for meta in self.index(end_date=expire_before - timedelta(days=1)):
+            archive_path = self.path_for(meta.account, meta.document_date)
+            archive_path.unlink(missing_ok=True)
+            archive_path.with_suffix(".json").unlink(missing_ok=True)
+            removed += 1
+        logger.info(f"Удалено архивов старше {expire_before}: {removed}")
+        return removed
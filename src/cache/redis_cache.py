@@ -0,0 +1,238 @@
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Generic, TypeVar
+
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError, WatchError
+
+from src.settings import get_settings
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+# снятие блокировки только владельцем (compare-and-delete)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+VALIDATE_STATUS_KEY = "validated_order:status"
+NOT_CONFIRMED_KEY = "validated_order:not_confirmed"
+
+
+@dataclass(frozen=True)
+class CachedValue(Generic[T]):
+    value: T
+    computed_at: float
+
+    @property
+    def age(self) -> float:
+        return max(time.time() - self.computed_at, 0.0)
+
+
+def create_redis_client() -> Redis:
+    return Redis(
+        host=get_settings().REDIS_HOST,
+        port=get_settings().REDIS_PORT,
+        db=get_settings().REDIS_DB,
+        password=get_settings().REDIS_PASSWORD or None,
+    )
+
+
+class RedisCache:
+    """
+    Кэш результатов сервисных методов в Redis.
+
+    Значение хранится в hash {data, computed_at} и записывается одной транзакцией.
+    При промахе вычисление выполняется один раз (single-flight): внутри процесса -
+    через asyncio.Lock, между процессами - через блокировку SET NX в Redis.
+
+    У каждого ключа есть счётчик поколений generation:<key>: set и invalidate
+    его увеличивают. Результат вычисления при промахе записывается, только если
+    поколение не изменилось с начала вычисления (WATCH) - иначе значение,
+    вычисленное до сброса, пролежало бы в кэше весь TTL.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        ttl: int,
+        lock_timeout: float = 60.0,
+        poll_interval: float = 0.1,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._local_locks: dict[str, asyncio.Lock] = {}
+
+    async def get_json(self, key: str) -> CachedValue[bytes] | None:
+        """Сериализованное значение без разбора JSON - для отдачи в ответ как есть."""
+        try:
+            data, computed_at = await self.client.hmget(key, ["data", "computed_at"])
+        except RedisError as error:
+            logger.error(f"Ошибка чтения кэша {key}: {error}")
+            return None
+        if data is None or computed_at is None:
+            return None
+        if isinstance(data, str):
+            data = data.encode()
+        return CachedValue(value=data, computed_at=float(computed_at))
+
+    async def get(self, key: str, adapter: TypeAdapter[T]) -> CachedValue[T] | None:
+        cached = await self.get_json(key)
+        if cached is None:
+            return None
+        return CachedValue(
+            value=adapter.validate_json(cached.value), computed_at=cached.computed_at
+        )
+
+    @staticmethod
+    def _generation_key(key: str) -> str:
+        return f"generation:{key}"
+
+    async def _generation(self, key: str) -> int | None:
+        """Текущее поколение ключа; None, если Redis недоступен"""
+        try:
+            generation = await self.client.get(self._generation_key(key))
+        except RedisError as error:
+            logger.error(f"Ошибка чтения поколения кэша {key}: {error}")
+            return None
+        return int(generation or 0)
+
+    def _queue_write(
+        self, pipe: Pipeline, key: str, cached: CachedValue[bytes], ttl: int | None
+    ) -> None:
+        pipe.hset(
+            key,
+            mapping={"data": cached.value, "computed_at": cached.computed_at},
+        )
+        pipe.expire(key, ttl or self.ttl)
+
+    async def set(
+        self, key: str, value: T, adapter: TypeAdapter[T], ttl: int | None = None
+    ) -> CachedValue[bytes]:
+        """Перезапись значения на месте: читатели получают старое значение до EXEC"""
+        cached = CachedValue(value=adapter.dump_json(value), computed_at=time.time())
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                self._queue_write(pipe, key, cached, ttl)
+                pipe.incr(self._generation_key(key))
+                await pipe.execute()
+        except RedisError as error:
+            logger.error(f"Ошибка записи кэша {key}: {error}")
+        return cached
+
+    async def _set_if_generation(
+        self, key: str, value: T, adapter: TypeAdapter[T], generation: int | None
+    ) -> CachedValue[bytes]:
+        """Запись результата вычисления, если поколение ключа не изменилось"""
+        cached = CachedValue(value=adapter.dump_json(value), computed_at=time.time())
+        if generation is None:
+            return cached
+        generation_key = self._generation_key(key)
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                await pipe.watch(generation_key)
+                if int(await pipe.get(generation_key) or 0) != generation:
+                    logger.info(
+                        f"Кэш {key} обновлён во время вычисления, запись пропущена"
+                    )
+                    return cached
+                pipe.multi()
+                self._queue_write(pipe, key, cached, None)
+                await pipe.execute()
+        except WatchError:
+            logger.info(f"Кэш {key} обновлён во время вычисления, запись пропущена")
+        except RedisError as error:
+            logger.error(f"Ошибка записи кэша {key}: {error}")
+        return cached
+
+    async def invalidate(self, *keys: str) -> None:
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.delete(*keys)
+                for key in keys:
+                    pipe.incr(self._generation_key(key))
+                await pipe.execute()
+            logger.info(f"Кэш сброшен: {', '.join(keys)}")
+        except RedisError as error:
+            logger.error(f"Ошибка сброса кэша {keys}: {error}")
+
+    async def _acquire_lock(self, lock_key: str, token: str) -> bool:
+        try:
+            return bool(
+                await self.client.set(
+                    lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+                )
+            )
+        except RedisError as error:
+            logger.error(f"Ошибка блокировки {lock_key}: {error}")
+            return True
+
+    async def _release_lock(self, lock_key: str, token: str) -> None:
+        try:
+            await self.client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except RedisError as error:
+            logger.error(f"Ошибка снятия блокировки {lock_key}: {error}")
+
+    async def _wait_for_value(self, key: str) -> CachedValue[bytes] | None:
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            cached = await self.get_json(key)
+            if cached is not None:
+                return cached
+        return None
+
+    async def get_or_compute_json(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        adapter: TypeAdapter[T],
+    ) -> CachedValue[bytes]:
+        cached = await self.get_json(key)
+        if cached is not None:
+            return cached
+
+        local_lock = self._local_locks.setdefault(key, asyncio.Lock())
+        async with local_lock:
+            cached = await self.get_json(key)
+            if cached is not None:
+                return cached
+
+            lock_key = f"lock:{key}"
+            token = uuid.uuid4().hex
+            if not await self._acquire_lock(lock_key, token):
+                # значение вычисляет другой процесс - ждём его результат
+                cached = await self._wait_for_value(key)
+                if cached is not None:
+                    return cached
+
+            try:
+                generation = await self._generation(key)
+                return await self._set_if_generation(
+                    key, await compute(), adapter, generation
+                )
+            finally:
+                await self._release_lock(lock_key, token)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        adapter: TypeAdapter[T],
+    ) -> CachedValue[T]:
+        cached = await self.get_or_compute_json(key, compute, adapter)
+        return CachedValue(
+            value=adapter.validate_json(cached.value), computed_at=cached.computed_at
+        )
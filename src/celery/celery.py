@@ -3,6 +3,7 @@ from logging import getLogger
 from celery.schedules import crontab
 
 from celery import Celery
+from src.celery import signals  # noqa: F401  метрики задач
 from src.settings import get_settings
 
 logger = getLogger(__name__)
@@ -21,6 +22,14 @@ def create_celery() -> Celery:
         result_serializer="json",
         timezone="Europe/Moscow",
         enable_utc=True,
+        task_routes={
+            "download_account_documents_task": {
+                "queue": get_settings().CELERY_DOWNLOAD_QUEUE
+            },
+            "ingest_account_documents_task": {
+                "queue": get_settings().CELERY_INGEST_QUEUE
+            },
+        },
     )
 
     celery_app.conf.beat_schedule = {
@@ -28,11 +37,27 @@ def create_celery() -> Celery:
             "task": "update_acceptance_certificates_task",
             "schedule": crontab(hour=4, minute=10),
         },
+        "retry-failed-accounts": {
+            "task": "retry_failed_accounts_task",
+            "schedule": crontab(hour=5, minute=30),
+        },
         "healthcheck": {"task": "healthcheck", "schedule": crontab(hour=6, minute=30)},
         "validate_orders": {
             "task": "validate_orders",
             "schedule": crontab(hour=8),
         },
+        "warm-cache": {
+            "task": "warm_cache_task",
+            "schedule": get_settings().CACHE_REFRESH_INTERVAL,
+        },
+        "refresh-not-confirmed": {
+            "task": "refresh_not_confirmed_task",
+            "schedule": get_settings().NOT_CONFIRMED_REFRESH_INTERVAL,
+        },
+        "purge-artifacts": {
+            "task": "purge_artifacts_task",
+            "schedule": crontab(hour=3, minute=0),
+        },
     }
 
     return celery_app
@@ -0,0 +1,75 @@
+import time
+from typing import Any
+
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    task_retry,
+    worker_process_init,
+    worker_process_shutdown,
+)
+from src.metrics.registry import (
+    CELERY_TASK_DURATION,
+    RETRIES,
+    mark_dead_processes,
+    mark_process_dead,
+)
+from src.profiling.profiler import ProfileSession, start_profile
+from src.settings import get_settings
+
+# task_id -> время старта; prerun и postrun выполняются в одном процессе воркера
+_task_started: dict[str, float] = {}
+_task_profiles: dict[str, ProfileSession] = {}
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id: str, **kwargs: Any) -> None:
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _on_task_postrun(
+    task_id: str, task: Any, state: str | None = None, **kwargs: Any
+) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is None:
+        return
+    CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(
+        time.perf_counter() - started
+    )
+
+
+@task_retry.connect
+def _on_task_retry(sender: Any = None, **kwargs: Any) -> None:
+    RETRIES.labels("celery", getattr(sender, "name", "unknown")).inc()
+
+
+@worker_process_shutdown.connect
+def _on_worker_process_shutdown(**kwargs: Any) -> None:
+    mark_process_dead()
+
+
+@worker_process_init.connect
+def _on_worker_process_init(**kwargs: Any) -> None:
+    # пул заменяет убитый процесс новым: его gauge'и убираются здесь
+    mark_dead_processes()
+
+
+def _on_profiled_task_prerun(task_id: str, task: Any, **kwargs: Any) -> None:
+    if task.name not in get_settings().PROFILE_TASKS:
+        return
+    session = start_profile()
+    if session is not None:
+        _task_profiles[task_id] = session
+
+
+def _on_profiled_task_postrun(task_id: str, task: Any, **kwargs: Any) -> None:
+    session = _task_profiles.pop(task_id, None)
+    if session is not None:
+        session.save(task.name)
+
+
+# без PROFILE_TASKS обработчики не подключаются и не тратят время на задачу
+if get_settings().PROFILE_TASKS:
+    task_prerun.connect(_on_profiled_task_prerun)
+    task_postrun.connect(_on_profiled_task_postrun)
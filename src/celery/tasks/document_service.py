@@ -1,34 +1,85 @@
 import asyncio
 import base64
+import mmap
+import time
+import uuid
+from collections.abc import Coroutine
 from datetime import date, datetime, timedelta
 from logging import getLogger
-from typing import Any
+from typing import Any, TypeVar
 
+from redis.asyncio import Redis
+
+from celery import Task, chord
+from src.artifacts.store import ArtifactStore
+from src.cache.redis_cache import RedisCache, create_redis_client
 from src.celery.celery import celery_app
+from src.circuit_breaker import CircuitBreakerRegistry, CircuitState
 from src.dependencies.database import DatabasePoolManager
 from src.document.repository import DocumentsRepository
-from src.document.schema import DocumentDataForValidate
+from src.document.service import DocumentService
 from src.healthcheck.schema import HealthcheckStatus
 from src.healthcheck.service import HealthcheckRepository, HealthcheckService
+from src.ingest.batch import ActBatch
+from src.ingest.lease import IngestLease
+from src.ingest.progress import IngestProgress
+from src.ingest.repository import IngestRepository
+from src.ingest.schema import (
+    AccountIngestOutcome,
+    IngestJobState,
+    IngestRunMetrics,
+    IngestStage,
+    IngestStatus,
+)
+from src.ingest.service import IngestService
 from src.marketplace_api.documents import Documents
+from src.metrics.registry import INGEST_ROWS
 from src.response import AsyncHttpClient
-from src.utils.utils import extract_excel_from_zip, get_tokens
+from src.settings import get_settings
+from src.utils.utils import get_tokens
 
 logger = getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class DocumentsService:
-    def __init__(self, db: DatabasePoolManager) -> None:
+    def __init__(
+        self,
+        db: DatabasePoolManager,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+    ) -> None:
         self.db = db
         self.documents_repository = DocumentsRepository(db)
         self.async_client = AsyncHttpClient()
+        self.artifact_store = ArtifactStore(get_settings().ARTIFACTS_DIR)
+        self.circuit_breakers = circuit_breakers
+
+    async def _insert_certificates(self, batch: ActBatch) -> tuple[int, int]:
+        """
+        :return: (inserted, conflicted) - новые строки и уже загруженные ранее
+        """
+        (
+            inserted,
+            conflicted,
+        ) = await self.documents_repository.update_acceptance_certificates(batch)
+        logger.info(
+            f"Строк актов записано: {inserted}, уже были загружены: {conflicted}"
+        )
+        INGEST_ROWS.labels("inserted").inc(inserted)
+        INGEST_ROWS.labels("conflicted").inc(conflicted)
+        # кэш не сбрасывается: /validated_order/status и /not_confirmed отдают
+        # прежнее значение, пока warm_cache после валидации не перезапишет его
+        return inserted, conflicted
 
     async def download_documents(self) -> dict[str, Any] | Any:
         data = get_tokens()
 
         tasks = []
         for account, token in data.items():
-            documents_api = Documents(account=account, token=token)
+            documents_api = Documents(
+                account=account, token=token, circuit_breakers=self.circuit_breakers
+            )
             task = documents_api.download_documents()
             tasks.append((account, task))
 
@@ -46,10 +97,57 @@ class DocumentsService:
 
         return documents_dict
 
-    async def extract_and_parce_excel(self) -> list | int:
+    @staticmethod
+    def _parse_account_archive(
+        account: str, zip_bytes: bytes | mmap.mmap, update_date: date
+    ) -> ActBatch:
+        # pandas/openpyxl нужны только стадии парсинга, не воркерам скачивания
+        from src.utils.excel import extract_excel_from_zip
+
+        batch = extract_excel_from_zip(zip_bytes, account, ActBatch(update_date))
+
+        logger.info(f"Аккаунт {account}: Обработано {len(batch.files)} Excel файлов")
+        INGEST_ROWS.labels("parsed").inc(len(batch))
+
+        return batch
+
+    def _replay_archives(self, replay_date: date) -> ActBatch:
+        """
+        Повторный парсинг сохранённых архивов за дату без обращения к WB API
+        """
+        data_for_insert = ActBatch(date.today())
+
+        for meta in self.artifact_store.index(
+            begin_date=replay_date, end_date=replay_date
+        ):
+            try:
+                with self.artifact_store.open_mmap(meta.path) as mapped:
+                    data_for_insert.extend(
+                        self._parse_account_archive(
+                            meta.account, mapped, data_for_insert.created_at
+                        )
+                    )
+            except Exception as error:
+                logger.error(
+                    f"Аккаунт {meta.account}: Ошибка обработки архива {meta.path} {error}"
+                )
+
+        return data_for_insert
+
+    async def extract_and_parce_excel(
+        self, replay_date: date | None = None
+    ) -> ActBatch | int:
+        """
+        :param replay_date: дата сохранённых архивов для повторного парсинга.
+            Если указана, WB API не вызывается.
+        """
+        if replay_date is not None:
+            return self._replay_archives(replay_date)
+
         documents_dict = await self.download_documents()
-        all_data = []
         update_date = date.today()
+        data_for_insert = ActBatch(update_date)
+        document_date = update_date - timedelta(days=1)
 
         for account, base64_string in documents_dict.items():
             if base64_string is None:
@@ -58,229 +156,672 @@ class DocumentsService:
 
             try:
                 zip_bytes = base64.b64decode(base64_string)
-                account_data_list = extract_excel_from_zip(zip_bytes)
-
-                for item in account_data_list:
-                    item["account"] = account
-                    all_data.append(item)
-
-                logger.info(
-                    f"Аккаунт {account}: Обработано {len(account_data_list)} Excel файлов"
+                try:
+                    self.artifact_store.write(account, document_date, zip_bytes)
+                except OSError as error:
+                    logger.error(f"Аккаунт {account}: Ошибка сохранения архива {error}")
+                data_for_insert.extend(
+                    self._parse_account_archive(account, zip_bytes, update_date)
                 )
             except Exception as error:
                 logger.error(f"Аккаунт {account}: Ошибка обработки архива {error}")
 
-        data_for_insert = [
-            (
-                str(order_data["order_id"]),
-                str(order_data["sticker"]),
-                int(order_data["count"]),
-                f"act-income-mp-{item['supply_id'].split('-')[-1]}.zip",
-                item["supply_id"].split("-")[-1],
-                date.fromisoformat(item["date"]),
-                item["account"],
-                update_date,
-            )
-            for item in all_data
-            for order_data in item["data"]
-        ]
         return data_for_insert
 
-    async def _sync_update_acceptance_certificates(self) -> None | int:
-        fresh_data = await self.extract_and_parce_excel()
+    async def _sync_update_acceptance_certificates(
+        self, replay_date: date | None = None
+    ) -> None | int:
+        fresh_data = await self.extract_and_parce_excel(replay_date=replay_date)
 
-        if isinstance(fresh_data, list) and len(fresh_data) > 0:
-            await self.documents_repository.update_acceptance_certificates(fresh_data)
+        if isinstance(fresh_data, ActBatch) and len(fresh_data) > 0:
+            await self._insert_certificates(fresh_data)
             return None
         if isinstance(fresh_data, int):
             return fresh_data
         return None
 
-    async def get_document_number_and_supply_id(self) -> list[DocumentDataForValidate]:
+    @staticmethod
+    async def _report(
+        progress: IngestProgress | None, account: str, **fields: Any
+    ) -> None:
+        if progress is not None:
+            await progress.update_account(account, **fields)
+
+    @staticmethod
+    async def _circuit_state(
+        circuit_breakers: CircuitBreakerRegistry | None, account: str
+    ) -> CircuitState | None:
+        if circuit_breakers is None:
+            return None
+        return await circuit_breakers.account_state(account)
+
+    @staticmethod
+    async def download_account_archive(
+        account: str,
+        token: str,
+        store: ArtifactStore,
+        progress: IngestProgress | None = None,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+    ) -> AccountIngestOutcome:
         """
-        Метод для получения ID поставок по дате формирования акта и имени аккаунта ДЛЯ ВСЕХ АККАУНТОВ
+        Стадия загрузки: скачивание архива актов ОДНОГО аккаунта в хранилище артефактов
         """
-        data = get_tokens()
-        date_for_query = datetime.now() - timedelta(days=1)
-        tasks = []
-        for account in data.keys():
-            task = self.documents_repository.get_document_number_and_supply_id(
-                document_date=date_for_query, account=account
+        report = DocumentsService._report
+        metrics = IngestRunMetrics()
+        try:
+            await report(progress, account, stage=IngestStage.LISTING)
+            documents_api = Documents(
+                account=account, token=token, circuit_breakers=circuit_breakers
+            )
+            started = time.perf_counter()
+            documents = await documents_api._get_documents_by_fbs()
+            metrics.list_seconds = time.perf_counter() - started
+            await report(
+                progress,
+                account,
+                stage=IngestStage.DOWNLOADING,
+                documents_listed=len(documents),
+            )
+            started = time.perf_counter()
+            base64_string = await documents_api.download_documents(documents)
+            metrics.download_seconds = time.perf_counter() - started
+        except Exception as error:
+            logger.error(f"Аккаунт {account}: Ошибка загрузки актов {error}")
+            await report(
+                progress, account, status=IngestStatus.WB_API_FAIL, error=repr(error)
+            )
+            return AccountIngestOutcome(
+                account=account,
+                status=IngestStatus.WB_API_FAIL,
+                error=repr(error),
+                error_class=type(error).__name__,
+                circuit_state=await DocumentsService._circuit_state(
+                    circuit_breakers, account
+                ),
+                metrics=metrics,
             )
-            tasks.append(task)
-
-        records = await asyncio.gather(*tasks, return_exceptions=True)
 
-        valid_records = []
-        for account, result in zip(data.keys(), records, strict=False):
-            if isinstance(result, Exception):
-                logger.error(
-                    f"Ошибка в получении данных из акта для аккаунта {account}: {result}"
-                )
-            elif isinstance(result, list):
-                valid_records.extend(result)
-            elif isinstance(result, dict):
-                valid_records.append(result)
-
-        return [
-            DocumentDataForValidate(
-                account=record.get("account"),
-                document_number=record.get("document_number"),
-                document_date=record.get("date"),
-                supply_id=f"WB-GI-{record.get('document_number')}",
+        try:
+            started = time.perf_counter()
+            archive_bytes = base64.b64decode(base64_string)
+            metrics.decode_seconds = time.perf_counter() - started
+            metrics.bytes_downloaded = len(archive_bytes)
+            artifact_path = store.write(
+                account=account,
+                document_date=date.today() - timedelta(days=1),
+                archive_bytes=archive_bytes,
+            )
+        except Exception as error:
+            logger.error(f"Аккаунт {account}: Ошибка сохранения архива {error}")
+            await report(
+                progress,
+                account,
+                status=IngestStatus.INNER_METHOD_FAIL,
+                error=repr(error),
+            )
+            return AccountIngestOutcome(
+                account=account,
+                status=IngestStatus.INNER_METHOD_FAIL,
+                error=repr(error),
+                error_class=type(error).__name__,
+                metrics=metrics,
             )
-            for record in valid_records
-        ]
 
-    async def validate_orders(
-        self, documents_data: list[DocumentDataForValidate]
-    ) -> None:
-        logger.info("Выполнение валидации акта приёма передачи")
-        tasks = []
-        task_info = []
-        for document in documents_data:
-            task = self.documents_repository.validate_orders(
-                account=document.account,
-                document_number=document.document_number,
-                document_date=document.document_date,
-                supply_id=document.supply_id,
+        await report(
+            progress, account, stage=IngestStage.DOWNLOADED, downloaded=len(documents)
+        )
+        return AccountIngestOutcome(
+            account=account,
+            status=IngestStatus.SUCCESS,
+            artifact_path=str(artifact_path),
+            circuit_state=await DocumentsService._circuit_state(
+                circuit_breakers, account
+            ),
+            metrics=metrics,
+        )
+
+    async def ingest_account_archive(
+        self,
+        account: str,
+        artifact_path: str,
+        store: ArtifactStore,
+        progress: IngestProgress | None = None,
+        metrics: IngestRunMetrics | None = None,
+    ) -> AccountIngestOutcome:
+        """
+        Стадия парсинга и записи: чтение архива из хранилища артефактов и запись в БД
+
+        :param metrics: метрики стадии загрузки, дополняются метриками этой стадии
+        """
+        metrics = metrics.model_copy() if metrics else IngestRunMetrics()
+        try:
+            await self._report(progress, account, stage=IngestStage.PARSING)
+            batch = self._parse_account_archive(
+                account, store.read(artifact_path), date.today()
+            )
+        except Exception as error:
+            logger.error(f"Аккаунт {account}: Ошибка обработки архива {error}")
+            await self._report(
+                progress,
+                account,
+                status=IngestStatus.INNER_METHOD_FAIL,
+                error=repr(error),
             )
-            tasks.append(task)
-            task_info.append((document.account, document.document_number))
+            return AccountIngestOutcome(
+                account=account,
+                status=IngestStatus.INNER_METHOD_FAIL,
+                error=repr(error),
+                error_class=type(error).__name__,
+                artifact_path=artifact_path,
+                metrics=metrics,
+            )
+        metrics.unzip_seconds = batch.unzip_seconds
+        metrics.parse_seconds = batch.parse_seconds
+        metrics.workbooks = batch.workbooks
+        metrics.rows_parsed = len(batch)
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        await self._report(
+            progress, account, stage=IngestStage.INSERTING, rows_parsed=len(batch)
+        )
+        if len(batch):
+            started = time.perf_counter()
+            (
+                metrics.rows_inserted,
+                metrics.rows_conflicted,
+            ) = await self._insert_certificates(batch)
+            metrics.insert_seconds = time.perf_counter() - started
+        await self._report(
+            progress,
+            account,
+            stage=IngestStage.DONE,
+            rows_inserted=metrics.rows_inserted,
+            status=IngestStatus.SUCCESS,
+        )
 
-        for (account, document_number), result in zip(task_info, results, strict=False):
-            if isinstance(result, Exception):
-                logger.error(
-                    f"Аккаунт: {account}. Ошибка в валидации акта {document_number}: {result}"
-                )
-            elif isinstance(result, list):
-                for record in result:
-                    if record.get("sets_are_equal"):
-                        logger.info(
-                            f"Аккаунт: {account}, акт {document_number} валиден"
-                        )
-                    elif not record.get("sets_are_equal"):
-                        logger.info(
-                            f"Аккаунт: {account}, акт {document_number} РАСХОЖДЕНИЯ!\n"
-                            f"Количество сборочных заданий в нашей базе данных: {record.get('only_in_our_service')}.\n"
-                            f"Количество сборочных заданий в актах: {record.get('only_in_acts')}.\n"
-                        )
+        return AccountIngestOutcome(
+            account=account,
+            status=IngestStatus.SUCCESS,
+            row_count=len(batch),
+            artifact_path=artifact_path,
+            metrics=metrics,
+        )
+
+    async def update_account_acceptance_certificates(
+        self,
+        account: str,
+        token: str,
+        store: ArtifactStore,
+        progress: IngestProgress | None = None,
+    ) -> AccountIngestOutcome:
+        """
+        Загрузка, парсинг и запись актов приёма передачи ОДНОГО аккаунта
+        """
+        downloaded = await self.download_account_archive(
+            account, token, store, progress, self.circuit_breakers
+        )
+        if downloaded.status != IngestStatus.SUCCESS or not downloaded.artifact_path:
+            return downloaded
+        return await self.ingest_account_archive(
+            account, downloaded.artifact_path, store, progress, downloaded.metrics
+        )
 
 
-@celery_app.task(name="update_acceptance_certificates_task")
-def auto_update_acceptance_certificates() -> None:
+def _run_async(coroutine: Coroutine[Any, Any, T]) -> T:
+    try:
+        loop = asyncio.get_event_loop()
+        if loop.is_closed():
+            raise RuntimeError("Event loop is closed")
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coroutine)
+
+
+def _create_pool_manager() -> DatabasePoolManager:
+    return DatabasePoolManager(
+        user=get_settings().POSTGRES_USER,
+        password=get_settings().POSTGRES_PASSWORD,
+        db=get_settings().POSTGRES_DB,
+        host=get_settings().POSTGRES_HOST,
+        port=get_settings().POSTGRES_PORT,
+        pool_size=get_settings().POOL_SIZE,
+        name="celery",
+    )
+
+
+def _create_cache(redis_client: Redis) -> RedisCache:
+    return RedisCache(client=redis_client, ttl=get_settings().CACHE_TTL)
+
+
+def _create_lease(redis_client: Redis) -> IngestLease:
+    return IngestLease(
+        client=redis_client,
+        ttl=get_settings().INGEST_LEASE_TTL,
+        poll_interval=get_settings().INGEST_LEASE_POLL_INTERVAL,
+        result_ttl=get_settings().INGEST_LEASE_RESULT_TTL,
+    )
+
+
+def _healthcheck_status_from_outcomes(
+    outcomes: list[AccountIngestOutcome],
+) -> HealthcheckStatus:
+    statuses = {outcome.status for outcome in outcomes}
+    circuit_states = {outcome.circuit_state for outcome in outcomes}
+    if CircuitState.OPEN in circuit_states or IngestStatus.WB_API_FAIL in statuses:
+        return HealthcheckStatus.WB_API_FAIL
+    if statuses <= {IngestStatus.SUCCESS}:
+        return HealthcheckStatus.SUCCESS
+    return HealthcheckStatus.INNER_METHOD_FAIL
+
+
+@celery_app.task(name="update_acceptance_certificates_task", bind=True)
+def auto_update_acceptance_certificates(self: Task) -> None:
+    """
+    Периодическая задача обновления актов: на каждый аккаунт запускается цепочка
+    download -> ingest (chord), результат агрегируется в aggregate_acceptance_certificates_task.
+    ID этой задачи - ID задания, по которому читается прогресс.
+    """
     try:
         logger.info("Выполнение периодической задачи обновления актов приема передачи")
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                raise RuntimeError("Event loop is closed")
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_update_acceptance_certificates_async())
+        _dispatch_account_ingest(list(get_tokens().keys()), job_id=self.request.id)
     except Exception as error:
         logger.error(
             f"Ошибка в выполнении периодической задачи обновления актов приема передачи: {error}"
         )
 
 
-async def _update_acceptance_certificates_async() -> None:
-    from src.settings import get_settings
+async def _set_job_state(
+    job_id: str,
+    state: IngestJobState,
+    accounts: list[str] | None = None,
+    result: str | None = None,
+) -> None:
+    redis_client = create_redis_client()
+    try:
+        await IngestProgress(redis_client, job_id).set_state(
+            state, accounts=accounts, result=result
+        )
+    finally:
+        await redis_client.aclose()
+
+
+def _dispatch_account_ingest(accounts: list[str], job_id: str | None = None) -> str:
+    """Запуск chord из синхронной Celery-задачи"""
+    return _run_async(_dispatch_account_ingest_async(accounts, job_id))
+
+
+async def _dispatch_account_ingest_async(
+    accounts: list[str], job_id: str | None = None
+) -> str:
+    """Запуск chord из корутины, уже выполняемой через _run_async"""
+    job_id = job_id or str(uuid.uuid4())
+    await _set_job_state(job_id, IngestJobState.RUNNING, accounts=accounts)
+    chord(
+        download_account_documents.s(account, job_id=job_id)
+        | ingest_account_documents.s(job_id=job_id)
+        for account in accounts
+    )(aggregate_acceptance_certificates.s(job_id=job_id))
+    return job_id
+
+
+def _retry_failed_stage(task: Task, outcome: AccountIngestOutcome) -> None:
+    if (
+        outcome.status != IngestStatus.SUCCESS
+        and task.request.retries < task.max_retries
+    ):
+        logger.warning(
+            f"Аккаунт {outcome.account}: {outcome.status.value} в задаче {task.name}, "
+            f"повторная попытка {task.request.retries + 1}"
+        )
+        raise task.retry()
+
+
+@celery_app.task(
+    name="download_account_documents_task",
+    bind=True,
+    max_retries=get_settings().INGEST_ACCOUNT_MAX_RETRIES,
+    default_retry_delay=get_settings().INGEST_ACCOUNT_RETRY_DELAY,
+)
+def download_account_documents(
+    self: Task, account: str, job_id: str | None = None
+) -> dict[str, Any]:
+    logger.info(f"Аккаунт {account}: загрузка актов приема передачи")
+    outcome = _run_async(_download_account_documents_async(account, job_id))
+    _retry_failed_stage(self, outcome)
+    return outcome.model_dump(mode="json")
+
+
+async def _download_account_documents_async(
+    account: str, job_id: str | None
+) -> AccountIngestOutcome:
+    token = get_tokens().get(account)
+    if token is None:
+        return AccountIngestOutcome(
+            account=account,
+            status=IngestStatus.INNER_METHOD_FAIL,
+            error="Токен аккаунта не найден",
+            error_class="KeyError",
+        )
 
-    pool = None
+    # стадия загрузки не обращается к БД, пул соединений не создаётся
+    redis_client = create_redis_client()
     try:
-        pool = DatabasePoolManager(
-            user=get_settings().POSTGRES_USER,
-            password=get_settings().POSTGRES_PASSWORD,
-            db=get_settings().POSTGRES_DB,
-            host=get_settings().POSTGRES_HOST,
-            port=get_settings().POSTGRES_PORT,
-            pool_size=get_settings().POOL_SIZE,
+        # параллельный запуск того же аккаунта за ту же дату не скачивает архив повторно
+        return await _create_lease(redis_client).run(
+            stage="download",
+            account=account,
+            ingest_date=date.today(),
+            work=lambda: DocumentsService.download_account_archive(
+                account=account,
+                token=token,
+                store=ArtifactStore(get_settings().ARTIFACTS_DIR),
+                progress=IngestProgress(redis_client, job_id) if job_id else None,
+                circuit_breakers=CircuitBreakerRegistry(redis_client),
+            ),
         )
+    finally:
+        await redis_client.aclose()
+
+
+@celery_app.task(
+    name="ingest_account_documents_task",
+    bind=True,
+    max_retries=get_settings().INGEST_ACCOUNT_MAX_RETRIES,
+    default_retry_delay=get_settings().INGEST_ACCOUNT_RETRY_DELAY,
+)
+def ingest_account_documents(
+    self: Task, downloaded: dict[str, Any], job_id: str | None = None
+) -> dict[str, Any]:
+    download_outcome = AccountIngestOutcome.model_validate(downloaded)
+    if (
+        download_outcome.status != IngestStatus.SUCCESS
+        or not download_outcome.artifact_path
+    ):
+        return download_outcome.model_dump(mode="json")
+
+    logger.info(f"Аккаунт {download_outcome.account}: парсинг и запись актов")
+    outcome = _run_async(
+        _ingest_account_documents_async(
+            download_outcome.account,
+            download_outcome.artifact_path,
+            job_id,
+            download_outcome.metrics,
+        )
+    ).model_copy(update={"circuit_state": download_outcome.circuit_state})
+    _retry_failed_stage(self, outcome)
+    return outcome.model_dump(mode="json")
+
 
+async def _ingest_account_documents_async(
+    account: str,
+    artifact_path: str,
+    job_id: str | None,
+    metrics: IngestRunMetrics | None = None,
+) -> AccountIngestOutcome:
+    pool = None
+    redis_client = create_redis_client()
+    try:
+        pool = _create_pool_manager()
         await pool.create_pool()
 
         document_service = DocumentsService(pool)
-        await document_service._sync_update_acceptance_certificates()
+        return await _create_lease(redis_client).run(
+            stage="ingest",
+            account=account,
+            ingest_date=date.today(),
+            work=lambda: document_service.ingest_account_archive(
+                account=account,
+                artifact_path=artifact_path,
+                store=ArtifactStore(get_settings().ARTIFACTS_DIR),
+                progress=IngestProgress(redis_client, job_id) if job_id else None,
+                metrics=metrics,
+            ),
+        )
     except Exception as error:
-        logger.error(
-            f"Ошибка в выполнении периодической задачи обновления актов приема передачи: {error}"
+        logger.error(f"Аккаунт {account}: Ошибка записи актов: {error}")
+        return AccountIngestOutcome(
+            account=account,
+            status=IngestStatus.INNER_METHOD_FAIL,
+            error=repr(error),
+            error_class=type(error).__name__,
+            artifact_path=artifact_path,
+            metrics=metrics or IngestRunMetrics(),
+        )
+    finally:
+        if pool:
+            await pool.close()
+        await redis_client.aclose()
+
+
+@celery_app.task(name="aggregate_acceptance_certificates_task")
+def aggregate_acceptance_certificates(
+    outcomes: list[dict[str, Any]], job_id: str | None = None
+) -> str:
+    try:
+        healthcheck_status = _run_async(
+            _aggregate_acceptance_certificates_async(
+                [AccountIngestOutcome.model_validate(outcome) for outcome in outcomes],
+                job_id=job_id,
+            )
+        )
+        if job_id:
+            _run_async(
+                _set_job_state(
+                    job_id, IngestJobState.FINISHED, result=healthcheck_status
+                )
+            )
+        return healthcheck_status
+    except Exception as error:
+        logger.error(f"Ошибка агрегации результатов обновления актов: {error}")
+        raise
+
+
+async def _aggregate_acceptance_certificates_async(
+    outcomes: list[AccountIngestOutcome], job_id: str | None = None
+) -> str:
+    for outcome in outcomes:
+        if outcome.status == IngestStatus.SUCCESS:
+            logger.info(
+                f"Аккаунт {outcome.account}: записано строк {outcome.row_count}"
+            )
+        else:
+            logger.error(
+                f"Аккаунт {outcome.account}: {outcome.status.value}. {outcome.error}"
+            )
+
+    healthcheck_status = _healthcheck_status_from_outcomes(outcomes)
+
+    pool = _create_pool_manager()
+    try:
+        await pool.create_pool()
+        ingest_service = IngestService(repository=IngestRepository(database=pool))
+        await ingest_service.record_outcomes(
+            outcomes=outcomes, ingest_date=date.today()
+        )
+        await ingest_service.record_runs(
+            job_id=job_id or str(uuid.uuid4()),
+            outcomes=outcomes,
+            ingest_date=date.today(),
+        )
+        healthcheck_service = HealthcheckService(
+            repository=HealthcheckRepository(database=pool)
+        )
+        await healthcheck_service.update_healthcheck_status(
+            status_data=healthcheck_status.result
+        )
+    finally:
+        await pool.close()
+
+    # результаты валидации пересчитываются по новым строкам актов, затем обновляется кэш
+    auto_validate_orders.delay()
+
+    return healthcheck_status.name
+
+
+@celery_app.task(name="warm_cache_task")
+def warm_cache() -> None:
+    try:
+        _run_async(_warm_cache_async())
+    except Exception as error:
+        logger.error(f"Ошибка обновления кэша: {error}")
+
+
+async def _warm_cache_async() -> None:
+    pool = None
+    redis_client = create_redis_client()
+    try:
+        pool = _create_pool_manager()
+        await pool.create_pool()
+
+        document_service = DocumentService(
+            repository=DocumentsRepository(pool), cache=_create_cache(redis_client)
         )
+        await document_service.warm_cache()
     finally:
         if pool:
             await pool.close()
+        await redis_client.aclose()
+
+
+@celery_app.task(name="refresh_not_confirmed_task")
+def refresh_not_confirmed() -> None:
+    try:
+        _run_async(_refresh_not_confirmed_async())
+    except Exception as error:
+        logger.error(f"Ошибка обновления таблицы СЗ без акта: {error}")
+
+
+async def _refresh_not_confirmed_async() -> None:
+    pool = None
+    redis_client = create_redis_client()
+    try:
+        pool = _create_pool_manager()
+        await pool.create_pool()
+
+        document_service = DocumentService(
+            repository=DocumentsRepository(pool), cache=_create_cache(redis_client)
+        )
+        await document_service.refresh_not_confirmed()
+    finally:
+        if pool:
+            await pool.close()
+        await redis_client.aclose()
+
+
+@celery_app.task(name="replay_acceptance_certificates_task")
+def replay_acceptance_certificates(begin_date: str, end_date: str) -> None:
+    """
+    Повторный парсинг и запись сохранённых архивов за период (ГГГГ-ММ-ДД) без WB API
+    """
+    try:
+        logger.info(f"Повторная обработка архивов актов за {begin_date} - {end_date}")
+        _run_async(
+            _replay_acceptance_certificates_async(
+                date.fromisoformat(begin_date), date.fromisoformat(end_date)
+            )
+        )
+    except Exception as error:
+        logger.error(f"Ошибка повторной обработки архивов актов: {error}")
+
+
+async def _replay_acceptance_certificates_async(
+    begin_date: date, end_date: date
+) -> None:
+    pool = None
+    try:
+        pool = _create_pool_manager()
+        await pool.create_pool()
+
+        document_service = DocumentsService(pool)
+        replay_date = begin_date
+        while replay_date <= end_date:
+            await document_service._sync_update_acceptance_certificates(
+                replay_date=replay_date
+            )
+            replay_date += timedelta(days=1)
+        auto_validate_orders.delay(begin_date.isoformat(), end_date.isoformat())
+    finally:
+        if pool:
+            await pool.close()
+
+
+@celery_app.task(name="purge_artifacts_task")
+def purge_artifacts() -> None:
+    try:
+        ArtifactStore(get_settings().ARTIFACTS_DIR).purge_expired(
+            retention_days=get_settings().ARTIFACTS_RETENTION_DAYS
+        )
+    except Exception as error:
+        logger.error(f"Ошибка очистки хранилища архивов актов: {error}")
 
 
 @celery_app.task(name="healthcheck")
 def auto_healthcheck() -> None:
     try:
         logger.info("Выполнение healthcheck")
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                raise RuntimeError("Event loop is closed")
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_healthcheck())
+        _run_async(_healthcheck())
     except Exception as error:
         logger.error(f"Ошибка в выполнении healthcheck: {error}")
 
 
-async def _healthcheck() -> None:
-    from src.settings import get_settings
+async def _get_accounts_to_retry(pool: DatabasePoolManager) -> list[str]:
+    ingest_service = IngestService(repository=IngestRepository(database=pool))
+    return await ingest_service.get_accounts_to_retry(
+        accounts=get_tokens().keys(), ingest_date=date.today()
+    )
+
 
+async def _healthcheck() -> None:
     pool = None
+    redis_client = create_redis_client()
     try:
-        pool = DatabasePoolManager(
-            user=get_settings().POSTGRES_USER,
-            password=get_settings().POSTGRES_PASSWORD,
-            db=get_settings().POSTGRES_DB,
-            host=get_settings().POSTGRES_HOST,
-            port=get_settings().POSTGRES_PORT,
-            pool_size=get_settings().POOL_SIZE,
-        )
-
+        pool = _create_pool_manager()
         await pool.create_pool()
 
         healthcheck_repository = HealthcheckRepository(database=pool)
-        healthcheck_service = HealthcheckService(repository=healthcheck_repository)
-        document_service = DocumentsService(pool)
-
-        logger.info("Проверка пополнения таблицы acceptance_fbs_acts_new")
+        healthcheck_service = HealthcheckService(
+            repository=healthcheck_repository,
+            circuit_breakers=CircuitBreakerRegistry(redis_client),
+        )
 
-        data = await healthcheck_service.healthcheck()
-        if data:
-            logger.info("Проверка данных успешно завершена!")
-            status_data = HealthcheckStatus.SUCCESS.result
+        logger.info("Проверка результатов загрузки актов по аккаунтам")
+        try:
+            accounts_to_retry = await _get_accounts_to_retry(pool)
+        except Exception as error:
+            logger.error(f"Ошибка в работе сервиса: {error}!")
+            await healthcheck_service.update_healthcheck_status(
+                status_data=HealthcheckStatus.INNER_METHOD_FAIL.result
+            )
+            return
 
-        if not data:
+        if accounts_to_retry:
             logger.warning(
-                f"Данных за {(datetime.now() - timedelta(days=1)).strftime('%d-%m-%Y')} не найдено! Попытка обновить данные!"
+                f"Данных за {(datetime.now() - timedelta(days=1)).strftime('%d-%m-%Y')} "
+                f"нет для аккаунтов {accounts_to_retry}! Попытка обновить данные!"
             )
-            try:
-                another_try = (
-                    await document_service._sync_update_acceptance_certificates()
-                )
-                if another_try is not None:
-                    logger.warning(
-                        f"WB API статус: {another_try}! WB API работает не стабильно! Данные не целостны, запись в БД не будет произведена!"
-                    )
-                    status_data = HealthcheckStatus.WB_API_FAIL.result
-                if another_try is None:
-                    logger.info("Данные успешно обновлены!")
-                    status_data = HealthcheckStatus.SUCCESS.result
-            except Exception as error:
-                logger.error(
-                    f"Ошибка в работе сервиса: {error}! Данные не целостны, запись в БД не будет произведена!"
-                )
-                status_data = HealthcheckStatus.INNER_METHOD_FAIL.result
-
-        await healthcheck_service.update_healthcheck_status(status_data=status_data)
+            # статус healthcheck запишет aggregate_acceptance_certificates_task
+            await _dispatch_account_ingest_async(accounts_to_retry)
+            return
+
+        # данные загружены, но WB API сейчас отказывает: circuit открыт в любом процессе
+        open_accounts = [
+            account
+            for account in get_tokens().keys()
+            if await healthcheck_service.get_circuit_state(account) == CircuitState.OPEN
+        ]
+        if open_accounts:
+            logger.warning(
+                f"Circuit breaker WB API открыт для аккаунтов {open_accounts}"
+            )
+            await healthcheck_service.update_healthcheck_status(
+                status_data=HealthcheckStatus.WB_API_FAIL.result
+            )
+            return
 
+        logger.info("Проверка данных успешно завершена!")
+        await healthcheck_service.update_healthcheck_status(
+            status_data=HealthcheckStatus.SUCCESS.result
+        )
     except Exception as error:
         logger.error(
             f"Ошибка в выполнении периодической задачи обновления актов приема передачи: {error}"
@@ -288,49 +829,84 @@ async def _healthcheck() -> None:
     finally:
         if pool:
             await pool.close()
+        await redis_client.aclose()
+
+
+@celery_app.task(name="retry_failed_accounts_task")
+def retry_failed_accounts() -> list[str]:
+    """
+    Повторная загрузка актов только для аккаунтов с ошибкой или без результата за сегодня
+    """
+    try:
+        accounts_to_retry = _run_async(_retry_failed_accounts_async())
+        if accounts_to_retry:
+            logger.info(f"Повторная загрузка актов для аккаунтов {accounts_to_retry}")
+            _dispatch_account_ingest(accounts_to_retry)
+        return accounts_to_retry
+    except Exception as error:
+        logger.error(f"Ошибка повторной загрузки актов: {error}")
+        return []
+
+
+async def _retry_failed_accounts_async() -> list[str]:
+    pool = _create_pool_manager()
+    try:
+        await pool.create_pool()
+        return await _get_accounts_to_retry(pool)
+    finally:
+        await pool.close()
 
 
 @celery_app.task(name="validate_orders")
-def auto_validate_orders() -> None:
+def auto_validate_orders(
+    begin_date: str | None = None, end_date: str | None = None
+) -> None:
+    """
+    Валидация актов с записью результатов в acceptance_certificates_validation_results.
+    Без дат пересчитываются только изменённые акты, с датами (ГГГГ-ММ-ДД) - все
+    акты за период begin_date - end_date (end_date по умолчанию равен begin_date).
+    """
     try:
         logger.info("Выполнение автоматической валидации актов приёма передачи")
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                raise RuntimeError("Event loop is closed")
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(_validate_orders())
+        _run_async(
+            _validate_orders(
+                date.fromisoformat(begin_date) if begin_date else None,
+                date.fromisoformat(end_date) if end_date else None,
+            )
+        )
     except Exception as error:
         logger.error(
             f"Ошибка в выполнении автоматической валидации актов приёма передачи: {error}"
         )
 
 
-async def _validate_orders() -> None:
-    from src.settings import get_settings
-
+async def _validate_orders(begin_date: date | None, end_date: date | None) -> None:
     pool = None
     try:
-        pool = DatabasePoolManager(
-            user=get_settings().POSTGRES_USER,
-            password=get_settings().POSTGRES_PASSWORD,
-            db=get_settings().POSTGRES_DB,
-            host=get_settings().POSTGRES_HOST,
-            port=get_settings().POSTGRES_PORT,
-            pool_size=get_settings().POOL_SIZE,
-        )
+        pool = _create_pool_manager()
 
         await pool.create_pool()
 
-        document_service = DocumentsService(db=pool)
-        document_data = await document_service.get_document_number_and_supply_id()
-        await document_service.validate_orders(documents_data=document_data)
+        document_service = DocumentService(repository=DocumentsRepository(pool))
+        if begin_date is None:
+            await document_service.revalidate_dirty_acts()
+        else:
+            grouped = await document_service.store_validation_results(
+                begin_date, end_date
+            )
+            for act_date, results in grouped.items():
+                invalid = sum(not result.is_valid for result in results)
+                logger.info(
+                    f"Валидация актов за {act_date}: актов {len(results)}, с расхождениями {invalid}"
+                )
     except Exception as error:
         logger.error(
             f"Ошибка в выполнении периодической задачи валидации актов приема передачи: {error}"
         )
+        return
     finally:
         if pool:
             await pool.close()
+
+    # кэш /validated_order/status читается из таблицы результатов
+    warm_cache.delay()
@@ -0,0 +1,266 @@
+import uuid
+from enum import StrEnum
+from logging import getLogger
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.settings import get_settings
+
+logger = getLogger(__name__)
+
+# состояние breaker'а живёт сутки после последнего вызова
+BREAKER_STATE_TTL = 24 * 3600
+
+# общая часть скриптов: текущее время Redis и переход OPEN -> HALF_OPEN
+# по истечении cool_down (ARGV[1]). Время берётся у Redis, а не у процесса,
+# чтобы opened_at был согласован между воркерами и контейнерами
+_LOAD_STATE = """
+local now_parts = redis.call("TIME")
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cool_down = tonumber(ARGV[1])
+local state = redis.call("HGET", KEYS[1], "state") or "closed"
+local opened_at = tonumber(redis.call("HGET", KEYS[1], "opened_at") or "0")
+if state == "open" and now - opened_at >= cool_down then
+    state = "half_open"
+    redis.call("HSET", KEYS[1], "state", state, "probe", "", "probe_until", "0")
+end
+"""
+
+# ARGV: cool_down, токен пробы, время удержания пробы.
+# Возвращает {1, токен пробы или ""} - вызов разрешён, {0, retry_after} - нет
+_BEFORE_CALL_SCRIPT = (
+    _LOAD_STATE
+    + """
+if state == "open" then
+    return {0, tostring(cool_down - (now - opened_at))}
+end
+if state == "half_open" then
+    local probe = redis.call("HGET", KEYS[1], "probe") or ""
+    local probe_until = tonumber(redis.call("HGET", KEYS[1], "probe_until") or "0")
+    if probe ~= "" and probe_until > now then
+        return {0, "0"}
+    end
+    redis.call("HSET", KEYS[1], "probe", ARGV[2], "probe_until", tostring(now + tonumber(ARGV[3])))
+    return {1, ARGV[2]}
+end
+return {1, ""}
+"""
+)
+
+# KEYS: hash breaker'а, множество endpoint'ов аккаунта.
+# ARGV: cool_down, "1"/"0" (успех/ошибка), window_size, minimum_calls,
+# failure_rate_threshold, TTL, endpoint. Возвращает {состояние до, состояние после}
+_RECORD_SCRIPT = (
+    _LOAD_STATE
+    + """
+local previous = state
+local window = redis.call("HGET", KEYS[1], "window") or ""
+local window_size = tonumber(ARGV[3])
+if ARGV[2] == "1" then
+    if state == "half_open" then
+        state = "closed"
+        window = ""
+    end
+    window = string.sub(window .. "1", -window_size)
+else
+    if state == "half_open" then
+        state = "open"
+        opened_at = now
+    else
+        window = string.sub(window .. "0", -window_size)
+        local _, failures = string.gsub(window, "0", "")
+        if state == "closed" and #window >= tonumber(ARGV[4])
+            and failures / #window >= tonumber(ARGV[5]) then
+            state = "open"
+            opened_at = now
+        end
+    end
+end
+if state ~= previous then
+    redis.call("HSET", KEYS[1], "probe", "", "probe_until", "0")
+end
+redis.call("HSET", KEYS[1], "state", state, "opened_at", tostring(opened_at), "window", window)
+redis.call("EXPIRE", KEYS[1], ARGV[6])
+redis.call("SADD", KEYS[2], ARGV[7])
+redis.call("EXPIRE", KEYS[2], ARGV[6])
+return {previous, state}
+"""
+)
+
+# снятие пробы только её владельцем
+_RELEASE_PROBE_SCRIPT = """
+if redis.call("HGET", KEYS[1], "probe") == ARGV[1] then
+    redis.call("HSET", KEYS[1], "probe", "", "probe_until", "0")
+    return 1
+end
+return 0
+"""
+
+_STATE_SCRIPT = (
+    _LOAD_STATE
+    + """
+return state
+"""
+)
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit breaker {name} открыт, повтор через {retry_after:.0f} с"
+        )
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker со скользящим окном последних вызовов, общий для всех
+    процессов: состояние, окно и opened_at хранятся в hash Redis
+    circuit_breaker:<аккаунт>:<endpoint> и меняются Lua-скриптами атомарно.
+    Поэтому ретрай стадии в другом prefork-процессе или контейнере видит
+    открытый circuit и не повторяет все попытки.
+
+    CLOSED -> OPEN: доля ошибок в окне >= failure_rate_threshold (при >= minimum_calls).
+    OPEN -> HALF_OPEN: по истечении cool_down секунд.
+    HALF_OPEN -> CLOSED: успешный пробный вызов; HALF_OPEN -> OPEN: ошибка пробного вызова.
+
+    При недоступности Redis вызовы выполняются без breaker'а.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        account: str,
+        endpoint: str,
+        failure_rate_threshold: float,
+        minimum_calls: int,
+        window_size: int,
+        cool_down: float,
+    ) -> None:
+        self.client = client
+        self.name = f"{account}:{endpoint}"
+        self.endpoint = endpoint
+        self.key = f"circuit_breaker:{self.name}"
+        self.endpoints_key = f"circuit_breaker:endpoints:{account}"
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_size = window_size
+        self.cool_down = cool_down
+
+    async def state(self) -> CircuitState:
+        try:
+            state = await self.client.eval(_STATE_SCRIPT, 1, self.key, self.cool_down)
+        except RedisError as error:
+            logger.error(f"Ошибка чтения circuit breaker {self.name}: {error}")
+            return CircuitState.CLOSED
+        return CircuitState(_decode(state))
+
+    async def before_call(self) -> str | None:
+        """
+        Проверка перед вызовом: при открытом circuit поднимается CircuitOpenError.
+        :return: токен пробного вызова в HALF_OPEN - передаётся в release_probe
+        """
+        token = uuid.uuid4().hex
+        try:
+            allowed, value = await self.client.eval(
+                _BEFORE_CALL_SCRIPT, 1, self.key, self.cool_down, token, self.cool_down
+            )
+        except RedisError as error:
+            logger.error(f"Ошибка чтения circuit breaker {self.name}: {error}")
+            return None
+        if not int(allowed):
+            raise CircuitOpenError(self.name, float(_decode(value)))
+        return _decode(value) or None
+
+    async def release_probe(self, token: str | None) -> None:
+        """
+        Завершение попытки после record_success/record_failure или без них
+        (CancelledError при таймауте задачи или остановке воркера): иначе
+        HALF_OPEN отклонял бы вызовы, пока не истечёт удержание пробы
+        """
+        if token is None:
+            return
+        try:
+            await self.client.eval(_RELEASE_PROBE_SCRIPT, 1, self.key, token)
+        except RedisError as error:
+            logger.error(f"Ошибка снятия пробы circuit breaker {self.name}: {error}")
+
+    async def _record(self, success: bool) -> None:
+        try:
+            previous, state = await self.client.eval(
+                _RECORD_SCRIPT,
+                2,
+                self.key,
+                self.endpoints_key,
+                self.cool_down,
+                "1" if success else "0",
+                self.window_size,
+                self.minimum_calls,
+                self.failure_rate_threshold,
+                BREAKER_STATE_TTL,
+                self.endpoint,
+            )
+        except RedisError as error:
+            logger.error(f"Ошибка записи circuit breaker {self.name}: {error}")
+            return
+        if previous != state:
+            logger.warning(
+                f"Circuit breaker {self.name}: {_decode(previous)} -> {_decode(state)}"
+            )
+
+    async def record_success(self) -> None:
+        await self._record(success=True)
+
+    async def record_failure(self) -> None:
+        await self._record(success=False)
+
+
+class CircuitBreakerRegistry:
+    """Circuit breaker'ы по ключу (аккаунт, endpoint) поверх общего клиента Redis."""
+
+    def __init__(self, client: Redis) -> None:
+        self.client = client
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, account: str, endpoint: str) -> CircuitBreaker:
+        key = (account, endpoint)
+        if key not in self._breakers:
+            self._breakers[key] = CircuitBreaker(
+                client=self.client,
+                account=account,
+                endpoint=endpoint,
+                failure_rate_threshold=get_settings().CIRCUIT_BREAKER_FAILURE_RATE,
+                minimum_calls=get_settings().CIRCUIT_BREAKER_MINIMUM_CALLS,
+                window_size=get_settings().CIRCUIT_BREAKER_WINDOW_SIZE,
+                cool_down=get_settings().CIRCUIT_BREAKER_COOL_DOWN,
+            )
+        return self._breakers[key]
+
+    async def account_state(self, account: str) -> CircuitState:
+        """Наихудшее состояние среди endpoint'ов аккаунта по всем процессам."""
+        try:
+            endpoints = await self.client.smembers(
+                f"circuit_breaker:endpoints:{account}"
+            )
+        except RedisError as error:
+            logger.error(f"Ошибка чтения circuit breaker'ов {account}: {error}")
+            return CircuitState.CLOSED
+        states = {
+            await self.get(account, _decode(endpoint)).state() for endpoint in endpoints
+        }
+        for state in (CircuitState.OPEN, CircuitState.HALF_OPEN):
+            if state in states:
+                return state
+        return CircuitState.CLOSED
@@ -1,18 +1,68 @@
-from collections.abc import AsyncGenerator
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from logging import getLogger
 from typing import Any
 
 import asyncpg
 
+from src.cache.redis_cache import create_redis_client
+from src.dependencies.slow_query_log import SlowQueryLog
+from src.metrics.registry import (
+    DB_POOL_ACQUIRE_TIMEOUTS,
+    DB_POOL_ACQUIRE_WAIT,
+    DB_POOL_CONNECTIONS,
+    DB_POOL_HOLD,
+)
 from src.settings import get_settings
 from src.utils.decorators import error_handler
 
+logger = getLogger(__name__)
+
+
+# вызывающий метод репозитория для статистики удержания соединений;
+# устанавливается декоратором instrument_repository
+db_caller: ContextVar[str] = ContextVar("db_caller", default="unknown")
+
+
+@dataclass
+class CallerHoldStats:
+    acquires: int = 0
+    hold_seconds_total: float = 0.0
+    hold_seconds_max: float = 0.0
+
+
+@dataclass
+class PoolStats:
+    name: str
+    min_size: int
+    max_size: int
+    size: int
+    in_use: int
+    idle: int
+    waiting: int
+    acquires: int
+    acquire_timeouts: int
+    acquire_wait_seconds_total: float
+    acquire_wait_seconds_max: float
+    slow_acquires: int
+    callers: dict[str, CallerHoldStats] = field(default_factory=dict)
+
 
 class DatabasePoolManager:
     """Класс для управления пулом соединений."""
 
     def __init__(
-        self, user: str, password: str, db: str, host: str, port: int, pool_size: int
+        self,
+        user: str,
+        password: str,
+        db: str,
+        host: str,
+        port: int,
+        pool_size: int,
+        name: str = "default",
     ) -> None:
         self._user = user
         self._password = password
@@ -20,8 +70,20 @@ class DatabasePoolManager:
         self._port = port
         self._database = db
         self.pool_size = pool_size
+        self.name = name
         self.dsn = f"postgres://{self._user}:{self._password}@{self._host}:{self._port}/{self._database}"
         self.pool: asyncpg.pool.Pool | None = None
+        self.slow_query_log: SlowQueryLog | None = None
+
+        self.acquire_timeout = get_settings().POOL_ACQUIRE_TIMEOUT
+        self.acquire_warn_seconds = get_settings().POOL_ACQUIRE_WARN_SECONDS
+        self._waiting = 0
+        self._acquires = 0
+        self._acquire_timeouts = 0
+        self._slow_acquires = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._callers: dict[str, CallerHoldStats] = {}
 
     async def create_pool(self) -> asyncpg.pool.Pool:
         """Создание пула соединений."""
@@ -29,20 +91,113 @@ class DatabasePoolManager:
             self.pool = await asyncpg.pool.create_pool(
                 dsn=self.dsn, min_size=self.pool_size, max_size=self.pool_size + 15
             )
+            self.slow_query_log = SlowQueryLog(create_redis_client())
         return self.pool
 
     async def close(self) -> None:
+        if self.slow_query_log:
+            await self.slow_query_log.close()
+            self.slow_query_log = None
         if self.pool:
             await self.pool.close()
             self.pool = None
 
+    def _report_connections(self) -> None:
+        assert self.pool is not None
+        idle = self.pool.get_idle_size()
+        DB_POOL_CONNECTIONS.labels(self.name, "in_use").set(self.pool.get_size() - idle)
+        DB_POOL_CONNECTIONS.labels(self.name, "idle").set(idle)
+        DB_POOL_CONNECTIONS.labels(self.name, "waiting").set(self._waiting)
+
+    def _record_wait(self, caller: str, wait: float) -> None:
+        self._acquires += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        DB_POOL_ACQUIRE_WAIT.labels(self.name).observe(wait)
+        if wait >= self.acquire_warn_seconds:
+            self._slow_acquires += 1
+            assert self.pool is not None
+            logger.warning(
+                f"Пул {self.name}: ожидание соединения {wait:.3f} с ({caller}), "
+                f"занято {self.pool.get_size() - self.pool.get_idle_size()}"
+                f"/{self.pool.get_max_size()}, в очереди {self._waiting}"
+            )
+
+    def _record_hold(self, caller: str, hold: float) -> None:
+        stats = self._callers.setdefault(caller, CallerHoldStats())
+        stats.acquires += 1
+        stats.hold_seconds_total += hold
+        stats.hold_seconds_max = max(stats.hold_seconds_max, hold)
+        DB_POOL_HOLD.labels(self.name, caller).observe(hold)
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncGenerator[asyncpg.Connection, None]:
+        """
+        Соединение из пула с учётом ожидания, удержания (по db_caller) и таймаутов
+        """
+        assert self.pool is not None
+        caller = db_caller.get()
+        self._waiting += 1
+        self._report_connections()
+        started = time.perf_counter()
+        try:
+            connection = await self.pool.acquire(timeout=self.acquire_timeout)
+        except TimeoutError:
+            self._acquire_timeouts += 1
+            DB_POOL_ACQUIRE_TIMEOUTS.labels(self.name).inc()
+            logger.error(
+                f"Пул {self.name}: соединение не получено за "
+                f"{self.acquire_timeout} с ({caller})"
+            )
+            raise
+        finally:
+            self._waiting -= 1
+        acquired = time.perf_counter()
+        self._record_wait(caller, acquired - started)
+        self._report_connections()
+        try:
+            yield connection
+        finally:
+            self._record_hold(caller, time.perf_counter() - acquired)
+            await self.pool.release(connection)
+            self._report_connections()
+
+    def _observe_query(self, query: str, args: tuple[Any, ...], started: float) -> None:
+        if self.slow_query_log is not None:
+            self.slow_query_log.observe(
+                self, db_caller.get(), query, args, time.perf_counter() - started
+            )
+
+    def stats(self) -> PoolStats:
+        """Текущее состояние пула и накопленная статистика процесса"""
+        size = self.pool.get_size() if self.pool else 0
+        idle = self.pool.get_idle_size() if self.pool else 0
+        return PoolStats(
+            name=self.name,
+            min_size=self.pool_size,
+            max_size=self.pool_size + 15,
+            size=size,
+            in_use=size - idle,
+            idle=idle,
+            waiting=self._waiting,
+            acquires=self._acquires,
+            acquire_timeouts=self._acquire_timeouts,
+            acquire_wait_seconds_total=self._wait_total,
+            acquire_wait_seconds_max=self._wait_max,
+            slow_acquires=self._slow_acquires,
+            callers={
+                caller: CallerHoldStats(**asdict(stats))
+                for caller, stats in self._callers.items()
+            },
+        )
+
     @asynccontextmanager
     async def connection(self) -> AsyncGenerator[asyncpg.Connection, None]:
         """Получение соединения из пула."""
         if not self.pool is not None:
             await self.create_pool()
         assert self.pool is not None
-        async with self.pool.acquire() as connection:
+        async with self._acquire() as connection:
             yield connection
 
     async def fetch(
@@ -50,24 +205,42 @@ class DatabasePoolManager:
     ) -> asyncpg.protocol.Record:
         """Выполнение запроса с возвратом множества значений."""
         assert self.pool is not None
-        async with self.pool.acquire() as connection:
-            return await connection.fetch(query, *args, **kwargs)
+        async with self._acquire() as connection:
+            started = time.perf_counter()
+            result = await connection.fetch(query, *args, **kwargs)
+            self._observe_query(query, args, started)
+            return result
 
     async def fetchrow(
         self, query: str, *args: Any, **kwargs: Any
     ) -> asyncpg.protocol.Record:
         assert self.pool is not None
-        async with self.pool.acquire() as connection:
-            return await connection.fetchrow(query, *args, **kwargs)
+        async with self._acquire() as connection:
+            started = time.perf_counter()
+            result = await connection.fetchrow(query, *args, **kwargs)
+            self._observe_query(query, args, started)
+            return result
 
     async def execute(self, query: str, *args: Any, **kwargs: Any) -> Any:
         assert self.pool is not None
-        async with self.pool.acquire() as connection:
-            return await connection.execute(query, *args, **kwargs)
+        async with self._acquire() as connection:
+            started = time.perf_counter()
+            result = await connection.execute(query, *args, **kwargs)
+            self._observe_query(query, args, started)
+            return result
+
+    async def cursor(
+        self, query: str, *args: Any, prefetch: int = 1000
+    ) -> AsyncIterator[asyncpg.Record]:
+        """Построчное чтение результата через серверный курсор (память не растёт)."""
+        assert self.pool is not None
+        async with self._acquire() as connection, connection.transaction():
+            async for record in connection.cursor(query, *args, prefetch=prefetch):
+                yield record
 
     async def executemany(self, query: str, *args: Any, **kwargs: Any) -> Any:
         assert self.pool is not None
-        async with self.pool.acquire() as connection:
+        async with self._acquire() as connection:
             return await connection.executemany(query, *args, **kwargs)
 
 
@@ -78,6 +251,7 @@ database_pool_manager = DatabasePoolManager(
     host=get_settings().POSTGRES_HOST,
     port=get_settings().POSTGRES_PORT,
     pool_size=get_settings().POOL_SIZE,
+    name="api",
 )
 
 celery_pool_manager = DatabasePoolManager(
@@ -87,6 +261,7 @@ celery_pool_manager = DatabasePoolManager(
     host=get_settings().POSTGRES_HOST,
     port=get_settings().POSTGRES_PORT,
     pool_size=get_settings().POOL_SIZE,
+    name="celery",
 )
 
 
@@ -1,8 +1,11 @@
 from typing import Any
 
 from fastapi import Depends, Request
+from redis.asyncio import Redis
 
+from src.circuit_breaker import CircuitBreakerRegistry
 from src.dependencies.database import DatabasePoolManager
+from src.dependencies.handle_trigger.update_acceptance_certificates import get_redis
 from src.healthcheck.repository import HealthcheckRepository
 from src.healthcheck.service import HealthcheckService
 
@@ -19,5 +22,8 @@ def get_healthcheck_repository(
 
 def get_healthcheck_service(
     repository: HealthcheckRepository = Depends(get_healthcheck_repository),
+    redis: Redis = Depends(get_redis),
 ) -> HealthcheckService:
-    return HealthcheckService(repository=repository)
+    return HealthcheckService(
+        repository=repository, circuit_breakers=CircuitBreakerRegistry(redis)
+    )
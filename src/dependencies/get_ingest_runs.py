@@ -0,0 +1,23 @@
+from typing import Any
+
+from fastapi import Depends, Request
+
+from src.dependencies.database import DatabasePoolManager
+from src.ingest.repository import IngestRepository
+from src.ingest.service import IngestService
+
+
+def get_database(request: Request) -> Any:
+    return request.app.state.database_pool_manager
+
+
+def get_ingest_repository(
+    database: DatabasePoolManager = Depends(get_database),
+) -> IngestRepository:
+    return IngestRepository(database=database)
+
+
+def get_ingest_service(
+    repository: IngestRepository = Depends(get_ingest_repository),
+) -> IngestService:
+    return IngestService(repository=repository)
@@ -2,6 +2,7 @@ from typing import Any
 
 from fastapi import Depends, Request
 
+from src.cache.redis_cache import RedisCache
 from src.dependencies.database import DatabasePoolManager
 from src.document.repository import DocumentsRepository
 from src.document.service import DocumentService
@@ -11,6 +12,10 @@ def get_database(request: Request) -> Any:
     return request.app.state.database_pool_manager
 
 
+def get_cache(request: Request) -> RedisCache | None:
+    return getattr(request.app.state, "cache", None)
+
+
 def get_validated_order_repository(
     database: DatabasePoolManager = Depends(get_database),
 ) -> DocumentsRepository:
@@ -19,5 +24,6 @@ def get_validated_order_repository(
 
 def get_validated_order_service(
     repository: DocumentsRepository = Depends(get_validated_order_repository),
+    cache: RedisCache | None = Depends(get_cache),
 ) -> DocumentService:
-    return DocumentService(repository=repository)
+    return DocumentService(repository=repository, cache=cache)
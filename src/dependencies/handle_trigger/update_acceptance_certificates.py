@@ -1,16 +1,22 @@
-from typing import Any
+from typing import TYPE_CHECKING
 
-from fastapi import Depends, Request
+from fastapi import Request
+from redis.asyncio import Redis
 
-from src.celery.tasks.document_service import DocumentsService
-from src.dependencies.database import DatabasePoolManager
+if TYPE_CHECKING:
+    from celery import Celery
 
 
-def get_database(request: Request) -> Any:
-    return request.app.state.database_pool_manager
+def get_redis(request: Request) -> Redis:
+    redis: Redis = request.app.state.redis
+    return redis
 
 
-def get_documents_validation_repository(
-    database: DatabasePoolManager = Depends(get_database),
-) -> DocumentsService:
-    return DocumentsService(db=database)
+def get_celery_app() -> "Celery":
+    """
+    Celery-приложение импортируется при первом вызове триггера, а не при
+    старте API: эндпоинтам чтения Celery и конфигурация брокера не нужны
+    """
+    from src.celery.celery import celery_app
+
+    return celery_app
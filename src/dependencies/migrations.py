@@ -0,0 +1,81 @@
+"""
+Применение migrations/NNN_*.sql к БД сервиса.
+
+Файлы применяются по порядку номеров, каждый один раз: имена применённых
+записываются в schema_migrations. API применяет миграции при старте;
+вручную - python -m src.dependencies.migrations. Одновременный запуск
+нескольких процессов сериализуется advisory lock'ом.
+"""
+
+import asyncio
+from logging import getLogger
+from pathlib import Path
+
+from src.dependencies.database import DatabasePoolManager
+from src.settings import get_settings
+
+logger = getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+# произвольный ключ pg_advisory_xact_lock, общий для всех процессов сервиса
+MIGRATIONS_LOCK_KEY = 7_310_029
+
+
+async def apply_migrations(database: DatabasePoolManager) -> list[str]:
+    """
+    Применение ещё не применённых миграций в одной транзакции.
+    Возвращает имена применённых файлов
+    """
+    applied: list[str] = []
+    async with database.connection() as connection:
+        async with connection.transaction():
+            await connection.execute(
+                "SELECT pg_advisory_xact_lock($1);", MIGRATIONS_LOCK_KEY
+            )
+            await connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    name        TEXT        PRIMARY KEY,
+                    applied_at  TIMESTAMP   NOT NULL DEFAULT now()
+                );
+                """
+            )
+            done = {
+                record.get("name")
+                for record in await connection.fetch(
+                    "SELECT name FROM schema_migrations;"
+                )
+            }
+            for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+                if path.name in done:
+                    continue
+                await connection.execute(path.read_text(encoding="utf-8"))
+                await connection.execute(
+                    "INSERT INTO schema_migrations (name) VALUES ($1);", path.name
+                )
+                applied.append(path.name)
+                logger.info(f"Применена миграция {path.name}")
+    return applied
+
+
+async def _main() -> None:
+    database = DatabasePoolManager(
+        user=get_settings().POSTGRES_USER,
+        password=get_settings().POSTGRES_PASSWORD,
+        db=get_settings().POSTGRES_DB,
+        host=get_settings().POSTGRES_HOST,
+        port=get_settings().POSTGRES_PORT,
+        pool_size=1,
+        name="migrations",
+    )
+    await database.create_pool()
+    try:
+        applied = await apply_migrations(database)
+    finally:
+        await database.close()
+    print(f"Применено миграций: {len(applied)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,196 @@
+"""
+Журнал медленных запросов DatabasePoolManager с планами EXPLAIN ANALYZE.
+
+Выключен по умолчанию (SLOW_QUERY_LOG_ENABLED). Настройки переопределяются
+во время работы через hash Redis SLOW_QUERY_LOG_CONFIG_KEY (PUT
+/healthcheck/slow_query_log): каждый процесс API/Celery перечитывает его не
+чаще раза в SLOW_QUERY_LOG_REFRESH_INTERVAL секунд.
+
+Для запроса дольше threshold_ms (с вероятностью sample_rate и не больше
+max_per_minute раз в минуту на процесс) в фоне выполняется
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) с теми же параметрами, в транзакции,
+которая откатывается: INSERT/UPDATE/DELETE при анализе ничего не меняют.
+План пишется в таблицу slow_query_log.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from logging import getLogger
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.settings import get_settings
+
+if TYPE_CHECKING:
+    from src.dependencies.database import DatabasePoolManager
+
+logger = getLogger(__name__)
+
+SLOW_QUERY_LOG_CONFIG_KEY = "slow_query_log:config"
+
+# EXPLAIN применим только к DML; DDL, COPY, SET и т.п. не анализируются
+EXPLAINABLE_STATEMENTS = ("select", "with", "insert", "update", "delete", "values")
+
+
+class SlowQueryLogConfig(BaseModel):
+    enabled: bool = Field(description="Журнал включён")
+    threshold_ms: float = Field(gt=0, description="Порог длительности запроса, мс")
+    sample_rate: float = Field(
+        ge=0, le=1, description="Доля медленных запросов, для которых снимается план"
+    )
+    max_per_minute: int = Field(
+        ge=0, description="Не больше планов в минуту на процесс"
+    )
+
+    @classmethod
+    def from_settings(cls) -> "SlowQueryLogConfig":
+        return cls(
+            enabled=get_settings().SLOW_QUERY_LOG_ENABLED,
+            threshold_ms=get_settings().SLOW_QUERY_LOG_THRESHOLD_MS,
+            sample_rate=get_settings().SLOW_QUERY_LOG_SAMPLE_RATE,
+            max_per_minute=get_settings().SLOW_QUERY_LOG_MAX_PER_MINUTE,
+        )
+
+
+async def read_config(client: Redis) -> SlowQueryLogConfig:
+    """Настройки из Redis поверх значений по умолчанию из settings"""
+    stored = await client.hgetall(SLOW_QUERY_LOG_CONFIG_KEY)
+    overrides = {
+        (key.decode() if isinstance(key, bytes) else key): (
+            value.decode() if isinstance(value, bytes) else value
+        )
+        for key, value in stored.items()
+    }
+    return SlowQueryLogConfig.model_validate(
+        SlowQueryLogConfig.from_settings().model_dump() | overrides
+    )
+
+
+async def write_config(client: Redis, config: SlowQueryLogConfig) -> None:
+    await client.hset(
+        SLOW_QUERY_LOG_CONFIG_KEY,
+        mapping={key: str(value) for key, value in config.model_dump().items()},
+    )
+
+
+class SlowQueryLog:
+    def __init__(self, client: Redis | None = None) -> None:
+        self.client = client
+        self.config = SlowQueryLogConfig.from_settings()
+        self.refresh_interval = get_settings().SLOW_QUERY_LOG_REFRESH_INTERVAL
+        self.explain_timeout_ms = get_settings().SLOW_QUERY_LOG_EXPLAIN_TIMEOUT_MS
+        self._refreshed_at = 0.0
+        self._captured_at: deque[float] = deque()
+        # ссылки на фоновые задачи, чтобы их не собрал GC до завершения
+        self._tasks: set[asyncio.Task] = set()
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.client is not None:
+            await self.client.aclose()
+
+    def _spawn(self, coroutine: Any) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self) -> None:
+        assert self.client is not None
+        try:
+            self.config = await read_config(self.client)
+        except (RedisError, ValueError) as error:
+            logger.error(f"Ошибка чтения настроек журнала медленных запросов: {error}")
+
+    def _maybe_refresh(self, now: float) -> None:
+        if self.client is None or now - self._refreshed_at < self.refresh_interval:
+            return
+        self._refreshed_at = now
+        self._spawn(self._refresh())
+
+    def _allow_capture(self, now: float) -> bool:
+        if random.random() >= self.config.sample_rate:  # nosec B311
+            return False
+        while self._captured_at and now - self._captured_at[0] > 60:
+            self._captured_at.popleft()
+        if len(self._captured_at) >= self.config.max_per_minute:
+            return False
+        self._captured_at.append(now)
+        return True
+
+    def observe(
+        self,
+        database: "DatabasePoolManager",
+        caller: str,
+        query: str,
+        args: tuple[Any, ...],
+        duration: float,
+    ) -> None:
+        """Вызывается после каждого запроса; план снимается в фоновой задаче"""
+        now = time.monotonic()
+        self._maybe_refresh(now)
+        config = self.config
+        if not config.enabled or duration * 1000 < config.threshold_ms:
+            return
+        logger.warning(
+            f"Медленный запрос {caller} ({database.name}): {duration * 1000:.0f} мс"
+        )
+        statement = query.lstrip().split(None, 1)[0].lower() if query.strip() else ""
+        if statement not in EXPLAINABLE_STATEMENTS or not self._allow_capture(now):
+            return
+        self._spawn(self._capture(database, caller, query, args, duration))
+
+    async def _capture(
+        self,
+        database: "DatabasePoolManager",
+        caller: str,
+        query: str,
+        args: tuple[Any, ...],
+        duration: float,
+    ) -> None:
+        if database.pool is None:
+            return
+        plan: Any = None
+        error: str | None = None
+        try:
+            async with database.pool.acquire() as connection:
+                transaction = connection.transaction()
+                await transaction.start()
+                try:
+                    await connection.execute(
+                        f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}"
+                    )
+                    plan = await connection.fetchval(
+                        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args
+                    )
+                except Exception as explain_error:
+                    error = repr(explain_error)
+                finally:
+                    # откат: ANALYZE выполняет запрос, изменения DML не сохраняются
+                    await transaction.rollback()
+
+                await connection.execute(
+                    """
+                    INSERT INTO slow_query_log
+                        (pool, caller, query, params, duration_ms, plan, error)
+                    VALUES ($1, $2, $3, $4::jsonb, $5, $6::jsonb, $7)
+                    """,
+                    database.name,
+                    caller,
+                    query,
+                    json.dumps(list(args), default=str, ensure_ascii=False),
+                    duration * 1000,
+                    plan if isinstance(plan, str) or plan is None else json.dumps(plan),
+                    error,
+                )
+        except Exception as capture_error:
+            logger.error(
+                f"Ошибка записи плана медленного запроса {caller}: {capture_error}"
+            )
@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from datetime import date
 from logging import getLogger
 from typing import Any
@@ -11,11 +12,44 @@ from asyncpg import (
 from asyncpg.protocol import Record
 
 from src.dependencies.database import DatabasePoolManager
+from src.document.schema import ValidateStatus
+from src.ingest.batch import COPY_COLUMNS, ActBatch
+from src.metrics.instrumentation import instrument_repository
 from src.utils.decorators import error_handler_http
 
 logger = getLogger(__name__)
 
+VALIDATED_ORDERS_QUERY = """
+        SELECT
+            osl.order_id,
+            osl.supply_id,
+            afa.sticker,
+            osl.status AS inner_order_status,
+            afa.document,
+            afa.account,
+            afa.date AS document_date
+        FROM (
+            SELECT DISTINCT ON (order_id) *
+            FROM order_status_log
+            ORDER BY order_id, status, created_at DESC
+        ) osl
+        LEFT JOIN acceptance_fbs_acts_new afa
+        ON osl.order_id::text = afa.order_number
+        WHERE
+            ($1::date IS NULL OR afa.date >= $1::date) AND
+            ($2::date IS NULL OR afa.date <= $2::date) AND
+            ($3::int8 IS NULL OR osl.order_id = $3::int8) AND
+            ($4::varchar IS NULL OR osl.supply_id = $4::varchar) AND
+            ($5::varchar IS NULL or afa.account = $5::varchar)
+"""
 
+ASSEMBLY_TASKS_WATERMARK = "assembly_task_status_model"
+NOT_CONFIRMED_ORDER_STATUS_WATERMARK = "not_confirmed:order_status_log"
+NOT_CONFIRMED_ASSEMBLY_TASKS_WATERMARK = "not_confirmed:assembly_task_status_model"
+NOT_CONFIRMED_SUPPLIES_WATERMARK = "not_confirmed:supplies_data"
+
+
+@instrument_repository
 class DocumentsRepository:
     def __init__(self, database: DatabasePoolManager):
         self.database = database
@@ -30,18 +64,38 @@ class DocumentsRepository:
             ConnectionDoesNotExistError,
         ),
     )
-    async def update_acceptance_certificates(
-        self, certificates: list[set[Any]]
-    ) -> None:
-        query = """
-        INSERT INTO acceptance_fbs_acts_new
-            (order_number, unit, sticker, quantity, document, document_number, date, account, created_at)
-        VALUES
-            ($1, 'шт.', $2, $3, $4, $5, $6, $7, $8)
+    async def update_acceptance_certificates(self, batch: ActBatch) -> tuple[int, int]:
+        """
+        Запись строк актов: COPY во временную таблицу и перенос с
+        ON CONFLICT DO NOTHING одной транзакцией.
+
+        :return: (inserted, conflicted) - записанные строки и строки, уже
+            загруженные ранее
+        """
+        columns = ", ".join(COPY_COLUMNS)
+        create_staging_query = f"""
+        CREATE TEMP TABLE acceptance_fbs_acts_staging ON COMMIT DROP AS
+        SELECT {columns} FROM acceptance_fbs_acts_new WITH NO DATA
+        """
+        insert_query = f"""
+        INSERT INTO acceptance_fbs_acts_new ({columns})
+        SELECT {columns} FROM acceptance_fbs_acts_staging
         ON CONFLICT DO NOTHING
         """
 
-        await self.database.executemany(query, certificates)
+        async with (
+            self.database.connection() as connection,
+            connection.transaction(),
+        ):
+            await connection.execute(create_staging_query)
+            await connection.copy_records_to_table(
+                "acceptance_fbs_acts_staging",
+                records=batch.records(),
+                columns=COPY_COLUMNS,
+            )
+            status = await connection.execute(insert_query)
+        inserted = int(status.split()[-1])
+        return inserted, len(batch) - inserted
 
     @error_handler_http(
         status_code=500,
@@ -63,28 +117,8 @@ class DocumentsRepository:
         page_size: int,
         offset: int,
     ) -> Record:
-        query = """
-        SELECT
-            osl.order_id,
-            osl.supply_id,
-            afa.sticker,
-            osl.status,
-            afa.document,
-            afa.account,
-            afa.date
-        FROM (
-            SELECT DISTINCT ON (order_id) *
-            FROM order_status_log
-            ORDER BY order_id, status, created_at DESC
-        ) osl
-        LEFT JOIN acceptance_fbs_acts_new afa
-        ON osl.order_id::text = afa.order_number
-        WHERE
-            ($1::date IS NULL OR afa.date >= $1::date) AND
-            ($2::date IS NULL OR afa.date <= $2::date) AND
-            ($3::int8 IS NULL OR osl.order_id = $3::int8) AND
-            ($4::varchar IS NULL OR osl.supply_id = $4::varchar) AND
-            ($5::varchar IS NULL or afa.account = $5::varchar)
+        query = f"""
+        {VALIDATED_ORDERS_QUERY}
         LIMIT $6
         OFFSET $7;
         """
@@ -92,6 +126,24 @@ class DocumentsRepository:
             query, begin_date, end_date, order_id, supply_id, account, page_size, offset
         )
 
+    async def iter_validated_orders(
+        self,
+        begin_date: date | None,
+        end_date: date | None,
+        order_id: int | None,
+        supply_id: str | None,
+        account: str | None,
+    ) -> AsyncIterator[Record]:
+        """
+        Те же фильтры, что и get_validated_orders, но без пагинации:
+        строки читаются серверным курсором. Ошибки БД при стриминге не
+        преобразуются в HTTPException - ответ к этому моменту уже начат.
+        """
+        async for record in self.database.cursor(
+            VALIDATED_ORDERS_QUERY, begin_date, end_date, order_id, supply_id, account
+        ):
+            yield record
+
     @error_handler_http(
         status_code=500,
         message="Database occure error",
@@ -151,6 +203,147 @@ class DocumentsRepository:
             query, account, document_number, document_date, supply_id
         )
 
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def get_order_discrepancies(
+        self,
+        account: str,
+        document_date: date,
+        document_numbers: list[str] | None,
+        page_size: int,
+        offset: int,
+    ) -> Record:
+        """
+        Симметричная разность СЗ актов и внутренней БД одним запросом для всех
+        актов аккаунта за дату (или только для document_numbers). Фильтры
+        our_service совпадают с validate_orders.
+        """
+        query = """
+        WITH acts AS (
+            SELECT afan.document_number, afan.order_number::text AS order_id
+            FROM acceptance_fbs_acts_new afan
+            WHERE afan.account = $1
+              AND afan.date = $2::date
+              AND ($3::text[] IS NULL OR afan.document_number = ANY($3::text[]))
+        ),
+        documents AS (
+            SELECT DISTINCT document_number, 'WB-GI-' || document_number AS supply_id
+            FROM acts
+        ),
+        our_service AS (
+            SELECT d.document_number, t.id::text AS order_id
+            FROM (
+                SELECT
+                    atsm.id,
+                    atsm.supply_id,
+                    atsm.supplier_status,
+                    atsm.wb_status,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY atsm.id
+                        ORDER BY atsm.created_at_db DESC
+                    ) AS rn
+                FROM assembly_task_status_model atsm
+                WHERE atsm.supply_id IN (SELECT supply_id FROM documents)
+            ) t
+            JOIN documents d ON d.supply_id = t.supply_id
+            WHERE t.rn = 1
+              AND
+                (t.supplier_status <> 'cancel'
+                    OR t.wb_status NOT IN (
+                        'canceled',
+                        'canceled_by_client',
+                        'declined_by_client',
+                        'defect'
+                    )
+                )
+        )
+        SELECT
+            $1::text AS account,
+            COALESCE(a.document_number, o.document_number) AS document_number,
+            COALESCE(a.order_id, o.order_id) AS order_id,
+            CASE WHEN o.order_id IS NULL
+                THEN 'only_in_acts'
+                ELSE 'only_in_our_service'
+            END AS side
+        FROM acts a
+        FULL JOIN our_service o
+               ON o.document_number = a.document_number
+              AND o.order_id = a.order_id
+        WHERE a.order_id IS NULL OR o.order_id IS NULL
+        ORDER BY document_number, side, order_id
+        LIMIT $4
+        OFFSET $5;
+        """
+        return await self.database.fetch(
+            query, account, document_date, document_numbers, page_size, offset
+        )
+
+    async def iter_act_orders(
+        self,
+        accounts: list[str],
+        document_numbers: list[str],
+        document_dates: list[date],
+    ) -> AsyncIterator[Record]:
+        """
+        СЗ пакета актов одним потоковым запросом для векторизованной валидации.
+        act_index - позиция акта (account, document_number, date) в пакете, с 0.
+        """
+        query = """
+        SELECT
+            acts.act_index - 1 AS act_index,
+            afan.order_number::int8 AS order_id
+        FROM unnest($1::text[], $2::text[], $3::date[])
+            WITH ORDINALITY AS acts(account, document_number, date, act_index)
+        JOIN acceptance_fbs_acts_new afan
+          ON afan.account = acts.account
+         AND afan.document_number = acts.document_number
+         AND afan.date = acts.date;
+        """
+        async for record in self.database.cursor(
+            query, accounts, document_numbers, document_dates
+        ):
+            yield record
+
+    async def iter_our_orders(self, supply_ids: list[str]) -> AsyncIterator[Record]:
+        """
+        Последние неотменённые СЗ поставок пакета актов одним потоковым запросом;
+        фильтры совпадают с our_service в validate_orders.
+        act_index - позиция поставки акта в supply_ids, с 0.
+        """
+        query = """
+        SELECT t.act_index - 1 AS act_index, t.id::int8 AS order_id
+        FROM (
+            SELECT DISTINCT ON (acts.act_index, atsm.id)
+                acts.act_index,
+                atsm.id,
+                atsm.supplier_status,
+                atsm.wb_status
+            FROM unnest($1::text[]) WITH ORDINALITY AS acts(supply_id, act_index)
+            JOIN assembly_task_status_model atsm
+              ON atsm.supply_id = acts.supply_id
+            ORDER BY acts.act_index, atsm.id, atsm.created_at_db DESC
+        ) t
+        WHERE
+            (t.supplier_status <> 'cancel'
+                OR t.wb_status NOT IN (
+                    'canceled',
+                    'canceled_by_client',
+                    'declined_by_client',
+                    'defect'
+                )
+            );
+        """
+        async for record in self.database.cursor(query, supply_ids):
+            yield record
+
     @error_handler_http(
         status_code=500,
         message="Database occure error",
@@ -162,7 +355,7 @@ class DocumentsRepository:
         ),
     )
     async def get_document_number_and_supply_id(
-        self, document_date: str, account: str
+        self, begin_date: date, end_date: date, account: str
     ) -> Record:
         query = """
         SELECT DISTINCT
@@ -170,11 +363,12 @@ class DocumentsRepository:
             afan.account,
             afan.date
         FROM acceptance_fbs_acts_new afan
-        WHERE afan.date = $1::date AND
-        afan.account = $2::text;
+        WHERE afan.date BETWEEN $1::date AND $2::date AND
+        afan.account = $3::text
+        ORDER BY afan.date;
         """
 
-        return await self.database.fetch(query, document_date, account)
+        return await self.database.fetch(query, begin_date, end_date, account)
 
     @error_handler_http(
         status_code=500,
@@ -187,19 +381,88 @@ class DocumentsRepository:
         ),
     )
     async def get_accepted_orders_without_certificates(self) -> Record:
+        """
+        Чтение поддерживаемой таблицы acceptance_certificates_not_confirmed
+        (см. refresh_not_confirmed); строки за окном ещё могут ждать очистки
+        """
         query = """
-        WITH last_order_status AS (
+        SELECT
+            order_id,
+            supply_id,
+            inner_status,
+            supplier_status,
+            wb_status,
+            reception_time,
+            supply_name,
+            account
+        FROM acceptance_certificates_not_confirmed
+        WHERE reception_time > now() - interval '120 hours'
+        ORDER BY reception_time;
+        """
+        return await self.database.fetch(query)
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def refresh_not_confirmed(self, overlap_seconds: int) -> dict[str, int]:
+        """
+        Инкрементальное обновление acceptance_certificates_not_confirmed.
+
+        Пересчитываются только СЗ, у которых после watermark появились строки
+        order_status_log / assembly_task_status_model или поставка которых
+        отсканирована (supplies_data.scan_dt). Подходящие СЗ добавляются или
+        обновляются, переставшие подходить удаляются, строки старше 120 часов
+        удаляются. Watermark'и сдвигаются в той же транзакции. Первый запуск
+        (watermark'ов нет) пересчитывает всё окно.
+        """
+        refresh_query = """
+        WITH watermark AS (
+            SELECT
+                COALESCE(max(value) FILTER (WHERE name = $1), '-infinity'::timestamp)
+                    - make_interval(secs => $4) AS order_status_log,
+                COALESCE(max(value) FILTER (WHERE name = $2), '-infinity'::timestamp)
+                    - make_interval(secs => $4) AS assembly_task_status_model,
+                COALESCE(max(value) FILTER (WHERE name = $3), '-infinity'::timestamp)
+                    - make_interval(secs => $4) AS supplies_data
+            FROM acceptance_certificates_watermarks
+        ),
+        candidates AS (
+            SELECT osl.order_id
+            FROM order_status_log osl
+            WHERE osl.created_at > (SELECT order_status_log FROM watermark)
+            UNION
+            SELECT atsm.id
+            FROM assembly_task_status_model atsm
+            WHERE atsm.created_at_db > (SELECT assembly_task_status_model FROM watermark)
+            UNION
+            SELECT atsm.id
+            FROM supplies_data sd
+            JOIN assembly_task_status_model atsm
+              ON atsm.supply_id = sd.id
+            WHERE sd.scan_dt > GREATEST(
+                (SELECT supplies_data FROM watermark),
+                now() - interval '120 hours'
+            )
+        ),
+        last_order_status AS (
             SELECT order_id, status
             FROM (
                 SELECT
                     osl.order_id,
                     osl.status,
-                    osl.created_at,
                     ROW_NUMBER() OVER (
                         PARTITION BY osl.order_id
                         ORDER BY osl.created_at DESC
                     ) AS rn
                 FROM order_status_log osl
+                WHERE osl.order_id IN (SELECT order_id FROM candidates)
             ) t
             WHERE t.rn = 1
               AND t.status IN (
@@ -219,7 +482,6 @@ class DocumentsRepository:
                     los.status as inner_status,
                     atsm.supplier_status,
                     atsm.wb_status,
-                    atsm.created_at_db,
                     ROW_NUMBER() OVER (
                         PARTITION BY atsm.id
                         ORDER BY atsm.created_at_db DESC
@@ -236,24 +498,256 @@ class DocumentsRepository:
                   'declined_by_client',
                   'defect'
               )
+        ),
+        fresh AS (
+            SELECT DISTINCT ON (lss.id)
+                lss.id AS order_id,
+                sd.id AS supply_id,
+                lss.inner_status,
+                lss.supplier_status,
+                lss.wb_status,
+                sd.scan_dt AS reception_time,
+                sd.name AS supply_name,
+                sd.account AS account
+            FROM supplies_data sd
+            JOIN last_supply_status lss
+              ON sd.id = lss.supply_id
+            WHERE sd.scan_dt > now() - interval '120 hours'
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM acceptance_fbs_acts_new afan
+                  WHERE afan.order_number = lss.id::text
+              )
+            ORDER BY lss.id, sd.scan_dt DESC
+        ),
+        removed AS (
+            DELETE FROM acceptance_certificates_not_confirmed nc
+            WHERE nc.order_id IN (SELECT order_id FROM candidates)
+              AND nc.order_id NOT IN (SELECT order_id FROM fresh)
+            RETURNING 1
+        ),
+        upserted AS (
+            INSERT INTO acceptance_certificates_not_confirmed
+                (order_id, supply_id, inner_status, supplier_status, wb_status,
+                 reception_time, supply_name, account, refreshed_at)
+            SELECT
+                order_id, supply_id, inner_status, supplier_status, wb_status,
+                reception_time, supply_name, account, now()
+            FROM fresh
+            ON CONFLICT (order_id) DO UPDATE SET
+                supply_id = EXCLUDED.supply_id,
+                inner_status = EXCLUDED.inner_status,
+                supplier_status = EXCLUDED.supplier_status,
+                wb_status = EXCLUDED.wb_status,
+                reception_time = EXCLUDED.reception_time,
+                supply_name = EXCLUDED.supply_name,
+                account = EXCLUDED.account,
+                refreshed_at = EXCLUDED.refreshed_at
+            RETURNING 1
         )
         SELECT
-            lss.id,
-            sd.id AS supply_id,
-            lss.inner_status,
-            lss.supplier_status,
-            lss.wb_status,
-            sd.scan_dt as reception_time,
-            sd.name as supply_name,
-            sd.account as account
-        FROM supplies_data sd
-        JOIN last_supply_status lss
-          ON sd.id = lss.supply_id
-        WHERE sd.scan_dt > now() - interval '120 hours'
-          AND NOT EXISTS (
-              SELECT 1
-              FROM acceptance_fbs_acts_new afan
-              WHERE afan.order_number = lss.id::text
-          );
+            (SELECT count(*) FROM upserted) AS upserted,
+            (SELECT count(*) FROM removed) AS removed;
         """
-        return await self.database.fetch(query)
+        prune_query = """
+        DELETE FROM acceptance_certificates_not_confirmed
+        WHERE reception_time IS NULL
+           OR reception_time <= now() - interval '120 hours';
+        """
+        advance_query = """
+        INSERT INTO acceptance_certificates_watermarks (name, value)
+        SELECT name, value
+        FROM (VALUES
+            ($1::text, (SELECT max(created_at) FROM order_status_log)::timestamp),
+            ($2::text, (SELECT max(created_at_db) FROM assembly_task_status_model)::timestamp),
+            ($3::text, (SELECT max(scan_dt) FROM supplies_data)::timestamp)
+        ) AS t(name, value)
+        WHERE value IS NOT NULL
+        ON CONFLICT (name) DO UPDATE SET
+            value = GREATEST(acceptance_certificates_watermarks.value, EXCLUDED.value);
+        """
+        names = [
+            NOT_CONFIRMED_ORDER_STATUS_WATERMARK,
+            NOT_CONFIRMED_ASSEMBLY_TASKS_WATERMARK,
+            NOT_CONFIRMED_SUPPLIES_WATERMARK,
+        ]
+        # один снимок на пересчёт и сдвиг watermark'ов: строки, закоммиченные
+        # после начала транзакции, попадут в следующий запуск
+        async with (
+            self.database.connection() as connection,
+            connection.transaction(isolation="repeatable_read"),
+        ):
+            counts = await connection.fetchrow(refresh_query, *names, overlap_seconds)
+            pruned = await connection.execute(prune_query)
+            await connection.execute(advance_query, *names)
+        return {
+            "upserted": counts["upserted"],
+            "removed": counts["removed"],
+            "pruned": int(pruned.split()[-1]),
+        }
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def upsert_validation_results(self, results: list[ValidateStatus]) -> None:
+        query = """
+        INSERT INTO acceptance_certificates_validation_results
+            (account, document_number, document_date, matching_count,
+             only_in_acts, only_in_our_service, is_valid, computed_at)
+        VALUES
+            ($1, $2, $3, $4, $5, $6, $7, now())
+        ON CONFLICT (account, document_number, document_date) DO UPDATE SET
+            matching_count = EXCLUDED.matching_count,
+            only_in_acts = EXCLUDED.only_in_acts,
+            only_in_our_service = EXCLUDED.only_in_our_service,
+            is_valid = EXCLUDED.is_valid,
+            computed_at = EXCLUDED.computed_at;
+        """
+        await self.database.executemany(
+            query,
+            [
+                (
+                    result.account,
+                    result.document_number,
+                    result.document_date,
+                    result.matching_count,
+                    result.only_in_acts,
+                    result.only_in_our_service,
+                    result.is_valid,
+                )
+                for result in results
+            ],
+        )
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def get_validation_results(self, begin_date: date, end_date: date) -> Record:
+        query = """
+        SELECT
+            account,
+            document_number,
+            document_date,
+            is_valid,
+            matching_count,
+            only_in_our_service,
+            only_in_acts,
+            computed_at
+        FROM acceptance_certificates_validation_results
+        WHERE document_date BETWEEN $1::date AND $2::date
+        ORDER BY document_date, account, document_number;
+        """
+        return await self.database.fetch(query, begin_date, end_date)
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def mark_dirty_acts_from_assembly_tasks(self, overlap_seconds: int) -> int:
+        """
+        Помечает акты, по поставкам WB-GI- которых в assembly_task_status_model
+        появились строки после watermark, и сдвигает watermark. Просмотр
+        начинается на overlap_seconds раньше watermark, чтобы не пропустить
+        строки, закоммиченные позже более новых.
+        """
+        query = """
+        WITH watermark AS (
+            SELECT COALESCE(
+                (SELECT value FROM acceptance_certificates_watermarks WHERE name = $1),
+                '-infinity'::timestamp
+            ) - make_interval(secs => $2) AS value
+        ),
+        changed AS (
+            SELECT atsm.supply_id, atsm.created_at_db
+            FROM assembly_task_status_model atsm
+            WHERE atsm.created_at_db > (SELECT value FROM watermark)
+              AND atsm.supply_id LIKE 'WB-GI-%'
+        ),
+        marked AS (
+            INSERT INTO acceptance_certificates_dirty_acts
+                (account, document_number, document_date, marked_at)
+            SELECT DISTINCT afan.account, afan.document_number, afan.date, now()
+            FROM acceptance_fbs_acts_new afan
+            WHERE afan.document_number IN (
+                SELECT DISTINCT substr(supply_id, 7) FROM changed
+            )
+            ON CONFLICT (account, document_number, document_date)
+                DO UPDATE SET marked_at = EXCLUDED.marked_at
+            RETURNING 1
+        ),
+        advanced AS (
+            INSERT INTO acceptance_certificates_watermarks (name, value)
+            SELECT $1, max(created_at_db) FROM changed
+            HAVING max(created_at_db) IS NOT NULL
+            ON CONFLICT (name) DO UPDATE SET
+                value = GREATEST(acceptance_certificates_watermarks.value, EXCLUDED.value)
+            RETURNING 1
+        )
+        SELECT count(*) AS marked FROM marked;
+        """
+        record = await self.database.fetchrow(
+            query, ASSEMBLY_TASKS_WATERMARK, overlap_seconds
+        )
+        return record["marked"] if record else 0
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def get_dirty_acts(self, limit: int) -> Record:
+        query = """
+        SELECT account, document_number, document_date, marked_at
+        FROM acceptance_certificates_dirty_acts
+        ORDER BY marked_at
+        LIMIT $1;
+        """
+        return await self.database.fetch(query, limit)
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def clear_dirty_acts(self, acts: list[tuple[str, str, date, Any]]) -> None:
+        """
+        Снимает пометку только если акт не был помечен повторно во время валидации
+        """
+        query = """
+        DELETE FROM acceptance_certificates_dirty_acts
+        WHERE account = $1
+          AND document_number = $2
+          AND document_date = $3
+          AND marked_at <= $4;
+        """
+        await self.database.executemany(query, acts)
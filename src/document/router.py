@@ -1,17 +1,26 @@
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Response, status
+from fastapi.responses import StreamingResponse
 
 from src.dependencies.get_validated_order import get_validated_order_service
 from src.document.schema import (
     AcceptedOrdersWithoutCertificate,
+    ExportFormat,
+    OrderDiscrepancy,
     ValidatedOrder,
     ValidateStatus,
+    ValidateStatusByDate,
 )
 from src.document.service import DocumentService
 
 validated_order = APIRouter(prefix="/validated_order", tags=["/validated_order"])
 
+CACHE_AGE_HEADER = "X-Cache-Age"
+# списочные ответы уже сериализованы TypeAdapter'ом сервиса и отдаются как есть;
+# response_model в декораторах сохраняет схему OpenAPI
+JSON_MEDIA_TYPE = "application/json"
+
 
 @validated_order.get(
     "/", response_model=list[ValidatedOrder], status_code=status.HTTP_200_OK
@@ -25,16 +34,69 @@ async def get_validated_order(
     page: int = Query(1, ge=1),
     page_size: int = Query(200, ge=1),
     service: DocumentService = Depends(get_validated_order_service),
-) -> list[ValidatedOrder]:
-    return await service.get_validated_order(
+) -> Response:
+    content = await service.get_validated_order_json(
+        begin_date=begin_date,
+        end_date=end_date,
+        order_id=order_id,
+        supply_id=supply_id,
+        account=account,
+        page=page,
+        page_size=page_size,
+    )
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
+
+
+@validated_order.get("/export", status_code=status.HTTP_200_OK)
+async def export_validated_orders(
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+    begin_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    order_id: int | None = Query(default=None),
+    supply_id: str | None = Query(default=None),
+    account: str | None = Query(default=None),
+    service: DocumentService = Depends(get_validated_order_service),
+) -> StreamingResponse:
+    content = service.export_validated_orders(
+        export_format=export_format,
         begin_date=begin_date,
         end_date=end_date,
         order_id=order_id,
         supply_id=supply_id,
         account=account,
+    )
+    if export_format == ExportFormat.CSV:
+        return StreamingResponse(
+            content,
+            media_type="application/gzip",
+            headers={
+                "Content-Disposition": 'attachment; filename="validated_orders.csv.gz"'
+            },
+        )
+    return StreamingResponse(content, media_type="application/x-ndjson")
+
+
+@validated_order.get(
+    "/discrepancies",
+    response_model=list[OrderDiscrepancy],
+    status_code=status.HTTP_200_OK,
+)
+async def get_order_discrepancies(
+    account: str = Query(),
+    document_date: date = Query(),
+    document_number: list[str] | None = Query(default=None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(200, ge=1),
+    service: DocumentService = Depends(get_validated_order_service),
+) -> Response:
+    content = await service.get_order_discrepancies_json(
+        account=account,
+        document_date=document_date,
+        document_numbers=document_number,
         page=page,
         page_size=page_size,
     )
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
 
 
 @validated_order.get(
@@ -44,14 +106,41 @@ async def get_validated_order(
 )
 async def get_accepted_orders_without_certificates(
     service: DocumentService = Depends(get_validated_order_service),
-) -> list[AcceptedOrdersWithoutCertificate]:
-    return await service.get_validated_orders_without_certificates()
+) -> Response:
+    cached = await service.get_validated_orders_without_certificates_json()
+    return Response(
+        content=cached.value,
+        media_type=JSON_MEDIA_TYPE,
+        headers={CACHE_AGE_HEADER: str(int(cached.age))},
+    )
 
 
 @validated_order.get(
     "/status", response_model=list[ValidateStatus], status_code=status.HTTP_200_OK
 )
 async def get_validate_status(
+    document_date: date | None = Query(default=None),
     service: DocumentService = Depends(get_validated_order_service),
-) -> list[ValidateStatus]:
-    return await service.get_validate_status()
+) -> Response:
+    cached = await service.get_validate_status_json(document_date=document_date)
+    return Response(
+        content=cached.value,
+        media_type=JSON_MEDIA_TYPE,
+        headers={CACHE_AGE_HEADER: str(int(cached.age))},
+    )
+
+
+@validated_order.get(
+    "/status/range",
+    response_model=list[ValidateStatusByDate],
+    status_code=status.HTTP_200_OK,
+)
+async def get_validate_status_range(
+    begin_date: date = Query(),
+    end_date: date = Query(),
+    service: DocumentService = Depends(get_validated_order_service),
+) -> Response:
+    content = await service.get_validate_status_range_json(
+        begin_date=begin_date, end_date=end_date
+    )
+    return Response(content=content, media_type=JSON_MEDIA_TYPE)
@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from enum import StrEnum
 
 from pydantic import BaseModel, Field
 
@@ -54,6 +55,9 @@ class AcceptedOrdersWithoutCertificate(BaseModel):
 class ValidateStatus(BaseModel):
     account: str = Field(description="Имя аккаунта")
     document_number: str = Field(description="Номер акта приёма передачи")
+    document_date: date | None = Field(
+        default=None, description="Дата формирования акта приёма передачи"
+    )
     is_valid: bool = Field(description="Флаг валидности акта")
     matching_count: int = Field(description="Количество совпавших сборочных заданий")
     only_in_our_service: int | None = Field(
@@ -62,3 +66,30 @@ class ValidateStatus(BaseModel):
     only_in_acts: int | None = Field(
         description="Сборочные задания, указанные только в актах"
     )
+    computed_at: datetime | None = Field(
+        default=None, description="Время вычисления результата валидации"
+    )
+
+
+class ValidateStatusByDate(BaseModel):
+    document_date: date = Field(description="Дата формирования актов приёма передачи")
+    results: list[ValidateStatus] = Field(description="Результаты валидации актов")
+
+
+class ExportFormat(StrEnum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class DiscrepancySide(StrEnum):
+    ONLY_IN_ACTS = "only_in_acts"
+    ONLY_IN_OUR_SERVICE = "only_in_our_service"
+
+
+class OrderDiscrepancy(BaseModel):
+    account: str = Field(description="Имя аккаунта")
+    document_number: str = Field(description="Номер акта приёма передачи")
+    order_id: str = Field(description="ID сборочного задания")
+    side: DiscrepancySide = Field(
+        description="Где указано сборочное задание: только в акте или только во внутренней БД"
+    )
@@ -1,24 +1,66 @@
 import asyncio
-from datetime import date, datetime, timedelta
+import csv
+import io
+import time
+import zlib
+from collections.abc import AsyncIterator
+from datetime import date, timedelta
 from logging import getLogger
 
+from asyncpg.protocol import Record
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
 
+from src.cache.redis_cache import (
+    NOT_CONFIRMED_KEY,
+    VALIDATE_STATUS_KEY,
+    CachedValue,
+    RedisCache,
+)
 from src.document.repository import DocumentsRepository
 from src.document.schema import (
     AcceptedOrdersWithoutCertificate,
     DocumentDataForValidate,
+    ExportFormat,
+    OrderDiscrepancy,
     ValidatedOrder,
     ValidateStatus,
+    ValidateStatusByDate,
 )
+from src.settings import get_settings
 from src.utils.utils import get_tokens
 
 logger = getLogger(__name__)
 
+validate_status_adapter = TypeAdapter(list[ValidateStatus])
+validated_orders_adapter = TypeAdapter(list[ValidatedOrder])
+not_confirmed_adapter = TypeAdapter(list[AcceptedOrdersWithoutCertificate])
+discrepancies_adapter = TypeAdapter(list[OrderDiscrepancy])
+validate_status_by_date_adapter = TypeAdapter(list[ValidateStatusByDate])
+
+# размер (в байтах) порции стриминговой выгрузки
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def default_validation_date() -> date:
+    """Акты валидируются на следующий день после формирования"""
+    return date.today() - timedelta(days=1)
+
+
+def group_by_date(results: list[ValidateStatus]) -> dict[date, list[ValidateStatus]]:
+    grouped: dict[date, list[ValidateStatus]] = {}
+    for result in results:
+        if result.document_date is not None:
+            grouped.setdefault(result.document_date, []).append(result)
+    return grouped
+
 
 class DocumentService:
-    def __init__(self, repository: DocumentsRepository):
+    def __init__(
+        self, repository: DocumentsRepository, cache: RedisCache | None = None
+    ):
         self.repository = repository
+        self.cache = cache
 
     async def get_validated_order(
         self,
@@ -30,6 +72,53 @@ class DocumentService:
         page: int,
         page_size: int,
     ) -> list[ValidatedOrder]:
+        self._check_order_filters(begin_date, end_date, supply_id)
+
+        offset = (page - 1) * page_size
+
+        records = await self.repository.get_validated_orders(
+            begin_date=begin_date,
+            end_date=end_date,
+            order_id=order_id,
+            supply_id=supply_id,
+            account=account,
+            page_size=page_size,
+            offset=offset,
+        )
+        return validated_orders_adapter.validate_python(
+            [dict(record) for record in records]
+        )
+
+    async def get_validated_order_json(
+        self,
+        begin_date: date | None,
+        end_date: date | None,
+        order_id: int | None,
+        supply_id: str | None,
+        account: str | None,
+        page: int,
+        page_size: int,
+    ) -> bytes:
+        """
+        Быстрый путь для больших страниц: записи проходят одну валидацию в
+        предкомпилированном TypeAdapter и сразу сериализуются в JSON (bytes),
+        минуя повторную валидацию response_model и jsonable_encoder FastAPI.
+        """
+        validated_orders = await self.get_validated_order(
+            begin_date=begin_date,
+            end_date=end_date,
+            order_id=order_id,
+            supply_id=supply_id,
+            account=account,
+            page=page,
+            page_size=page_size,
+        )
+        return validated_orders_adapter.dump_json(validated_orders)
+
+    @staticmethod
+    def _check_order_filters(
+        begin_date: date | None, end_date: date | None, supply_id: str | None
+    ) -> None:
         if (
             begin_date
             and not isinstance(begin_date, date)
@@ -53,59 +142,165 @@ class DocumentService:
                 detail="Некорректный формат ID поставки. Введите ID поставки в формате WB-GI-XXXXXXXXX.",
             )
 
-        offset = (page - 1) * page_size
+    @staticmethod
+    def _to_validated_order(record: Record) -> ValidatedOrder:
+        return ValidatedOrder.model_validate(dict(record))
 
-        records = await self.repository.get_validated_orders(
+    def export_validated_orders(
+        self,
+        export_format: ExportFormat,
+        begin_date: date | None,
+        end_date: date | None,
+        order_id: int | None,
+        supply_id: str | None,
+        account: str | None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Выгрузка всех заказов по фильтрам get_validated_order потоком NDJSON
+        или gzip CSV. Строки читаются курсором и отдаются порциями по
+        EXPORT_CHUNK_SIZE байт, память не зависит от размера выгрузки.
+        """
+        self._check_order_filters(begin_date, end_date, supply_id)
+
+        records = self.repository.iter_validated_orders(
             begin_date=begin_date,
             end_date=end_date,
             order_id=order_id,
             supply_id=supply_id,
             account=account,
+        )
+        if export_format == ExportFormat.CSV:
+            return self._stream_csv_gzip(records)
+        return self._stream_ndjson(records)
+
+    async def _stream_ndjson(
+        self, records: AsyncIterator[Record]
+    ) -> AsyncIterator[bytes]:
+        batch = bytearray()
+        async for record in records:
+            batch += self._to_validated_order(record).model_dump_json().encode()
+            batch += b"\n"
+            if len(batch) >= EXPORT_CHUNK_SIZE:
+                yield bytes(batch)
+                batch.clear()
+        if batch:
+            yield bytes(batch)
+
+    async def _stream_csv_gzip(
+        self, records: AsyncIterator[Record]
+    ) -> AsyncIterator[bytes]:
+        # wbits=31 - формат gzip
+        compressor = zlib.compressobj(wbits=31)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ValidatedOrder.model_fields.keys())
+
+        async for record in records:
+            writer.writerow(
+                self._to_validated_order(record).model_dump(mode="json").values()
+            )
+            if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                chunk = compressor.compress(buffer.getvalue().encode())
+                buffer.seek(0)
+                buffer.truncate()
+                if chunk:
+                    yield chunk
+
+        yield compressor.compress(buffer.getvalue().encode()) + compressor.flush()
+
+    async def get_order_discrepancies_json(
+        self,
+        account: str,
+        document_date: date,
+        document_numbers: list[str] | None,
+        page: int,
+        page_size: int,
+    ) -> bytes:
+        """
+        Сборочные задания, которые есть только в акте или только во внутренней БД,
+        по актам аккаунта за дату. Размер страницы и число актов ограничены
+        настройками DISCREPANCY_MAX_PAGE_SIZE / DISCREPANCY_MAX_DOCUMENTS.
+        """
+        if page_size > get_settings().DISCREPANCY_MAX_PAGE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Размер страницы не может быть больше {get_settings().DISCREPANCY_MAX_PAGE_SIZE}.",
+            )
+        if (
+            document_numbers
+            and len(document_numbers) > get_settings().DISCREPANCY_MAX_DOCUMENTS
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Количество актов в запросе не может быть больше {get_settings().DISCREPANCY_MAX_DOCUMENTS}.",
+            )
+
+        records = await self.repository.get_order_discrepancies(
+            account=account,
+            document_date=document_date,
+            document_numbers=document_numbers or None,
             page_size=page_size,
-            offset=offset,
+            offset=(page - 1) * page_size,
         )
-        return [
-            ValidatedOrder(
-                order_id=record.get("order_id"),
-                supply_id=record.get("supply_id"),
-                sticker=record.get("sticker"),
-                inner_order_status=record.get("status"),
-                document=record.get("document"),
-                account=record.get("account"),
-                document_date=record.get("date"),
+        return discrepancies_adapter.dump_json(
+            discrepancies_adapter.validate_python([dict(record) for record in records])
+        )
+
+    async def get_validated_orders_without_certificates_json(
+        self,
+    ) -> CachedValue[bytes]:
+        if self.cache is None:
+            return CachedValue(
+                value=not_confirmed_adapter.dump_json(
+                    await self._compute_validated_orders_without_certificates()
+                ),
+                computed_at=time.time(),
             )
-            for record in records
-        ]
+        return await self.cache.get_or_compute_json(
+            key=NOT_CONFIRMED_KEY,
+            compute=self._compute_validated_orders_without_certificates,
+            adapter=not_confirmed_adapter,
+        )
 
-    async def get_validated_orders_without_certificates(
+    async def _compute_validated_orders_without_certificates(
         self,
     ) -> list[AcceptedOrdersWithoutCertificate]:
         result = await self.repository.get_accepted_orders_without_certificates()
+        return not_confirmed_adapter.validate_python(
+            [dict(record) for record in result]
+        )
 
-        return [
-            AcceptedOrdersWithoutCertificate(
-                order_id=record.get("id"),
-                supply_id=record.get("supply_id"),
-                inner_status=record.get("inner_status"),
-                supplier_status=record.get("supplier_status"),
-                wb_status=record.get("wb_status"),
-                reception_time=record.get("reception_time"),
-                supply_name=record.get("supply_name"),
-                account=record.get("account"),
-            )
-            for record in result
-        ]
+    async def refresh_not_confirmed(self) -> dict[str, int]:
+        """
+        Инкрементальное обновление таблицы принятых СЗ без акта. Кэш
+        /not_confirmed сбрасывается только если таблица изменилась.
+        """
+        counts: dict[str, int] = await self.repository.refresh_not_confirmed(
+            overlap_seconds=get_settings().VALIDATION_WATERMARK_OVERLAP
+        )
+        logger.info(
+            f"СЗ без акта: добавлено/обновлено {counts['upserted']}, "
+            f"снято {counts['removed']}, удалено за окном {counts['pruned']}"
+        )
+        if self.cache is not None and any(counts.values()):
+            await self.cache.invalidate(NOT_CONFIRMED_KEY)
+        return counts
 
-    async def get_document_number_and_supply_id(self) -> list[DocumentDataForValidate]:
+    async def get_document_number_and_supply_id(
+        self, begin_date: date | None = None, end_date: date | None = None
+    ) -> list[DocumentDataForValidate]:
         """
         Метод для получения ID поставок по дате формирования акта и имени аккаунта ДЛЯ ВСЕХ АККАУНТОВ
+        :param begin_date: начало периода формирования актов. По умолчанию: вчера
+        :param end_date: конец периода. По умолчанию: begin_date
         """
         data = get_tokens()
-        date_for_query = datetime.now() - timedelta(days=1)
+        begin_date = begin_date or default_validation_date()
+        end_date = end_date or begin_date
         tasks = []
         for account in data.keys():
             task = self.repository.get_document_number_and_supply_id(
-                document_date=date_for_query, account=account
+                begin_date=begin_date, end_date=end_date, account=account
             )
             tasks.append(task)
 
@@ -132,24 +327,262 @@ class DocumentService:
             for record in valid_records
         ]
 
-    async def get_validate_status(self) -> list[ValidateStatus]:
-        tasks = []
-        task_info = []
-        result_list = []
-        documents_data = await self.get_document_number_and_supply_id()
-        for document in documents_data:
-            task = self.repository.validate_orders(
+    async def get_validate_status_json(
+        self, document_date: date | None = None
+    ) -> CachedValue[bytes]:
+        """
+        Результаты валидации актов за дату из таблицы результатов.
+        Кэшируется только дата по умолчанию (вчера) - её запрашивают чаще всего.
+        """
+        if document_date is not None and document_date != default_validation_date():
+            results = await self._read_validate_status(document_date)
+            return CachedValue(
+                value=validate_status_adapter.dump_json(results),
+                computed_at=self._results_computed_at(results),
+            )
+        if self.cache is None:
+            results = await self._read_validate_status(default_validation_date())
+            return CachedValue(
+                value=validate_status_adapter.dump_json(results),
+                computed_at=self._results_computed_at(results),
+            )
+        return await self.cache.get_or_compute_json(
+            key=VALIDATE_STATUS_KEY,
+            compute=lambda: self._read_validate_status(default_validation_date()),
+            adapter=validate_status_adapter,
+        )
+
+    @staticmethod
+    def _results_computed_at(results: list[ValidateStatus]) -> float:
+        computed_at = [
+            result.computed_at.timestamp() for result in results if result.computed_at
+        ]
+        return min(computed_at) if computed_at else time.time()
+
+    async def _read_validate_status(self, document_date: date) -> list[ValidateStatus]:
+        grouped = await self._read_validate_status_range(document_date, document_date)
+        return grouped.get(document_date, [])
+
+    async def _read_validate_status_range(
+        self, begin_date: date, end_date: date
+    ) -> dict[date, list[ValidateStatus]]:
+        records = await self.repository.get_validation_results(
+            begin_date=begin_date, end_date=end_date
+        )
+        grouped = group_by_date(
+            validate_status_adapter.validate_python(
+                [dict(record) for record in records]
+            )
+        )
+        # чтение не запускает валидацию: даты без результатов отдаются пустыми,
+        # их заполняет auto_validate_orders (в том числе за явный период)
+        return {
+            act_date: grouped.get(act_date, [])
+            for act_date in (
+                begin_date + timedelta(days=day)
+                for day in range((end_date - begin_date).days + 1)
+            )
+        }
+
+    async def get_validate_status_range_json(
+        self, begin_date: date, end_date: date
+    ) -> bytes:
+        if begin_date > end_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Начальная дата не может быть больше конечной.",
+            )
+        if (end_date - begin_date).days >= get_settings().VALIDATION_MAX_RANGE_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Период не может быть больше {get_settings().VALIDATION_MAX_RANGE_DAYS} дней.",
+            )
+        grouped = await self._read_validate_status_range(begin_date, end_date)
+        return validate_status_by_date_adapter.dump_json(
+            [
+                ValidateStatusByDate(document_date=act_date, results=results)
+                for act_date, results in grouped.items()
+            ]
+        )
+
+    async def store_validation_results(
+        self, begin_date: date | None = None, end_date: date | None = None
+    ) -> dict[date, list[ValidateStatus]]:
+        """
+        Валидация актов за период и запись результатов в таблицу результатов.
+        :return: результаты, сгруппированные по дате акта
+        """
+        results = await self._compute_validate_status(begin_date, end_date)
+        if results:
+            await self.repository.upsert_validation_results(results)
+        return group_by_date(results)
+
+    async def warm_cache(self) -> None:
+        """
+        Пересчёт кэшируемых представлений и атомарная перезапись их в кэше.
+        TTL больше интервала обновления, чтобы чтения не попадали на пустой кэш.
+        """
+        if self.cache is None:
+            return
+        ttl = get_settings().CACHE_TTL + get_settings().CACHE_REFRESH_INTERVAL
+        await self.cache.set(
+            key=VALIDATE_STATUS_KEY,
+            value=await self._read_validate_status(default_validation_date()),
+            adapter=validate_status_adapter,
+            ttl=ttl,
+        )
+        await self.cache.set(
+            key=NOT_CONFIRMED_KEY,
+            value=await self._compute_validated_orders_without_certificates(),
+            adapter=not_confirmed_adapter,
+            ttl=ttl,
+        )
+        logger.info("Кэш /validated_order/status и /not_confirmed обновлён")
+
+    async def revalidate_dirty_acts(self) -> list[ValidateStatus]:
+        """
+        Инкрементальная валидация: пересчитываются только акты, помеченные
+        изменёнными (новые строки актов или новые статусы СЗ их поставки).
+        """
+        marked = await self.repository.mark_dirty_acts_from_assembly_tasks(
+            overlap_seconds=get_settings().VALIDATION_WATERMARK_OVERLAP
+        )
+        if marked:
+            logger.info(f"Изменились сборочные задания {marked} актов")
+
+        dirty_acts = await self.repository.get_dirty_acts(
+            limit=get_settings().VALIDATION_DIRTY_BATCH_SIZE
+        )
+        if not dirty_acts:
+            logger.info("Изменённых актов для валидации нет")
+            return []
+
+        results = await self._validate_documents(
+            [
+                DocumentDataForValidate(
+                    account=act.get("account"),
+                    document_number=act.get("document_number"),
+                    document_date=act.get("document_date"),
+                    supply_id=f"WB-GI-{act.get('document_number')}",
+                )
+                for act in dirty_acts
+            ]
+        )
+        if results:
+            await self.repository.upsert_validation_results(results)
+
+        # акты с ошибкой валидации остаются помеченными до следующего запуска
+        validated = {
+            (result.account, result.document_number, result.document_date)
+            for result in results
+        }
+        clean_acts = [
+            (
+                act.get("account"),
+                act.get("document_number"),
+                act.get("document_date"),
+                act.get("marked_at"),
+            )
+            for act in dirty_acts
+            if (
+                act.get("account"),
+                act.get("document_number"),
+                act.get("document_date"),
+            )
+            in validated
+        ]
+        if clean_acts:
+            await self.repository.clear_dirty_acts(clean_acts)
+        logger.info(f"Перевалидировано актов: {len(results)} из {len(dirty_acts)}")
+        return results
+
+    async def _compute_validate_status(
+        self, begin_date: date | None = None, end_date: date | None = None
+    ) -> list[ValidateStatus]:
+        return await self._validate_documents(
+            await self.get_document_number_and_supply_id(begin_date, end_date)
+        )
+
+    async def _validate_document(
+        self, semaphore: asyncio.Semaphore, document: DocumentDataForValidate
+    ) -> Record:
+        async with semaphore:
+            return await self.repository.validate_orders(
                 account=document.account,
                 document_number=document.document_number,
                 document_date=document.document_date,
                 supply_id=document.supply_id,
             )
+
+    async def _validate_documents(
+        self, documents_data: list[DocumentDataForValidate]
+    ) -> list[ValidateStatus]:
+        if not documents_data:
+            return []
+        if get_settings().VALIDATION_ENGINE == "numpy":
+            return await self._validate_documents_vectorized(documents_data)
+        return await self._validate_documents_sql(documents_data)
+
+    async def _validate_documents_vectorized(
+        self, documents_data: list[DocumentDataForValidate]
+    ) -> list[ValidateStatus]:
+        """
+        Все акты пакета сверяются в памяти: два потоковых запроса вместо
+        запроса validate_orders на каждый акт
+        """
+        # numpy загружается только для этого движка
+        from src.document.vectorized import VectorizedValidator
+
+        validator = VectorizedValidator(documents_data)
+        await validator.load(
+            act_orders=self.repository.iter_act_orders(
+                accounts=validator.accounts,
+                document_numbers=validator.document_numbers,
+                document_dates=validator.document_dates,
+            ),
+            our_orders=self.repository.iter_our_orders(validator.supply_ids),
+        )
+        results = validator.validate()
+        for result in results:
+            if not result.is_valid:
+                logger.info(
+                    f"Аккаунт: {result.account}, акт {result.document_number} РАСХОЖДЕНИЯ!\n"
+                    f"Количество сборочных заданий в нашей базе данных: {result.only_in_our_service}.\n"
+                    f"Количество сборочных заданий в актах: {result.only_in_acts}.\n"
+                )
+        logger.info(
+            f"Валидация актов (numpy): {len(results)}, "
+            f"с расхождениями {sum(not result.is_valid for result in results)}"
+        )
+        return results
+
+    async def _validate_documents_sql(
+        self, documents_data: list[DocumentDataForValidate]
+    ) -> list[ValidateStatus]:
+        """
+        Акты валидируются группами по (дата, аккаунт); одновременно выполняется
+        не больше запросов, чем соединений в пуле, чтобы период в несколько дней
+        не выбирал весь пул и не ждал соединений в очереди asyncpg.
+        """
+        semaphore = asyncio.Semaphore(self.repository.database.pool_size)
+        tasks = []
+        task_info = []
+        result_list = []
+        for document in sorted(
+            documents_data,
+            key=lambda document: (document.document_date, document.account),
+        ):
+            task = self._validate_document(semaphore, document)
             tasks.append(task)
-            task_info.append((document.account, document.document_number))
+            task_info.append(
+                (document.account, document.document_number, document.document_date)
+            )
 
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        for (account, document_number), result in zip(task_info, results, strict=False):
+        for (account, document_number, act_date), result in zip(
+            task_info, results, strict=False
+        ):
             if isinstance(result, Exception):
                 logger.error(
                     f"Аккаунт: {account}. Ошибка в валидации акта {document_number}: {result}"
@@ -164,6 +597,7 @@ class DocumentService:
                             ValidateStatus(
                                 account=account,
                                 document_number=document_number,
+                                document_date=act_date,
                                 is_valid=record.get("sets_are_equal"),
                                 matching_count=record.get("matching_count"),
                                 only_in_our_service=None,
@@ -180,6 +614,7 @@ class DocumentService:
                             ValidateStatus(
                                 account=account,
                                 document_number=document_number,
+                                document_date=act_date,
                                 is_valid=record.get("sets_are_equal"),
                                 matching_count=record.get("matching_count"),
                                 only_in_our_service=record.get("only_in_our_service"),
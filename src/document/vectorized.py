@@ -0,0 +1,155 @@
+"""
+Векторизованная сверка актов со сборочными заданиями (VALIDATION_ENGINE=numpy).
+
+Вместо запроса validate_orders на каждый акт данные загружаются двумя
+потоковыми запросами (СЗ актов и последние неотменённые СЗ поставок WB-GI-),
+а matching / only_in_acts / only_in_our_service считаются для всех актов сразу.
+
+Пара (номер акта в пакете, ID СЗ) упаковывается в один int64:
+act_index << ORDER_ID_BITS | order_id. После сортировки и удаления дублей массивы упорядочены
+по акту и ID СЗ, совпадения находит один проход np.intersect1d, а счётчики по
+актам - np.bincount по старшим битам.
+"""
+
+from array import array
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import numpy.typing as npt
+from asyncpg.protocol import Record
+
+from src.document.schema import DocumentDataForValidate, ValidateStatus
+
+ORDER_ID_BITS = 40
+ORDER_ID_MASK = (1 << ORDER_ID_BITS) - 1
+MAX_ACTS = 1 << (63 - ORDER_ID_BITS)
+
+
+@dataclass(frozen=True)
+class ReconciliationCounts:
+    matching: npt.NDArray[np.int64]
+    only_in_acts: npt.NDArray[np.int64]
+    only_in_our_service: npt.NDArray[np.int64]
+
+
+def _pack(
+    act_index: npt.NDArray[np.int64], order_ids: npt.NDArray[np.int64]
+) -> npt.NDArray[np.int64]:
+    if np.any((order_ids < 0) | (order_ids > ORDER_ID_MASK)):
+        raise ValueError(f"ID сборочного задания не помещается в {ORDER_ID_BITS} бит")
+    packed = np.sort((act_index << ORDER_ID_BITS) | order_ids)
+    if packed.size == 0:
+        # у акта нет СЗ на одной из сторон
+        return packed
+    # дубли соседние после сортировки; np.unique заметно медленнее на int64
+    return packed[np.concatenate(([True], packed[1:] != packed[:-1]))]
+
+
+def reconcile(
+    acts_count: int,
+    act_index: npt.NDArray[np.int64],
+    act_order_ids: npt.NDArray[np.int64],
+    our_index: npt.NDArray[np.int64],
+    our_order_ids: npt.NDArray[np.int64],
+) -> ReconciliationCounts:
+    """
+    :param acts_count: количество актов в пакете
+    :param act_index, act_order_ids: пары (номер акта, ID СЗ из акта)
+    :param our_index, our_order_ids: пары (номер акта, ID СЗ из внутренней БД)
+    """
+    if acts_count > MAX_ACTS:
+        raise ValueError(f"Пакет не может содержать больше {MAX_ACTS} актов")
+    acts = _pack(act_index, act_order_ids)
+    ours = _pack(our_index, our_order_ids)
+    matched = np.intersect1d(acts, ours, assume_unique=True)
+
+    matching = np.bincount(matched >> ORDER_ID_BITS, minlength=acts_count)
+    in_acts = np.bincount(acts >> ORDER_ID_BITS, minlength=acts_count)
+    in_ours = np.bincount(ours >> ORDER_ID_BITS, minlength=acts_count)
+    return ReconciliationCounts(
+        matching=matching,
+        only_in_acts=in_acts - matching,
+        only_in_our_service=in_ours - matching,
+    )
+
+
+class VectorizedValidator:
+    """
+    Сверка пакета актов. Запросы репозитория возвращают пары (act_index, order_id),
+    где act_index - позиция акта в пакете, поэтому загрузка - только дописывание
+    чисел в array('q'), без поиска актов по ключу в Python.
+    """
+
+    def __init__(self, documents: Sequence[DocumentDataForValidate]) -> None:
+        self.documents = list(documents)
+        self._act_rows = array("q")
+        self._act_orders = array("q")
+        self._our_rows = array("q")
+        self._our_orders = array("q")
+
+    @property
+    def accounts(self) -> list[str]:
+        return [document.account for document in self.documents]
+
+    @property
+    def document_numbers(self) -> list[str]:
+        return [document.document_number for document in self.documents]
+
+    @property
+    def document_dates(self) -> list[date]:
+        return [document.document_date for document in self.documents]
+
+    @property
+    def supply_ids(self) -> list[str]:
+        # по поставке на акт: одна поставка WB-GI- может относиться к нескольким актам
+        return [document.supply_id for document in self.documents]
+
+    def add_act_order(self, act_index: int, order_id: int) -> None:
+        self._act_rows.append(act_index)
+        self._act_orders.append(order_id)
+
+    def add_our_order(self, act_index: int, order_id: int) -> None:
+        self._our_rows.append(act_index)
+        self._our_orders.append(order_id)
+
+    async def load(
+        self,
+        act_orders: AsyncIterator[Record],
+        our_orders: AsyncIterator[Record],
+    ) -> None:
+        async for act_index, order_id in act_orders:
+            self.add_act_order(act_index, order_id)
+        async for act_index, order_id in our_orders:
+            self.add_our_order(act_index, order_id)
+
+    def validate(self) -> list[ValidateStatus]:
+        counts = reconcile(
+            acts_count=len(self.documents),
+            act_index=np.frombuffer(self._act_rows, dtype=np.int64),
+            act_order_ids=np.frombuffer(self._act_orders, dtype=np.int64),
+            our_index=np.frombuffer(self._our_rows, dtype=np.int64),
+            our_order_ids=np.frombuffer(self._our_orders, dtype=np.int64),
+        )
+        is_valid = (counts.only_in_acts == 0) & (counts.only_in_our_service == 0)
+
+        return [
+            ValidateStatus(
+                account=document.account,
+                document_number=document.document_number,
+                document_date=document.document_date,
+                is_valid=valid,
+                matching_count=matching,
+                only_in_our_service=None if valid else only_in_our_service,
+                only_in_acts=None if valid else only_in_acts,
+            )
+            for document, valid, matching, only_in_acts, only_in_our_service in zip(
+                self.documents,
+                is_valid.tolist(),
+                counts.matching.tolist(),
+                counts.only_in_acts.tolist(),
+                counts.only_in_our_service.tolist(),
+                strict=True,
+            )
+        ]
@@ -1,16 +1,43 @@
-from fastapi import APIRouter, Depends
+import uuid
+from typing import TYPE_CHECKING
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from redis.asyncio import Redis
 
-from src.celery.tasks.document_service import DocumentsService
 from src.dependencies.handle_trigger.update_acceptance_certificates import (
-    get_documents_validation_repository,
+    get_celery_app,
+    get_redis,
 )
+from src.ingest.progress import IngestProgress
+from src.ingest.schema import IngestJobState, IngestJobStatus
+
+if TYPE_CHECKING:
+    from celery import Celery
 
 update_certificates = APIRouter(prefix="/handle_trigger", tags=["/handle_trigger"])
 
 
-@update_certificates.post("/update_acceptance_certificates")
+@update_certificates.post(
+    "/update_acceptance_certificates", status_code=status.HTTP_202_ACCEPTED
+)
 async def update_acceptance_certificates(
-    documents_service: DocumentsService = Depends(get_documents_validation_repository),
+    redis: Redis = Depends(get_redis),
+    celery_app: "Celery" = Depends(get_celery_app),
 ) -> dict[str, str | int]:
-    await documents_service._sync_update_acceptance_certificates()
-    return {"status": 201, "message": "database updated"}
+    job_id = str(uuid.uuid4())
+    await IngestProgress(redis, job_id).set_state(IngestJobState.QUEUED)
+    celery_app.send_task("update_acceptance_certificates_task", task_id=job_id)
+    return {"status": 202, "job_id": job_id, "message": "update queued"}
+
+
+@update_certificates.get(
+    "/update_acceptance_certificates/{job_id}", response_model=IngestJobStatus
+)
+async def get_update_acceptance_certificates_status(
+    job_id: str,
+    redis: Redis = Depends(get_redis),
+) -> IngestJobStatus:
+    job_status = await IngestProgress(redis, job_id).get()
+    if job_status is None:
+        raise HTTPException(status_code=404, detail="Задание не найдено")
+    return job_status
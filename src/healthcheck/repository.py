@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from logging import getLogger
 
 from asyncpg import (
@@ -10,11 +10,13 @@ from asyncpg import (
 from asyncpg.protocol import Record
 
 from src.dependencies.database import DatabasePoolManager
+from src.metrics.instrumentation import instrument_repository
 from src.utils.decorators import error_handler_http
 
 logger = getLogger(__name__)
 
 
+@instrument_repository
 class HealthcheckRepository:
     def __init__(self, database: DatabasePoolManager):
         self.database = database
@@ -29,13 +31,15 @@ class HealthcheckRepository:
             ConnectionDoesNotExistError,
         ),
     )
-    async def get_data_for_healthcheck(self) -> Record | None:
+    async def update_healthcheck_status(
+        self, status_data: list[datetime | bool]
+    ) -> None:
         query = """
-        SELECT * FROM acceptance_fbs_acts_new
-        WHERE created_at = CURRENT_DATE
-        LIMIT 1;
+        INSERT INTO fbs_acts_healthcheck_status
+        VALUES($1, $2, $3, $4);
         """
-        return await self.database.fetchrow(query)
+
+        await self.database.execute(query, *status_data)
 
     @error_handler_http(
         status_code=500,
@@ -47,15 +51,12 @@ class HealthcheckRepository:
             ConnectionDoesNotExistError,
         ),
     )
-    async def update_healthcheck_status(
-        self, status_data: list[datetime | bool]
-    ) -> None:
+    async def get_healthcheck_status(self) -> Record:
         query = """
-        INSERT INTO fbs_acts_healthcheck_status
-        VALUES($1, $2, $3, $4);
+        SELECT * FROM fbs_acts_healthcheck_status
+        ORDER BY healthcheck_time DESC;
         """
-
-        await self.database.execute(query, *status_data)
+        return await self.database.fetch(query)
 
     @error_handler_http(
         status_code=500,
@@ -67,9 +68,11 @@ class HealthcheckRepository:
             ConnectionDoesNotExistError,
         ),
     )
-    async def get_healthcheck_status(self) -> Record:
+    async def get_wb_api_status(self, ingest_date: date) -> Record:
         query = """
-        SELECT * FROM fbs_acts_healthcheck_status
-        ORDER BY healthcheck_time DESC;
+        SELECT account, status, circuit_state, error_class, updated_at
+        FROM acceptance_certificates_ingest_outcomes
+        WHERE ingest_date = $1::date
+        ORDER BY account;
         """
-        return await self.database.fetch(query)
+        return await self.database.fetch(query, ingest_date)
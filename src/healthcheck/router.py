@@ -1,7 +1,21 @@
 from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
 
-from src.dependencies.get_healthcheck_status import get_healthcheck_service
-from src.healthcheck.schema import HealthcheckStatusResponseModel
+from src.dependencies.database import DatabasePoolManager, PoolStats
+from src.dependencies.get_healthcheck_status import (
+    get_database,
+    get_healthcheck_service,
+)
+from src.dependencies.handle_trigger.update_acceptance_certificates import get_redis
+from src.dependencies.slow_query_log import (
+    SlowQueryLogConfig,
+    read_config,
+    write_config,
+)
+from src.healthcheck.schema import (
+    HealthcheckStatusResponseModel,
+    WBApiStatusResponseModel,
+)
 from src.healthcheck.service import HealthcheckService
 
 healthcheck = APIRouter(prefix="/healthcheck", tags=["/healthсheck"])
@@ -12,3 +26,38 @@ async def get_healthcheck_status(
     healthcheck_service: HealthcheckService = Depends(get_healthcheck_service),
 ) -> HealthcheckStatusResponseModel:
     return await healthcheck_service.get_healthcheck_status()
+
+
+@healthcheck.get("/wb_api")
+async def get_wb_api_status(
+    healthcheck_service: HealthcheckService = Depends(get_healthcheck_service),
+) -> WBApiStatusResponseModel:
+    return await healthcheck_service.get_wb_api_status()
+
+
+@healthcheck.get("/pool", response_model=PoolStats)
+async def get_pool_stats(
+    database: DatabasePoolManager = Depends(get_database),
+) -> PoolStats:
+    """Заполненность пула соединений API и статистика ожидания/удержания"""
+    return database.stats()
+
+
+@healthcheck.get("/slow_query_log", response_model=SlowQueryLogConfig)
+async def get_slow_query_log_config(
+    redis: Redis = Depends(get_redis),
+) -> SlowQueryLogConfig:
+    return await read_config(redis)
+
+
+@healthcheck.put("/slow_query_log", response_model=SlowQueryLogConfig)
+async def update_slow_query_log_config(
+    config: SlowQueryLogConfig,
+    redis: Redis = Depends(get_redis),
+) -> SlowQueryLogConfig:
+    """
+    Включение/настройка журнала медленных запросов во время работы: процессы
+    API и Celery применяют настройки в течение SLOW_QUERY_LOG_REFRESH_INTERVAL
+    """
+    await write_config(redis, config)
+    return config
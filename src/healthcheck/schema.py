@@ -18,6 +18,22 @@ class HealthcheckStatusResponseModel(BaseModel):
     data: list[HealthcheckStatusSchema]
 
 
+class WBApiStatusSchema(BaseModel):
+    account: str = Field(description="Имя аккаунта")
+    ingest_status: str = Field(description="Результат последней загрузки актов")
+    circuit_state: str | None = Field(
+        description="Состояние circuit breaker'а WB API (closed/open/half_open)"
+    )
+    error_class: str | None = Field(description="Класс ошибки загрузки")
+    updated_at: datetime = Field(description="Время последней загрузки")
+
+
+class WBApiStatusResponseModel(BaseModel):
+    status: int
+    is_wb_api_error: bool = Field(description="Статус исправности WB API")
+    data: list[WBApiStatusSchema]
+
+
 class HealthcheckStatus(Enum):
     SUCCESS = (True, False, False)
     INNER_METHOD_FAIL = (False, True, False)
@@ -1,21 +1,32 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from asyncpg.protocol import Record
 from fastapi import status
 
+from src.circuit_breaker import CircuitBreakerRegistry, CircuitState
 from src.healthcheck.repository import HealthcheckRepository
 from src.healthcheck.schema import (
     HealthcheckStatusResponseModel,
     HealthcheckStatusSchema,
+    WBApiStatusResponseModel,
+    WBApiStatusSchema,
 )
+from src.ingest.schema import IngestStatus
 
 
 class HealthcheckService:
-    def __init__(self, repository: HealthcheckRepository):
+    def __init__(
+        self,
+        repository: HealthcheckRepository,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+    ):
         self.repository = repository
+        self.circuit_breakers = circuit_breakers
 
-    async def healthcheck(self) -> Record:
-        return await self.repository.get_data_for_healthcheck()
+    async def get_circuit_state(self, account: str) -> CircuitState | None:
+        """Текущее состояние circuit breaker'а WB API аккаунта, общее для всех процессов"""
+        if self.circuit_breakers is None:
+            return None
+        return await self.circuit_breakers.account_state(account)
 
     async def update_healthcheck_status(
         self, status_data: tuple[datetime, bool, bool, bool]
@@ -38,3 +49,28 @@ class HealthcheckService:
         ]
 
         return HealthcheckStatusResponseModel(status=status.HTTP_200_OK, data=data)
+
+    async def get_wb_api_status(self) -> WBApiStatusResponseModel:
+        records = await self.repository.get_wb_api_status(ingest_date=date.today())
+
+        data = [
+            WBApiStatusSchema(
+                account=record.get("account"),
+                ingest_status=record.get("status"),
+                circuit_state=await self.get_circuit_state(record.get("account"))
+                or record.get("circuit_state"),
+                error_class=record.get("error_class"),
+                updated_at=record.get("updated_at"),
+            )
+            for record in records
+        ]
+
+        return WBApiStatusResponseModel(
+            status=status.HTTP_200_OK,
+            is_wb_api_error=any(
+                item.circuit_state == CircuitState.OPEN.value
+                or item.ingest_status == IngestStatus.WB_API_FAIL.value
+                for item in data
+            ),
+            data=data,
+        )
@@ -0,0 +1,135 @@
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+# количество в акте может отсутствовать; в столбце int64 это отрицательное значение
+NULL_COUNT = -1
+
+# столбцы acceptance_fbs_acts_new в порядке ActBatch.records()
+COPY_COLUMNS = (
+    "order_number",
+    "unit",
+    "sticker",
+    "quantity",
+    "document",
+    "document_number",
+    "date",
+    "account",
+    "created_at",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class ActFile:
+    """Скалярные поля Excel-файла акта: хранятся один раз на файл, а не на строку."""
+
+    account: str
+    document_number: str
+    date: date
+    start: int
+    stop: int
+
+    @property
+    def document(self) -> str:
+        return f"act-income-mp-{self.document_number}.zip"
+
+    @property
+    def supply_id(self) -> str:
+        return f"WB-GI-{self.document_number}"
+
+
+class ActBatch:
+    """
+    Распарсенные строки актов в столбцах array('q'): order_id, sticker, count.
+    Строки файла занимают диапазон [start, stop) столбцов.
+    unzip_seconds / parse_seconds / workbooks - статистика разбора для ingest_runs.
+    """
+
+    __slots__ = (
+        "counts",
+        "created_at",
+        "files",
+        "order_ids",
+        "parse_seconds",
+        "stickers",
+        "unzip_seconds",
+        "workbooks",
+    )
+
+    def __init__(self, created_at: date) -> None:
+        self.created_at = created_at
+        self.order_ids = array("q")
+        self.stickers = array("q")
+        self.counts = array("q")
+        self.files: list[ActFile] = []
+        self.unzip_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.workbooks = 0
+
+    def __len__(self) -> int:
+        return len(self.order_ids)
+
+    def add_file(
+        self,
+        account: str,
+        document_number: str,
+        file_date: date,
+        order_ids: bytes,
+        stickers: bytes,
+        counts: bytes,
+    ) -> None:
+        """Столбцы файла передаются буферами int64 (например, ndarray.tobytes())"""
+        start = len(self)
+        self.order_ids.frombytes(order_ids)
+        self.stickers.frombytes(stickers)
+        self.counts.frombytes(counts)
+        self.files.append(
+            ActFile(
+                account=account,
+                document_number=document_number,
+                date=file_date,
+                start=start,
+                stop=len(self),
+            )
+        )
+
+    def extend(self, other: "ActBatch") -> None:
+        offset = len(self)
+        self.unzip_seconds += other.unzip_seconds
+        self.parse_seconds += other.parse_seconds
+        self.workbooks += other.workbooks
+        self.order_ids.extend(other.order_ids)
+        self.stickers.extend(other.stickers)
+        self.counts.extend(other.counts)
+        self.files.extend(
+            ActFile(
+                account=file.account,
+                document_number=file.document_number,
+                date=file.date,
+                start=file.start + offset,
+                stop=file.stop + offset,
+            )
+            for file in other.files
+        )
+
+    def records(self) -> Iterator[tuple[Any, ...]]:
+        """
+        Записи для asyncpg copy_records_to_table в порядке COPY_COLUMNS.
+        Кортежи создаются по одному при отправке, в памяти не накапливаются.
+        """
+        for file in self.files:
+            for i in range(file.start, file.stop):
+                count = self.counts[i]
+                yield (
+                    str(self.order_ids[i]),
+                    "шт.",
+                    str(self.stickers[i]),
+                    None if count == NULL_COUNT else count,
+                    file.document,
+                    file.document_number,
+                    file.date,
+                    file.account,
+                    self.created_at,
+                )
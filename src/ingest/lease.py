@@ -0,0 +1,161 @@
+import asyncio
+import contextlib
+import json
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import date
+from logging import getLogger
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.ingest.schema import AccountIngestOutcome
+
+logger = getLogger(__name__)
+
+# снятие и продление аренды только владельцем (compare-and-delete / compare-and-pexpire)
+_RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_RENEW_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class IngestLease:
+    """
+    Аренда (lease) стадии загрузки актов аккаунта за дату в Redis.
+
+    ingest:lease:<stage>:<account>:<date>   - токен владельца, TTL продлевается,
+                                              пока стадия выполняется
+    ingest:result:<stage>:<account>:<date>  - {token, outcome} последнего владельца
+
+    Второй запуск той же стадии (beat, ретрай healthcheck, ручной триггер) не
+    повторяет работу, а дожидается снятия аренды и возвращает результат владельца.
+    Если воркер владельца умер, аренда истекает сама и работа выполняется заново.
+    При недоступности Redis стадия выполняется без блокировки.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        ttl: float,
+        poll_interval: float = 1.0,
+        result_ttl: int = 3600,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+
+    @staticmethod
+    def _keys(stage: str, account: str, ingest_date: date) -> tuple[str, str]:
+        suffix = f"{stage}:{account}:{ingest_date.isoformat()}"
+        return f"ingest:lease:{suffix}", f"ingest:result:{suffix}"
+
+    async def _acquire(self, lease_key: str, token: str) -> bool:
+        return bool(
+            await self.client.set(lease_key, token, nx=True, px=int(self.ttl * 1000))
+        )
+
+    async def _renew(self, lease_key: str, token: str) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                renewed = await self.client.eval(
+                    _RENEW_LEASE_SCRIPT, 1, lease_key, token, int(self.ttl * 1000)
+                )
+            except RedisError as error:
+                logger.error(f"Ошибка продления аренды {lease_key}: {error}")
+                continue
+            if not renewed:
+                logger.warning(f"Аренда {lease_key} потеряна до завершения стадии")
+                return
+
+    async def _release(self, lease_key: str, token: str) -> None:
+        try:
+            await self.client.eval(_RELEASE_LEASE_SCRIPT, 1, lease_key, token)
+        except RedisError as error:
+            logger.error(f"Ошибка снятия аренды {lease_key}: {error}")
+
+    async def _save_result(
+        self, result_key: str, token: str, outcome: AccountIngestOutcome
+    ) -> None:
+        payload = json.dumps(
+            {"token": token, "outcome": outcome.model_dump(mode="json")}
+        )
+        try:
+            await self.client.set(result_key, payload, ex=self.result_ttl)
+        except RedisError as error:
+            logger.error(f"Ошибка записи результата {result_key}: {error}")
+
+    async def _wait_for_result(
+        self, lease_key: str, result_key: str
+    ) -> AccountIngestOutcome | None:
+        """
+        Ожидание снятия чужой аренды. None - если владелец не записал результат
+        (аренда истекла) и стадию нужно выполнить заново.
+        """
+        holder = await self.client.get(lease_key)
+        while holder is not None:
+            await asyncio.sleep(self.poll_interval)
+            current = await self.client.get(lease_key)
+            if current is None:
+                break
+            holder = current
+
+        if holder is None:
+            return None
+        payload = await self.client.get(result_key)
+        if payload is None:
+            return None
+        result = json.loads(payload)
+        holder_token = holder.decode() if isinstance(holder, bytes) else holder
+        if result.get("token") != holder_token:
+            return None
+        return AccountIngestOutcome.model_validate(result["outcome"])
+
+    async def run(
+        self,
+        stage: str,
+        account: str,
+        ingest_date: date,
+        work: Callable[[], Awaitable[AccountIngestOutcome]],
+    ) -> AccountIngestOutcome:
+        lease_key, result_key = self._keys(stage, account, ingest_date)
+        token = uuid.uuid4().hex
+
+        while True:
+            try:
+                if await self._acquire(lease_key, token):
+                    break
+                outcome = await self._wait_for_result(lease_key, result_key)
+            except RedisError as error:
+                logger.error(
+                    f"Ошибка аренды {lease_key}, выполнение без блокировки: {error}"
+                )
+                return await work()
+            if outcome is not None:
+                logger.info(
+                    f"Аккаунт {account}: стадия {stage} уже выполнена параллельным "
+                    "запуском, используется его результат"
+                )
+                return outcome
+
+        renewal = asyncio.create_task(self._renew(lease_key, token))
+        try:
+            outcome = await work()
+            await self._save_result(result_key, token, outcome)
+            return outcome
+        finally:
+            renewal.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await renewal
+            await self._release(lease_key, token)
@@ -0,0 +1,98 @@
+import json
+from datetime import datetime
+from logging import getLogger
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.ingest.schema import IngestJobState, IngestJobStatus
+
+logger = getLogger(__name__)
+
+# прогресс задания хранится двое суток
+PROGRESS_TTL = 2 * 24 * 3600
+
+
+class IngestProgress:
+    """
+    Прогресс задания загрузки актов в Redis.
+
+    ingest:job:<job_id>                  - hash: state, accounts, created_at, updated_at, result
+    ingest:job:<job_id>:account:<name>   - hash: stage, documents_listed, downloaded,
+                                           rows_parsed, rows_inserted, status, error
+
+    Ошибки Redis только логируются: прогресс не должен ломать загрузку.
+    """
+
+    def __init__(self, client: Redis, job_id: str) -> None:
+        self.client = client
+        self.job_id = job_id
+
+    @property
+    def _job_key(self) -> str:
+        return f"ingest:job:{self.job_id}"
+
+    def _account_key(self, account: str) -> str:
+        return f"{self._job_key}:account:{account}"
+
+    async def _hset(self, key: str, fields: dict[str, Any]) -> None:
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={k: str(v) for k, v in fields.items()})
+                pipe.hset(self._job_key, "updated_at", datetime.now().isoformat())
+                pipe.expire(key, PROGRESS_TTL)
+                pipe.expire(self._job_key, PROGRESS_TTL)
+                await pipe.execute()
+        except RedisError as error:
+            logger.error(f"Ошибка записи прогресса задания {self.job_id}: {error}")
+
+    async def set_state(
+        self,
+        state: IngestJobState,
+        accounts: list[str] | None = None,
+        result: str | None = None,
+    ) -> None:
+        fields: dict[str, Any] = {"state": state.value}
+        if state == IngestJobState.QUEUED:
+            fields["created_at"] = datetime.now().isoformat()
+        if accounts is not None:
+            fields["accounts"] = json.dumps(accounts, ensure_ascii=False)
+        if result is not None:
+            fields["result"] = result
+        await self._hset(self._job_key, fields)
+
+    async def update_account(self, account: str, **fields: Any) -> None:
+        await self._hset(self._account_key(account), fields)
+
+    @staticmethod
+    def _decode(fields: dict[Any, Any]) -> dict[str, str]:
+        return {
+            (key.decode() if isinstance(key, bytes) else key): (
+                value.decode() if isinstance(value, bytes) else value
+            )
+            for key, value in fields.items()
+        }
+
+    async def get(self) -> IngestJobStatus | None:
+        raw_job = await self.client.hgetall(self._job_key)
+        if not raw_job:
+            return None
+        job = self._decode(raw_job)
+        accounts = json.loads(job.pop("accounts", "[]"))
+
+        async with self.client.pipeline(transaction=False) as pipe:
+            for account in accounts:
+                pipe.hgetall(self._account_key(account))
+            account_hashes = await pipe.execute()
+
+        return IngestJobStatus.model_validate(
+            {
+                **job,
+                "job_id": self.job_id,
+                "accounts": [
+                    {**self._decode(fields), "account": account}
+                    for account, fields in zip(accounts, account_hashes, strict=True)
+                ],
+            }
+        )
@@ -0,0 +1,184 @@
+from datetime import date
+from logging import getLogger
+
+from asyncpg import (
+    ConnectionDoesNotExistError,
+    ConnectionFailureError,
+    InterfaceError,
+    PostgresError,
+)
+from asyncpg.protocol import Record
+
+from src.dependencies.database import DatabasePoolManager
+from src.ingest.schema import AccountIngestOutcome
+from src.metrics.instrumentation import instrument_repository
+from src.utils.decorators import error_handler_http
+
+logger = getLogger(__name__)
+
+
+@instrument_repository
+class IngestRepository:
+    def __init__(self, database: DatabasePoolManager):
+        self.database = database
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def upsert_outcomes(
+        self, outcomes: list[AccountIngestOutcome], ingest_date: date
+    ) -> None:
+        query = """
+        INSERT INTO acceptance_certificates_ingest_outcomes
+            (account, ingest_date, status, row_count, error_class, error,
+             circuit_state, updated_at)
+        VALUES
+            ($1, $2, $3, $4, $5, $6, $7, now())
+        ON CONFLICT (account, ingest_date) DO UPDATE SET
+            status = EXCLUDED.status,
+            row_count = EXCLUDED.row_count,
+            error_class = EXCLUDED.error_class,
+            error = EXCLUDED.error,
+            circuit_state = EXCLUDED.circuit_state,
+            updated_at = EXCLUDED.updated_at;
+        """
+        await self.database.executemany(
+            query,
+            [
+                (
+                    outcome.account,
+                    ingest_date,
+                    outcome.status.value,
+                    outcome.row_count,
+                    outcome.error_class,
+                    outcome.error,
+                    outcome.circuit_state.value if outcome.circuit_state else None,
+                )
+                for outcome in outcomes
+            ],
+        )
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def get_outcomes(self, ingest_date: date) -> Record:
+        query = """
+        SELECT
+            account, ingest_date, status, row_count, error_class, error,
+            circuit_state, updated_at
+        FROM acceptance_certificates_ingest_outcomes
+        WHERE ingest_date = $1::date;
+        """
+        return await self.database.fetch(query, ingest_date)
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def insert_runs(
+        self, job_id: str, outcomes: list[AccountIngestOutcome], ingest_date: date
+    ) -> None:
+        query = """
+        INSERT INTO ingest_runs
+            (job_id, account, ingest_date, status, error_class,
+             list_seconds, download_seconds, decode_seconds, unzip_seconds,
+             parse_seconds, insert_seconds, bytes_downloaded, workbooks,
+             rows_parsed, rows_inserted, rows_conflicted)
+        VALUES
+            ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16)
+        ON CONFLICT (job_id, account) DO UPDATE SET
+            status = EXCLUDED.status,
+            error_class = EXCLUDED.error_class,
+            list_seconds = EXCLUDED.list_seconds,
+            download_seconds = EXCLUDED.download_seconds,
+            decode_seconds = EXCLUDED.decode_seconds,
+            unzip_seconds = EXCLUDED.unzip_seconds,
+            parse_seconds = EXCLUDED.parse_seconds,
+            insert_seconds = EXCLUDED.insert_seconds,
+            bytes_downloaded = EXCLUDED.bytes_downloaded,
+            workbooks = EXCLUDED.workbooks,
+            rows_parsed = EXCLUDED.rows_parsed,
+            rows_inserted = EXCLUDED.rows_inserted,
+            rows_conflicted = EXCLUDED.rows_conflicted,
+            recorded_at = now();
+        """
+        await self.database.executemany(
+            query,
+            [
+                (
+                    job_id,
+                    outcome.account,
+                    ingest_date,
+                    outcome.status.value,
+                    outcome.error_class,
+                    outcome.metrics.list_seconds,
+                    outcome.metrics.download_seconds,
+                    outcome.metrics.decode_seconds,
+                    outcome.metrics.unzip_seconds,
+                    outcome.metrics.parse_seconds,
+                    outcome.metrics.insert_seconds,
+                    outcome.metrics.bytes_downloaded,
+                    outcome.metrics.workbooks,
+                    outcome.metrics.rows_parsed,
+                    outcome.metrics.rows_inserted,
+                    outcome.metrics.rows_conflicted,
+                )
+                for outcome in outcomes
+            ],
+        )
+
+    @error_handler_http(
+        status_code=500,
+        message="Database occure error",
+        exceptions=(
+            PostgresError,
+            InterfaceError,
+            ConnectionFailureError,
+            ConnectionDoesNotExistError,
+        ),
+    )
+    async def get_runs(
+        self,
+        begin_date: date,
+        end_date: date,
+        account: str | None,
+        page_size: int,
+        offset: int,
+    ) -> Record:
+        query = """
+        SELECT
+            job_id, account, ingest_date, status, error_class,
+            list_seconds, download_seconds, decode_seconds, unzip_seconds,
+            parse_seconds, insert_seconds, bytes_downloaded, workbooks,
+            rows_parsed, rows_inserted, rows_conflicted, recorded_at
+        FROM ingest_runs
+        WHERE
+            ingest_date BETWEEN $1::date AND $2::date AND
+            ($3::text IS NULL OR account = $3::text)
+        ORDER BY recorded_at DESC, account
+        LIMIT $4
+        OFFSET $5;
+        """
+        return await self.database.fetch(
+            query, begin_date, end_date, account, page_size, offset
+        )
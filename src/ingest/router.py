@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, Query, status
+
+from src.dependencies.get_ingest_runs import get_ingest_service
+from src.ingest.schema import IngestRun
+from src.ingest.service import IngestService
+
+ingest_runs = APIRouter(prefix="/ingest_runs", tags=["/ingest_runs"])
+
+
+@ingest_runs.get("/", response_model=list[IngestRun], status_code=status.HTTP_200_OK)
+async def get_ingest_runs(
+    begin_date: date | None = Query(default=None),
+    end_date: date | None = Query(default=None),
+    account: str | None = Query(default=None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(200, ge=1, le=1000),
+    service: IngestService = Depends(get_ingest_service),
+) -> list[IngestRun]:
+    """
+    Длительность стадий и объёмы загрузки актов по аккаунтам и запускам.
+    По умолчанию - за последние 7 дней.
+    """
+    end_date = end_date or date.today()
+    return await service.get_runs(
+        begin_date=begin_date or end_date - timedelta(days=7),
+        end_date=end_date,
+        account=account,
+        page=page,
+        page_size=page_size,
+    )
@@ -0,0 +1,106 @@
+from datetime import date, datetime
+from enum import StrEnum
+
+from pydantic import BaseModel, Field
+
+from src.circuit_breaker import CircuitState
+
+
+class IngestStatus(StrEnum):
+    SUCCESS = "success"
+    WB_API_FAIL = "wb_api_fail"
+    INNER_METHOD_FAIL = "inner_method_fail"
+
+
+class IngestRunMetrics(BaseModel):
+    """Длительность стадий (с) и объёмы загрузки актов одного аккаунта"""
+
+    list_seconds: float | None = Field(
+        default=None, description="Получение списка документов WB API"
+    )
+    download_seconds: float | None = Field(
+        default=None, description="Скачивание архива WB API"
+    )
+    decode_seconds: float | None = Field(
+        default=None, description="Декодирование base64"
+    )
+    unzip_seconds: float | None = Field(
+        default=None, description="Распаковка Excel-файлов из архива"
+    )
+    parse_seconds: float | None = Field(default=None, description="Разбор Excel-файлов")
+    insert_seconds: float | None = Field(default=None, description="Запись строк в БД")
+    bytes_downloaded: int = Field(default=0, description="Размер архива, байт")
+    workbooks: int = Field(default=0, description="Прочитано Excel-файлов")
+    rows_parsed: int = Field(default=0, description="Распарсено строк актов")
+    rows_inserted: int = Field(default=0, description="Записано новых строк")
+    rows_conflicted: int = Field(
+        default=0, description="Строки, уже загруженные ранее (ON CONFLICT)"
+    )
+
+
+class AccountIngestOutcome(BaseModel):
+    account: str = Field(description="Имя аккаунта")
+    status: IngestStatus = Field(description="Результат загрузки актов аккаунта")
+    row_count: int = Field(default=0, description="Количество загруженных строк")
+    error: str | None = Field(default=None, description="Описание ошибки")
+    error_class: str | None = Field(default=None, description="Класс ошибки")
+    circuit_state: CircuitState | None = Field(
+        default=None, description="Состояние circuit breaker'а WB API аккаунта"
+    )
+    artifact_path: str | None = Field(
+        default=None, description="Путь к скачанному архиву в хранилище артефактов"
+    )
+    metrics: IngestRunMetrics = Field(
+        default_factory=IngestRunMetrics,
+        description="Длительность стадий и объёмы загрузки",
+    )
+
+
+class IngestRun(IngestRunMetrics):
+    job_id: str = Field(description="ID задания загрузки актов")
+    account: str = Field(description="Имя аккаунта")
+    ingest_date: date = Field(description="Дата загрузки")
+    status: IngestStatus = Field(description="Результат загрузки актов аккаунта")
+    error_class: str | None = Field(default=None, description="Класс ошибки")
+    recorded_at: datetime = Field(description="Время записи результата")
+
+
+class IngestJobState(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FINISHED = "finished"
+
+
+class IngestStage(StrEnum):
+    LISTING = "listing"
+    DOWNLOADING = "downloading"
+    DOWNLOADED = "downloaded"
+    PARSING = "parsing"
+    INSERTING = "inserting"
+    DONE = "done"
+
+
+class AccountProgress(BaseModel):
+    account: str = Field(description="Имя аккаунта")
+    stage: IngestStage | None = Field(default=None, description="Текущая стадия")
+    documents_listed: int = Field(default=0, description="Найдено документов в WB")
+    downloaded: int = Field(default=0, description="Скачано документов")
+    rows_parsed: int = Field(default=0, description="Распарсено строк актов")
+    rows_inserted: int = Field(default=0, description="Записано строк актов в БД")
+    status: IngestStatus | None = Field(
+        default=None, description="Результат загрузки аккаунта"
+    )
+    error: str | None = Field(default=None, description="Описание ошибки")
+
+
+class IngestJobStatus(BaseModel):
+    job_id: str = Field(description="ID задания загрузки актов")
+    state: IngestJobState = Field(description="Состояние задания")
+    created_at: datetime | None = Field(default=None, description="Время постановки")
+    updated_at: datetime | None = Field(
+        default=None, description="Время последнего обновления прогресса"
+    )
+    result: str | None = Field(
+        default=None, description="Итоговый статус healthcheck задания"
+    )
+    accounts: list[AccountProgress] = Field(description="Прогресс по аккаунтам")
@@ -0,0 +1,60 @@
+from collections.abc import Iterable
+from datetime import date
+from logging import getLogger
+
+from src.ingest.repository import IngestRepository
+from src.ingest.schema import AccountIngestOutcome, IngestRun, IngestStatus
+
+logger = getLogger(__name__)
+
+
+class IngestService:
+    def __init__(self, repository: IngestRepository):
+        self.repository = repository
+
+    async def record_outcomes(
+        self, outcomes: list[AccountIngestOutcome], ingest_date: date
+    ) -> None:
+        if outcomes:
+            await self.repository.upsert_outcomes(
+                outcomes=outcomes, ingest_date=ingest_date
+            )
+
+    async def record_runs(
+        self, job_id: str, outcomes: list[AccountIngestOutcome], ingest_date: date
+    ) -> None:
+        if outcomes:
+            await self.repository.insert_runs(
+                job_id=job_id, outcomes=outcomes, ingest_date=ingest_date
+            )
+
+    async def get_runs(
+        self,
+        begin_date: date,
+        end_date: date,
+        account: str | None,
+        page: int,
+        page_size: int,
+    ) -> list[IngestRun]:
+        records = await self.repository.get_runs(
+            begin_date=begin_date,
+            end_date=end_date,
+            account=account,
+            page_size=page_size,
+            offset=(page - 1) * page_size,
+        )
+        return [IngestRun.model_validate(dict(record)) for record in records]
+
+    async def get_accounts_to_retry(
+        self, accounts: Iterable[str], ingest_date: date
+    ) -> list[str]:
+        """
+        Аккаунты, загрузка которых за ingest_date завершилась ошибкой или не выполнялась
+        """
+        records = await self.repository.get_outcomes(ingest_date=ingest_date)
+        succeeded = {
+            record.get("account")
+            for record in records
+            if record.get("status") == IngestStatus.SUCCESS.value
+        }
+        return [account for account in accounts if account not in succeeded]
@@ -6,10 +6,20 @@ from typing import Any
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
+from src.cache.redis_cache import RedisCache, create_redis_client
 from src.dependencies.database import DatabasePoolManager
+from src.dependencies.migrations import apply_migrations
 from src.document.router import validated_order
 from src.handle_trigger.update_acceptance_certificates.router import update_certificates
 from src.healthcheck.router import healthcheck
+from src.ingest.router import ingest_runs
+from src.metrics.instrumentation import MetricsMiddleware
+from src.metrics.registry import mark_process_dead
+from src.metrics.router import metrics
+from src.profiling.instrumentation import (
+    ProfilingMiddleware,
+    profiling_middleware_enabled,
+)
 from src.settings import get_settings
 
 logger = getLogger(__name__)
@@ -25,11 +35,17 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         host=get_settings().POSTGRES_HOST,
         port=get_settings().POSTGRES_PORT,
         pool_size=get_settings().POOL_SIZE,
+        name="api",
     )
     await database_pool_manager.create_pool()
+    await apply_migrations(database_pool_manager)
 
     app.state.database_pool_manager = database_pool_manager
 
+    redis_client = create_redis_client()
+    app.state.redis = redis_client
+    app.state.cache = RedisCache(client=redis_client, ttl=get_settings().CACHE_TTL)
+
     logger.info("Приложение запущено, database pool manager создан")
 
     yield
@@ -38,6 +54,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         await app.state.database_pool_manager.close()
         logger.info("Database pool manager остановлен")
 
+    await redis_client.aclose()
+    mark_process_dead()
+
 
 def add_middleware(app: FastAPI, *args: Any, **kwargs: Any) -> None:
     app.add_middleware(*args, **kwargs)
@@ -53,6 +72,9 @@ def start_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    add_middleware(application, MetricsMiddleware)
+    if profiling_middleware_enabled():
+        add_middleware(application, ProfilingMiddleware)
     return application
 
 
@@ -61,6 +83,8 @@ app = start_application()
 app.include_router(update_certificates)
 app.include_router(healthcheck)
 app.include_router(validated_order)
+app.include_router(ingest_runs)
+app.include_router(metrics)
 
 
 @app.get("/")
@@ -1,19 +1,27 @@
 import asyncio
 from datetime import datetime, timedelta
 from logging import getLogger
-from typing import Any
+from urllib.parse import urlparse
 
 import aiohttp.client_exceptions
 
 from src.account import Account
+from src.circuit_breaker import CircuitBreakerRegistry
 from src.document.schema import DocumentSchema
+from src.marketplace_api.exceptions import WBApiError
+from src.metrics.registry import RETRIES
 
 logger = getLogger(__name__)
 
 
 class Documents(Account):
-    def __init__(self, account: str, token: str):
-        super().__init__(account, token)
+    def __init__(
+        self,
+        account: str,
+        token: str,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
+    ):
+        super().__init__(account, token, circuit_breakers)
         self.base_url = "https://documents-api.wildberries.ru/api/v1/documents"
 
     async def _get_documents_by_fbs(self) -> list[DocumentSchema]:
@@ -30,6 +38,9 @@ class Documents(Account):
                 url=f"{self.base_url}/list", params=payload, headers=self.headers
             )
 
+        if response is None:
+            raise WBApiError(self.account, None, "Список документов не получен")
+
         return [
             DocumentSchema(
                 act_income_name=document["serviceName"],
@@ -41,8 +52,17 @@ class Documents(Account):
             for document in response["data"]["documents"]
         ]
 
-    async def download_documents(self) -> dict[str, Any] | Any:
-        documents = await self._get_documents_by_fbs()
+    async def download_documents(
+        self, documents: list[DocumentSchema] | None = None
+    ) -> str:
+        """
+        :param documents: уже полученный список документов; если не указан,
+            список запрашивается у WB API
+        :raises WBApiError: WB API вернул ошибку или исчерпаны попытки при 429
+        :raises CircuitOpenError: circuit breaker (аккаунт, endpoint) открыт
+        """
+        if documents is None:
+            documents = await self._get_documents_by_fbs()
 
         payload = {
             "params": [
@@ -51,28 +71,30 @@ class Documents(Account):
             ]
         }
 
+        url = f"{self.base_url}/download/all"
         async with self.async_client as session:
             retries = 0
 
             while retries < self.async_client.retries:
                 try:
                     response = await session.post(
-                        url=f"{self.base_url}/download/all",
+                        url=url,
                         json=payload,
                         headers=self.headers,
                     )
-                    return response["data"]["document"]
+                    if response is None:
+                        raise WBApiError(self.account, None, "Архив не получен")
+                    return str(response["data"]["document"])
                 except aiohttp.client_exceptions.ClientResponseError as error:
                     if error.status == 429:
                         retries += 1
+                        RETRIES.labels("wb_api", urlparse(url).path).inc()
                         logger.error(f"""
                         Account: {self.account}.Status code: {error.status}.
                         Превышен лимит запросов, попытка {retries + 1}. Ожидание: 5 минут""")
                         await asyncio.sleep(300)
+                        continue
 
-                    if error.status != 200:
-                        logger.error(
-                            f"Status code: {error.status}, WB API не стабилен!"
-                        )
-                        return int(error.status)
-            return None
+                    logger.error(f"Status code: {error.status}, WB API не стабилен!")
+                    raise WBApiError(self.account, error.status) from error
+            raise WBApiError(self.account, 429, "Превышен лимит запросов")
@@ -0,0 +1,7 @@
+class WBApiError(Exception):
+    def __init__(self, account: str, status: int | None, message: str = ""):
+        self.account = account
+        self.status = status
+        super().__init__(
+            f"Account: {account}. WB API status: {status}. {message}".strip()
+        )
@@ -0,0 +1,106 @@
+import contextlib
+import inspect
+import time
+from collections.abc import AsyncIterator, Callable
+from functools import wraps
+from typing import Any, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.dependencies.database import db_caller
+from src.metrics.registry import HTTP_REQUEST_DURATION, REPOSITORY_QUERY_DURATION
+
+T = TypeVar("T")
+
+METRICS_PATH = "/metrics"
+
+
+def _observe_coroutine(repository: str, method: Callable) -> Callable:
+    @wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = db_caller.set(f"{repository}.{method.__name__}")
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await method(*args, **kwargs)
+            outcome = "success"
+            return result
+        finally:
+            db_caller.reset(token)
+            REPOSITORY_QUERY_DURATION.labels(
+                repository, method.__name__, outcome
+            ).observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def _observe_async_generator(repository: str, method: Callable) -> Callable:
+    @wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        # время от первого запроса до конца (или прерывания) потоковой выборки
+        token = db_caller.set(f"{repository}.{method.__name__}")
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            async for item in method(*args, **kwargs):
+                yield item
+            outcome = "success"
+        finally:
+            # генератор может быть закрыт в другом контексте (aclose при сборке мусора)
+            with contextlib.suppress(ValueError):
+                db_caller.reset(token)
+            REPOSITORY_QUERY_DURATION.labels(
+                repository, method.__name__, outcome
+            ).observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def instrument_repository(cls: type[T]) -> type[T]:
+    """
+    Декоратор класса репозитория: время каждого публичного асинхронного
+    метода в repository_query_duration_seconds{repository, method, outcome};
+    метод становится db_caller для статистики удержания соединений пула
+    """
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        if inspect.isasyncgenfunction(member):
+            setattr(cls, name, _observe_async_generator(cls.__name__, member))
+        elif inspect.iscoroutinefunction(member):
+            setattr(cls, name, _observe_coroutine(cls.__name__, member))
+    return cls
+
+
+class MetricsMiddleware:
+    """
+    Время HTTP-запросов по шаблону маршрута (/validated_order/{job_id}, а не
+    фактическому пути), чтобы число серий не зависело от параметров запроса
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
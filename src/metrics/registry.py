@@ -0,0 +1,178 @@
+"""
+Метрики Prometheus API, Celery-задач и обращений к WB API.
+
+Если задана переменная окружения PROMETHEUS_MULTIPROC_DIR, prometheus_client
+пишет значения в mmap-файлы этого каталога, а /metrics собирает их со всех
+процессов: воркеров uvicorn и prefork-процессов Celery. У каждого контейнера
+свой каталог (PID в разных контейнерах совпадают, а каталог очищается при
+старте контейнера); PROMETHEUS_MULTIPROC_ROOT - общий родительский каталог,
+из подкаталогов которого /metrics собирает метрики всех контейнеров.
+Без PROMETHEUS_MULTIPROC_DIR метрики хранятся в памяти процесса.
+Внешний коллектор/pushgateway не нужен.
+"""
+
+import glob
+import os
+from collections.abc import Iterable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    Metric,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.registry import Collector
+
+# запросы к БД и WB API: от единиц миллисекунд до ожидания при 429
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса API",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+REPOSITORY_QUERY_DURATION = Histogram(
+    "repository_query_duration_seconds",
+    "Время выполнения метода репозитория",
+    ["repository", "method", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+WB_API_REQUEST_DURATION = Histogram(
+    "wb_api_request_duration_seconds",
+    "Время запроса к WB API",
+    ["endpoint", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+WB_API_RATE_LIMITED = Counter(
+    "wb_api_rate_limited_total",
+    "Ответы WB API 429 Too Many Requests",
+    ["endpoint"],
+)
+
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Время выполнения Celery-задачи",
+    ["task", "state"],
+    buckets=LATENCY_BUCKETS + (600.0, 1800.0, 3600.0),
+)
+
+RETRIES = Counter(
+    "retries_total",
+    "Повторные попытки: Celery-задач и запросов к WB API",
+    ["component", "name"],
+)
+
+INGEST_ROWS = Counter(
+    "ingest_rows_total",
+    "Строки актов при загрузке: parsed - распарсены, inserted - записаны, "
+    "conflicted - уже были загружены, skipped - отброшены при разборе",
+    ["outcome"],
+)
+
+DB_POOL_ACQUIRE_WAIT = Histogram(
+    "db_pool_acquire_wait_seconds",
+    "Ожидание соединения из пула asyncpg",
+    ["pool"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_POOL_HOLD = Histogram(
+    "db_pool_hold_seconds",
+    "Время удержания соединения пула вызывающим методом",
+    ["pool", "caller"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_POOL_ACQUIRE_TIMEOUTS = Counter(
+    "db_pool_acquire_timeouts_total",
+    "Превышения POOL_ACQUIRE_TIMEOUT при ожидании соединения",
+    ["pool"],
+)
+
+# livesum: сумма по живым процессам (воркерам uvicorn и Celery)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Соединения пула: in_use - выданы, idle - свободны, waiting - ожидающие",
+    ["pool", "state"],
+    multiprocess_mode="livesum",
+)
+
+
+def collect() -> tuple[bytes, str]:
+    """Текст метрик в формате Prometheus и его Content-Type"""
+    if "PROMETHEUS_MULTIPROC_ROOT" in os.environ:
+        registry = CollectorRegistry()
+        registry.register(_ContainersCollector(os.environ["PROMETHEUS_MULTIPROC_ROOT"]))
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class _ContainersCollector(Collector):
+    """Слияние mmap-файлов из каталогов всех контейнеров"""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def collect(self) -> Iterable[Metric]:
+        files = glob.glob(os.path.join(self.root, "*", "*.db"))
+        return list(multiprocess.MultiProcessCollector.merge(files, accumulate=True))
+
+
+def mark_process_dead() -> None:
+    """Исключение gauge'ей завершающегося процесса из livesum"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def mark_dead_processes() -> int:
+    """
+    Исключение gauge'ей процессов, завершившихся без worker_process_shutdown
+    (SIGKILL по time_limit, OOM). Каталог у контейнера свой, поэтому PID из
+    имён файлов проверяются в пространстве PID этого контейнера.
+    Возвращает число найденных завершённых процессов
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return 0
+    pattern = os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "gauge_live*_*.db")
+    pids = {
+        int(os.path.splitext(path)[0].rsplit("_", 1)[1]) for path in glob.glob(pattern)
+    }
+    dead = 0
+    for pid in pids:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            multiprocess.mark_process_dead(pid)
+            dead += 1
+        except PermissionError:
+            continue
+    return dead
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from src.metrics.instrumentation import METRICS_PATH
+from src.metrics.registry import collect
+
+metrics = APIRouter(tags=["/metrics"])
+
+
+@metrics.get(METRICS_PATH, include_in_schema=False)
+async def get_metrics() -> Response:
+    content, media_type = collect()
+    return Response(content=content, media_type=media_type)
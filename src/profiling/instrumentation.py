@@ -0,0 +1,51 @@
+import asyncio
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.profiling.profiler import start_profile
+from src.settings import get_settings
+
+PROFILE_HEADER = b"x-profile"
+
+
+def profiling_middleware_enabled() -> bool:
+    """Middleware подключается, только если профилирование API настроено"""
+    return bool(get_settings().PROFILE_ROUTES) or get_settings().PROFILE_HEADER_ENABLED
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование запросов, путь которых начинается с одного из PROFILE_ROUTES,
+    или (при PROFILE_HEADER_ENABLED) запросов с заголовком X-Profile:
+    cprofile | sampling | любое значение для режима PROFILE_MODE
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.routes = tuple(get_settings().PROFILE_ROUTES)
+        self.header_enabled = get_settings().PROFILE_HEADER_ENABLED
+
+    def _requested_mode(self, scope: Scope) -> str | None:
+        if self.header_enabled:
+            headers: list[tuple[bytes, bytes]] = scope["headers"]
+            for name, value in headers:
+                if name == PROFILE_HEADER:
+                    return value.decode("latin-1").strip().lower()
+        if self.routes and scope["path"].startswith(self.routes):
+            return get_settings().PROFILE_MODE
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        mode = self._requested_mode(scope) if scope["type"] == "http" else None
+        session = start_profile(mode) if mode is not None else None
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.stop()
+            route = scope.get("route")
+            label = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+            await asyncio.to_thread(session.save, label)
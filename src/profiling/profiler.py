@@ -0,0 +1,163 @@
+"""
+Профилирование отдельных Celery-задач и запросов API по запросу.
+
+Режимы (PROFILE_MODE или значение заголовка X-Profile):
+- cprofile - детерминированный cProfile, файл <...>.prof для pstats/snakeviz;
+- sampling - поток, снимающий стек профилируемого потока раз в
+  PROFILE_SAMPLE_INTERVAL секунд, файл <...>.collapsed в формате collapsed
+  stacks для flamegraph.pl/speedscope. Накладные расходы меньше, чем у
+  cProfile, и не зависят от числа вызовов функций.
+
+Профили пишутся в PROFILE_DIR, хранятся последние PROFILE_MAX_FILES файлов.
+В процессе одновременно идёт не больше одного профиля: cProfile не допускает
+двух активных профилировщиков, а в API на одном event loop профиль всё равно
+включает все запросы, выполнявшиеся параллельно с профилируемым.
+"""
+
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from logging import getLogger
+from pathlib import Path
+from types import FrameType
+
+from src.settings import get_settings
+
+logger = getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "sampling")
+PROFILE_SUFFIXES = (".prof", ".collapsed")
+
+# один профиль на процесс
+_busy = threading.Lock()
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class CProfileRecorder:
+    suffix = ".prof"
+
+    def __init__(self) -> None:
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+
+    def dump(self, path: Path) -> None:
+        self.profile.dump_stats(path)
+
+
+class SamplingRecorder:
+    suffix = ".collapsed"
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame: FrameType | None = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def dump(self, path: Path) -> None:
+        with path.open("w", encoding="utf-8") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    def __init__(self, recorder: CProfileRecorder | SamplingRecorder) -> None:
+        self.recorder = recorder
+        self.started = time.perf_counter()
+        self.duration: float | None = None
+
+    def stop(self) -> None:
+        if self.duration is not None:
+            return
+        try:
+            self.recorder.stop()
+        finally:
+            self.duration = time.perf_counter() - self.started
+            _busy.release()
+
+    def save(self, label: str) -> Path | None:
+        """Запись профиля в PROFILE_DIR и удаление старых файлов"""
+        self.stop()
+        directory = Path(get_settings().PROFILE_DIR)
+        name = re.sub(r"[^\w.-]+", "_", label).strip("_") or "profile"
+        path = directory / (
+            f"{datetime.now():%Y%m%dT%H%M%S%f}_{name}_{os.getpid()}"
+            f"{self.recorder.suffix}"
+        )
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            self.recorder.dump(path)
+            rotate_profiles(directory, get_settings().PROFILE_MAX_FILES)
+        except OSError as error:
+            logger.error(f"Ошибка записи профиля {label}: {error}")
+            return None
+        logger.info(f"Профиль {label} ({self.duration:.2f} с) записан: {path}")
+        return path
+
+
+def start_profile(mode: str | None = None) -> ProfileSession | None:
+    """
+    Запуск профилировщика в текущем потоке. None, если в процессе уже идёт
+    другой профиль
+    """
+    if not _busy.acquire(blocking=False):
+        logger.info("Профилирование пропущено: в процессе уже идёт другой профиль")
+        return None
+    if mode not in PROFILE_MODES:
+        mode = get_settings().PROFILE_MODE
+    recorder: CProfileRecorder | SamplingRecorder
+    try:
+        if mode == "sampling":
+            recorder = SamplingRecorder(get_settings().PROFILE_SAMPLE_INTERVAL)
+        else:
+            recorder = CProfileRecorder()
+        recorder.start()
+    except BaseException:
+        _busy.release()
+        raise
+    return ProfileSession(recorder)
+
+
+def rotate_profiles(directory: Path, max_files: int) -> int:
+    """Удаление самых старых профилей сверх max_files. Возвращает число удалённых"""
+    profiles = sorted(
+        (path for path in directory.iterdir() if path.suffix in PROFILE_SUFFIXES),
+        key=lambda path: path.stat().st_mtime,
+    )
+    expired = profiles[: max(len(profiles) - max_files, 0)]
+    for path in expired:
+        path.unlink(missing_ok=True)
+    return len(expired)
@@ -1,10 +1,19 @@
 import asyncio
 import json
+import time
 from logging import getLogger
 from typing import Any
+from urllib.parse import urlparse
 
 import aiohttp
 
+from src.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry
+from src.metrics.registry import (
+    RETRIES,
+    WB_API_RATE_LIMITED,
+    WB_API_REQUEST_DURATION,
+)
+
 logger = getLogger(__name__)
 
 
@@ -15,11 +24,16 @@ class AsyncHttpClient:
         retries: int = 8,
         delay: int = 61,
         max_connections: int = 100,
+        circuit_name: str | None = None,
+        circuit_breakers: CircuitBreakerRegistry | None = None,
     ):
         self.timeout = timeout
         self.retries = retries
         self.delay = delay
         self.max_connections = max_connections
+        # имя (аккаунт) для circuit breaker'а по (аккаунт, endpoint); None - без breaker'а
+        self.circuit_name = circuit_name
+        self.circuit_breakers = circuit_breakers
 
         self._session: aiohttp.ClientSession | None = None
         self._session_owner = False
@@ -53,6 +67,11 @@ class AsyncHttpClient:
             return self._session
         return None
 
+    def _get_circuit_breaker(self, url: str) -> CircuitBreaker | None:
+        if self.circuit_name is None or self.circuit_breakers is None:
+            return None
+        return self.circuit_breakers.get(self.circuit_name, urlparse(url).path)
+
     async def _make_request(self, method: str, url: str, **kwargs: Any) -> Any | None:
         if self._session is None or self._session.closed:
             await self._ensure_session()
@@ -61,19 +80,46 @@ class AsyncHttpClient:
             logger.error("Не удалось создать сессию для HTTP-клиента")
             return None
 
+        breaker = self._get_circuit_breaker(url)
+        endpoint = urlparse(url).path
+
         for attempt in range(self.retries):
+            probe = None
+            if breaker:
+                # при открытом circuit запрос не выполняется: CircuitOpenError
+                probe = await breaker.before_call()
+            started = time.perf_counter()
+            status = "error"
             try:
                 async with self._session.request(method, url, **kwargs) as response:
+                    status = str(response.status)
                     content_type = response.headers.get("Content-Type", "")
                     response.raise_for_status()
                     if content_type.startswith("image/"):
-                        return await response.read()
-                    return await response.json()
+                        payload = await response.read()
+                    else:
+                        payload = await response.json()
+                    if breaker:
+                        await breaker.record_success()
+                    return payload
+            except aiohttp.ClientResponseError as error:
+                if error.status == 429:
+                    WB_API_RATE_LIMITED.labels(endpoint).inc()
+                if breaker:
+                    if error.status == 429 or error.status >= 500:
+                        await breaker.record_failure()
+                    else:
+                        await breaker.record_success()
+                raise
             except aiohttp.ClientConnectionError as error:
+                status = "connection_error"
+                if breaker:
+                    await breaker.record_failure()
                 logger.warning(
                     f"Попытка подключения {attempt + 1}: Ошибка во время {method} {url} - {error}"
                 )
                 if attempt < self.retries - 1:
+                    RETRIES.labels("wb_api", endpoint).inc()
                     await asyncio.sleep(self.delay)
                 else:
                     if (
@@ -83,6 +129,16 @@ class AsyncHttpClient:
                     ):
                         await self._session.close()
                     return None
+            except Exception:
+                if breaker:
+                    await breaker.record_failure()
+                raise
+            finally:
+                if breaker:
+                    await breaker.release_probe(probe)
+                WB_API_REQUEST_DURATION.labels(endpoint, status).observe(
+                    time.perf_counter() - started
+                )
         return None
 
     async def request(
@@ -0,0 +1,203 @@
+"""
+Разбор Excel-файлов актов из zip-архивов WB.
+
+Модуль импортирует pandas/openpyxl/numpy, поэтому загружается лениво - только
+стадией парсинга (DocumentsService._parse_account_archive), а не API и не
+воркерами очереди скачивания.
+"""
+
+import io
+import mmap
+import re
+import time
+import zipfile
+from datetime import date, datetime
+from logging import getLogger
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from src.ingest.batch import NULL_COUNT, ActBatch
+from src.metrics.registry import INGEST_ROWS
+
+logger = getLogger(__name__)
+
+
+class MappedArchiveReader(io.RawIOBase):
+    """Файловый интерфейс поверх mmap без копирования (mmap до 3.13 не seekable)."""
+
+    def __init__(self, mapped: mmap.mmap) -> None:
+        self._view = memoryview(mapped)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        size = min(len(buffer), len(self._view) - self._position)
+        buffer[:size] = self._view[self._position : self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._position = max(offset, 0)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        # memoryview нужно освободить до закрытия mmap
+        self._view.release()
+        super().close()
+
+
+def _extract_date_from_df(df: pd.DataFrame) -> date | None:
+    try:
+        date_cell = df.iloc[2, 3]
+
+        if pd.isna(date_cell):
+            logger.warning("Ячейка с датой пуста")
+            return None
+
+        date_str = str(date_cell).strip()
+
+        date_str = re.sub(r"\s*г\.?$", "", date_str)
+
+        date_formats = [
+            "%d.%m.%Y",
+            "%d/%m/%Y",
+            "%Y-%m-%d",
+            "%d-%m-%Y",
+            "%d.%m.%y",
+        ]
+
+        for fmt in date_formats:
+            try:
+                parsed_date = datetime.strptime(date_str, fmt).date()
+                logger.debug(f"Дата успешно распарсена: {parsed_date} (формат: {fmt})")
+                return parsed_date
+            except ValueError:
+                continue
+        logger.warning(f"Не удалось распарсить дату из строки: '{date_str}'")
+        return None
+    except Exception as e:
+        logger.error(f"Ошибка извлечения даты: {e}")
+        return None
+
+
+def _process_excel_data_simple(
+    df: pd.DataFrame,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """
+    Столбцы order_id, sticker, count строк акта (int64). Строки без order_id
+    или стикера, с нечисловыми значениями и строка "Итого" отбрасываются;
+    отсутствующее количество - NULL_COUNT.
+    """
+    data_rows = df.iloc[12:, [1, 3, 4]] if len(df) > 10 else df.iloc[0:0, [1, 3, 4]]
+    data_rows = data_rows[
+        data_rows.iloc[:, 1].notna() & (data_rows.iloc[:, 1].astype(str) != "Итого")
+    ]
+    columns = data_rows.apply(pd.to_numeric, errors="coerce")
+
+    # нечисловые значения (не пустые ячейки) - ошибка разбора строки
+    unparsed = (columns.isna() & data_rows.notna()).any(axis=1)
+    if unparsed.any():
+        logger.warning(
+            f"Невозможно обработать строки: {data_rows[unparsed].values.tolist()}"
+        )
+    columns = columns[~unparsed]
+
+    order_ids = columns.iloc[:, 0].fillna(0).astype("int64")
+    stickers = columns.iloc[:, 1].astype("int64")
+    counts = columns.iloc[:, 2].fillna(NULL_COUNT).astype("int64")
+    valid = (order_ids != 0) & (stickers != 0)
+    INGEST_ROWS.labels("skipped").inc(int(unparsed.sum()) + int((~valid).sum()))
+
+    return (
+        order_ids[valid].to_numpy(),
+        stickers[valid].to_numpy(),
+        counts[valid].to_numpy(),
+    )
+
+
+def extract_excel_from_zip(
+    archive_bytes: bytes | mmap.mmap, account: str, batch: ActBatch, path: str = ""
+) -> ActBatch:
+    """
+    Парсинг Excel-файлов актов (в том числе во вложенных архивах) в batch
+    """
+    # mmap читается zipfile через memoryview, без копирования архива в память процесса
+    source: io.IOBase = (
+        MappedArchiveReader(archive_bytes)
+        if isinstance(archive_bytes, mmap.mmap)
+        else io.BytesIO(archive_bytes)
+    )
+
+    try:
+        with source, zipfile.ZipFile(source) as archive:
+            for file_name in archive.namelist():
+                file_path = f"{path}/{file_name}" if path else file_name
+
+                if file_name.endswith(".zip"):
+                    started = time.perf_counter()
+                    with archive.open(file_name) as nested_file:
+                        nested_bytes = nested_file.read()
+                    batch.unzip_seconds += time.perf_counter() - started
+                    extract_excel_from_zip(nested_bytes, account, batch, file_path)
+
+                elif file_name.endswith((".xlsx", ".xls", ".xlsm")):
+                    try:
+                        started = time.perf_counter()
+                        with archive.open(file_name) as excel_file:
+                            excel_bytes = excel_file.read()
+                        unzipped = time.perf_counter()
+                        batch.unzip_seconds += unzipped - started
+                        batch.workbooks += 1
+
+                        try:
+                            df = pd.read_excel(
+                                io.BytesIO(excel_bytes), engine="openpyxl", header=None
+                            )
+
+                            order_ids, stickers, counts = _process_excel_data_simple(df)
+                            file_date = _extract_date_from_df(df)
+                        finally:
+                            batch.parse_seconds += time.perf_counter() - unzipped
+
+                        if not len(order_ids):
+                            continue
+                        if file_date is None:
+                            logger.error(
+                                f"Файл {file_path}: нет даты акта, строки не загружены"
+                            )
+                            INGEST_ROWS.labels("skipped").inc(len(order_ids))
+                            continue
+
+                        batch.add_file(
+                            account=account,
+                            document_number=file_name.split(".")[0].split("-")[-1],
+                            file_date=file_date,
+                            order_ids=order_ids.tobytes(),
+                            stickers=stickers.tobytes(),
+                            counts=counts.tobytes(),
+                        )
+
+                    except Exception as error:
+                        logger.error(f"Ошибка парсинга файла: {file_path}: {error}")
+
+    except zipfile.BadZipFile:
+        logger.error(f"Некорректный zip архив: {path}")
+    except Exception as error:
+        logger.error(f"Ошибока обработки архива {path}: {error}")
+
+    return batch